@@ -1,18 +1,26 @@
-from tkinter import Button, Frame, Label, Tk, Widget
-from typing import final
+from __future__ import annotations
 
-import cv2
-from cv2.typing import MatLike
-from matplotlib import pyplot as plt
+from threading import Event
+from tkinter import Button, Frame, Label, Tk, Toplevel, Widget
+from typing import TYPE_CHECKING, final
 
 from utils import (
+    BackgroundTask,
+    ProgressIndicator,
     clear_ui_elements,
     create_error_label,
-    load_image,
-    resize_image,
+    preload_modules,
     select_image_file,
 )
 
+# cv2, numpy, dan matplotlib diimpor saat pertama kali dipakai agar jendela
+# tampil secepat mungkin
+if TYPE_CHECKING:
+    import numpy as np
+    from numpy.typing import NDArray
+
+    from analysis.intensity import IntensityResult
+
 
 @final
 class SimpleCataractDetector:
@@ -31,8 +39,18 @@ class SimpleCataractDetector:
         self.root.title("Sistem Deteksi Katarak Sederhana")
         self.root.geometry("300x150")
         self.result_labels: list[Widget] = []
+        self.histogram_window: Toplevel | None = None
+        self.task = BackgroundTask(self.root)
         self.setup_ui()
 
+        # Muat library berat di latar setelah jendela tampil
+        _ = self.root.after_idle(
+            preload_modules,
+            "analysis.intensity",
+            "matplotlib.figure",
+            "matplotlib.backends.backend_tkagg",
+        )
+
     def setup_ui(self):
         """
         Mengatur elemen-elemen antarmuka pengguna (UI) awal.
@@ -49,6 +67,8 @@ class SimpleCataractDetector:
         )
         btn.pack(expand=True)
 
+        self.progress = ProgressIndicator(self.root)
+
     def clear_previous_results(self):
         """
         Menghapus semua hasil dari analisis sebelumnya dari UI.
@@ -66,30 +86,57 @@ class SimpleCataractDetector:
         if not path:
             return
 
-        try:
-            self.clear_previous_results()
-            img = load_image(path)  # Use utility function to load image
+        self.analyze_path(path)
+
+    def analyze_path(self, path: str):
+        """
+        Memulai analisis gambar di thread latar dan menampilkan hasilnya.
+
+        Args:
+            path: Path ke file gambar.
+        """
+
+        def work(cancel: Event) -> IntensityResult:
+            from analysis.intensity import analyze_intensity_file
 
-            # Ubah ukuran gambar untuk konsistensi
-            img = resize_image(img, width=500)  # Use utility resize function
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            gray = cv2.GaussianBlur(gray, (5, 5), 0)
+            result = analyze_intensity_file(path, width=500, cancel=cancel)
 
-            # Hitung mean dan standard deviation
-            mean_arr = cv2.meanStdDev(gray)[0]
-            std_arr = cv2.meanStdDev(gray)[1]
-            mean_val = float(mean_arr[0, 0])  # pyright: ignore[reportAny]
-            std_val = float(std_arr[0, 0])  # pyright: ignore[reportAny]
+            # Histogram dihitung di thread latar; hasilnya disimpan di result
+            _ = result.histogram
+            return result
 
-            # Diagnosis berdasarkan mean intensity
-            diagnosis = self.diagnose_cataract(mean_val)
+        self.clear_previous_results()
+        self.progress.show()
 
-            self.display_results(mean_val, std_val, diagnosis)
-            self.show_histogram(gray, mean_val)
+        # Analisis berjalan di thread latar agar jendela tetap responsif;
+        # memilih gambar baru membatalkan analisis sebelumnya
+        self.task.submit(work, self.show_result, self.show_error)
+
+    def show_result(self, result: IntensityResult):
+        """
+        Menampilkan hasil analisis setelah pemrosesan di latar selesai.
+
+        Args:
+            result: Hasil analisis intensitas.
+        """
+        self.progress.hide()
+        try:
+            self.display_results(result.mean_val, result.std_val, result.diagnosis)
+            self.show_histogram(result.histogram, result.mean_val)
 
         except Exception as e:
-            # Use utility function to create error label
-            create_error_label(self.root, str(e), self.result_labels)
+            self.show_error(e)
+
+    def show_error(self, error: Exception):
+        """
+        Menampilkan pesan error dari analisis yang gagal.
+
+        Args:
+            error: Exception yang terjadi.
+        """
+        self.progress.hide()
+        # Use utility function to create error label
+        create_error_label(self.root, str(error), self.result_labels)
 
     def diagnose_cataract(self, mean_val: float) -> tuple[str, str]:
         """
@@ -101,12 +148,9 @@ class SimpleCataractDetector:
         Returns:
             Tuple berisi status dan deskripsi diagnosis.
         """
-        if mean_val < 50:
-            return "Tidak Ada Katarak", "Mata sehat"
-        elif mean_val <= 100:
-            return "Katarak Ringan", "Mata memiliki katarak ringan"
-        else:
-            return "Katarak Parah", "Mata memiliki katarak parah"
+        from analysis.intensity import diagnose_cataract
+
+        return diagnose_cataract(mean_val)
 
     def display_results(
         self, mean_val: float, std_val: float, diagnosis: tuple[str, str]
@@ -168,21 +212,39 @@ class SimpleCataractDetector:
 
         self.result_labels.append(results_frame)
 
-    def show_histogram(self, gray: MatLike, mean_val: float):
+    def show_histogram(self, histogram: NDArray[np.float32], mean_val: float):
         """
         Menampilkan histogram dari distribusi intensitas grayscale.
 
         Args:
-            gray: Gambar grayscale untuk histogram.
+            histogram: Jumlah piksel per nilai intensitas 0..255.
             mean_val: Nilai mean untuk ditampilkan sebagai garis vertikal.
         """
         try:
-            _ = plt.hist(gray.ravel(), 256, range=(0, 256))  # pyright: ignore[reportUnknownMemberType,reportUnknownVariableType]
-            _ = plt.axvline(mean_val, color="k", linestyle="dashed", linewidth=1)  # pyright: ignore[reportUnknownMemberType]
-            _ = plt.title("Distribusi Intensitas Grayscale")  # pyright: ignore[reportUnknownMemberType]
-            _ = plt.xlabel("Nilai Intensitas")  # pyright: ignore[reportUnknownMemberType]
-            _ = plt.ylabel("Jumlah Piksel")  # pyright: ignore[reportUnknownMemberType]
-            plt.show()  # pyright: ignore[reportUnknownMemberType]
+            # Figure dibuat langsung tanpa pyplot agar tidak ada state global
+            # dan jendela histogram dilayani oleh mainloop aplikasi ini
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            from matplotlib.figure import Figure
+
+            # Tutup histogram sebelumnya agar hanya ada satu jendela
+            window = self.histogram_window
+            if window is not None and window.winfo_exists():
+                window.destroy()
+
+            fig = Figure(figsize=(6.4, 4.8))
+            ax = fig.add_subplot()
+            _ = ax.stairs(histogram, range(257), fill=True)  # pyright: ignore[reportUnknownMemberType]
+            _ = ax.axvline(mean_val, color="k", linestyle="dashed", linewidth=1)  # pyright: ignore[reportUnknownMemberType]
+            _ = ax.set_title("Distribusi Intensitas Grayscale")  # pyright: ignore[reportUnknownMemberType]
+            _ = ax.set_xlabel("Nilai Intensitas")  # pyright: ignore[reportUnknownMemberType]
+            _ = ax.set_ylabel("Jumlah Piksel")  # pyright: ignore[reportUnknownMemberType]
+
+            window = Toplevel(self.root)
+            window.title("Histogram")
+            canvas = FigureCanvasTkAgg(fig, master=window)
+            canvas.draw()
+            canvas.get_tk_widget().pack(fill="both", expand=True)
+            self.histogram_window = window
 
         except Exception as e:
             # Use utility function for error label
@@ -1,19 +1,26 @@
-from tkinter import Button, Frame, Label, Tk, Widget
-from typing import cast, final
+from __future__ import annotations
 
-import cv2
-import numpy as np
-from cv2.typing import MatLike
-from PIL import Image, ImageTk
+from threading import Event
+from tkinter import Button, Frame, Label, Tk, Widget
+from typing import TYPE_CHECKING, final
 
 from utils import (
+    BackgroundTask,
+    ProgressIndicator,
     clear_ui_elements,
     create_error_label,
-    load_image,
-    resize_image,
+    preload_modules,
     select_image_file,
 )
 
+# cv2, numpy, dan PIL diimpor saat pertama kali dipakai agar jendela tampil
+# secepat mungkin
+if TYPE_CHECKING:
+    from cv2.typing import MatLike
+    from PIL import ImageTk
+
+    from analysis.segmentation import SegmentationResult
+
 
 @final
 class CataractDetector:
@@ -32,8 +39,14 @@ class CataractDetector:
         self.root.title("Sistem Deteksi Katarak")
         self.image_references: list[ImageTk.PhotoImage] = []
         self.result_elements: list[Widget] = []
+        self.task = BackgroundTask(self.root)
         self.setup_ui()
 
+        # Muat library berat di latar setelah jendela tampil
+        _ = self.root.after_idle(
+            preload_modules, "analysis.segmentation", "analysis.preview", "PIL.ImageTk"
+        )
+
     def setup_ui(self):
         """
         Mengatur elemen-elemen antarmuka pengguna (UI) awal.
@@ -45,7 +58,9 @@ class CataractDetector:
             font=("Arial", 12),
         )
         btn.pack(side="bottom", fill="both", expand=True, padx=10, pady=10)
-        self.result_elements.append(btn)
+
+        # Ditampilkan di atas tombol selama analisis berjalan
+        self.progress = ProgressIndicator(self.root, side="bottom")
 
     def clear_previous_results(self):
         """
@@ -63,109 +78,69 @@ class CataractDetector:
         if not path:
             return
 
-        try:
-            self.clear_previous_results()
-            img = load_image(path)
-
-            # Ubah ukuran gambar untuk konsistensi
-            img = resize_image(img, width=500)
-
-            gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-            img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-
-            # Terapkan filter untuk menghaluskan gambar
-            kernel = np.ones((5, 5), np.float32) / 25
-            imgfiltered = cv2.filter2D(gray, -1, kernel)
-
-            # Buat kernel untuk operasi morfologi
-            kernelOp = np.ones((10, 10), np.uint8)
-
-            # Terapkan thresholding untuk segmentasi
-            _, thresh_image = cv2.threshold(imgfiltered, 50, 255, cv2.THRESH_BINARY_INV)
-
-            # Operasi morfologi (opening) untuk membersihkan noise
-            morpho = cv2.morphologyEx(thresh_image, cv2.MORPH_OPEN, kernelOp)
-
-            # Deteksi lingkaran (iris) menggunakan Hough Transform
-            circles = cv2.HoughCircles(
-                morpho,
-                cv2.HOUGH_GRADIENT,
-                1,
-                20,
-                param1=50,
-                param2=30,
-                minRadius=0,
-                maxRadius=0,
-            )
-
-            # Periksa jika tidak ada lingkaran yang terdeteksi
-            if circles.size == 0:
-                raise ValueError("Tidak ada lingkaran (iris) yang terdeteksi")
-
-            circles = np.round(circles[0, :]).astype("int")
-            if len(circles) == 0:
-                raise ValueError("Tidak ditemukan lingkaran (iris) yang valid")
-
-            # Ambil koordinat dan radius dari lingkaran pertama yang terdeteksi
-            x = cast(int, circles[0][0])
-            y = cast(int, circles[0][1])
-            r = cast(int, circles[0][2])
+        self.analyze_path(path)
 
-            # Buat mask untuk mengisolasi area iris
-            img_morpho_copy = morpho.copy()
-            rows = cast(int, img_morpho_copy.shape[0])
-            cols = cast(int, img_morpho_copy.shape[1])
-
-            # Buat mask sirkular menggunakan operasi vektor untuk efisiensi
-            y_grid, x_grid = np.ogrid[:rows, :cols]
-            mask = (x_grid - x) ** 2 + (y_grid - y) ** 2 <= r**2
-            img_morpho_copy[~mask] = 0
+    def analyze_path(self, path: str):
+        """
+        Memulai analisis gambar di thread latar dan menampilkan hasilnya.
 
-            # Inversi gambar untuk mendeteksi katarak (area putih)
-            imgg_inv = cv2.bitwise_not(img_morpho_copy)
+        Args:
+            path: Path ke file gambar.
+        """
 
-            # Temukan kontur untuk menghitung area pupil
-            contours_pupil, _ = cv2.findContours(
-                img_morpho_copy, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE
+        def work(cancel: Event) -> tuple[SegmentationResult, MatLike]:
+            from analysis.segmentation import analyze_file
+            from analysis.preview import render_mosaic
+
+            result = analyze_file(path, cancel=cancel)
+
+            # Mosaic thumbnail juga disusun di thread latar
+            mosaic = render_mosaic(
+                [
+                    result.img_rgb,
+                    result.imgfiltered,
+                    result.thresh_image,
+                    result.img_morpho_copy,
+                    result.imgg_inv,
+                    result.cimg_cat,
+                ]
             )
+            return result, mosaic
 
-            pupil_area = 0
-            if contours_pupil:
-                largest_contour = max(contours_pupil, key=cv2.contourArea)
-                pupil_area = cv2.contourArea(largest_contour)
+        self.clear_previous_results()
+        self.progress.show()
 
-            if pupil_area == 0:
-                raise ValueError("Tidak dapat mendeteksi area pupil")
+        # Analisis berjalan di thread latar agar jendela tetap responsif;
+        # memilih gambar baru membatalkan analisis sebelumnya
+        self.task.submit(work, self.show_result, self.show_error)
 
-            # Temukan kontur untuk deteksi katarak
-            contours_cat, _ = cv2.findContours(
-                imgg_inv, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE
-            )
+    def show_result(self, outcome: tuple[SegmentationResult, MatLike]):
+        """
+        Menampilkan hasil segmentasi setelah analisis di latar selesai.
 
-            # Siapkan gambar untuk visualisasi hasil deteksi katarak
-            cimg_cat = img_rgb.copy()
-            cat_area = 0
-
-            # Hitung total area katarak
-            for cnt in contours_cat:
-                area = cv2.contourArea(cnt)
-                if area < pupil_area and area > 50:  # Filter noise kecil
-                    _ = cv2.drawContours(cimg_cat, [cnt], -1, (0, 255, 0), 2)
-                    cat_area += area
-
-            # Hitung persentase katarak
-            if cat_area > 0:
-                cataract_percentage = (cat_area / (pupil_area + cat_area)) * 100
-            else:
-                cataract_percentage = 0.0
-
-            self.display_results(pupil_area, cat_area, cataract_percentage)
-            self.display_images(
-                img_rgb, imgfiltered, thresh_image, img_morpho_copy, imgg_inv, cimg_cat
+        Args:
+            outcome: Hasil segmentasi dan mosaic thumbnail setiap tahap.
+        """
+        self.progress.hide()
+        result, mosaic = outcome
+        try:
+            self.display_results(
+                result.pupil_area, result.cat_area, result.cataract_percentage
             )
+            self.display_images(mosaic)
 
         except Exception as e:
-            create_error_label(self.root, str(e), self.result_elements)
+            self.show_error(e)
+
+    def show_error(self, error: Exception):
+        """
+        Menampilkan pesan error dari analisis yang gagal.
+
+        Args:
+            error: Exception yang terjadi.
+        """
+        self.progress.hide()
+        create_error_label(self.root, str(error), self.result_elements)
 
     def display_results(
         self, pupil_area: float, cat_area: float, cataract_percentage: float
@@ -215,59 +190,33 @@ class CataractDetector:
         percentage_label.pack()
         self.result_elements.append(percentage_label)
 
-    def display_images(
-        self,
-        img_rgb: MatLike,
-        imgfiltered: MatLike,
-        thresh_image: MatLike,
-        img_morpho_copy: MatLike,
-        imgg_inv: MatLike,
-        cimg_cat: MatLike,
-    ):
+    def display_images(self, mosaic: MatLike):
         """
-        Menampilkan gambar-gambar dari setiap tahap pemrosesan di UI.
+        Menampilkan mosaic thumbnail dari setiap tahap pemrosesan di UI.
 
         Args:
-            img_rgb: Gambar asli (RGB).
-            imgfiltered: Gambar setelah difilter.
-            thresh_image: Gambar setelah thresholding.
-            img_morpho_copy: Mask pupil yang dihasilkan.
-            imgg_inv: Gambar mask yang diinversi.
-            cimg_cat: Gambar akhir dengan deteksi katarak.
+            mosaic: Gambar RGB berisi thumbnail dari render_mosaic, berurutan
+                asli, filter, threshold, mask pupil, inversi, deteksi katarak.
         """
-        # Konversi gambar grayscale ke 3-channel (RGB) untuk ditampilkan
-        imgfiltered_rgb = cv2.cvtColor(imgfiltered, cv2.COLOR_GRAY2RGB)
-        thresh_image_rgb = cv2.cvtColor(thresh_image, cv2.COLOR_GRAY2RGB)
-        img_morpho_copy_rgb = cv2.cvtColor(img_morpho_copy, cv2.COLOR_GRAY2RGB)
-        imgg_inv_rgb = cv2.cvtColor(imgg_inv, cv2.COLOR_GRAY2RGB)
-
-        images = [
-            img_rgb,
-            imgfiltered_rgb,
-            thresh_image_rgb,
-            img_morpho_copy_rgb,
-            imgg_inv_rgb,
-            cimg_cat,
-        ]
+        from PIL import Image, ImageTk
 
-        # Konversi array numpy ke objek gambar PIL
-        pil_images = [Image.fromarray(img) for img in images]
+        from analysis.preview import THUMBNAIL_SIZE
 
-        # Ubah ukuran gambar untuk thumbnail
-        width, height = 120, 120
-        resized_images: list[ImageTk.PhotoImage] = []
-        for img in pil_images:
-            resized_img = img.resize((width, height), Image.Resampling.LANCZOS)
-            resized_images.append(ImageTk.PhotoImage(resized_img))
+        # Satu PhotoImage untuk semua thumbnail
+        tk_image = ImageTk.PhotoImage(Image.fromarray(mosaic))
 
         # Simpan referensi gambar agar tidak dihapus oleh garbage collector Python
-        self.image_references.extend(resized_images)
+        self.image_references.append(tk_image)
 
         # Buat frame untuk menampilkan gambar-gambar proses
         images_frame = Frame(self.root)
-        images_frame.pack(pady=10)
+        images_frame.pack(pady=10, padx=5)
         self.result_elements.append(images_frame)
 
+        panel = Label(images_frame, image=tk_image, borderwidth=0)
+        panel.grid(row=0, column=0, columnspan=6)
+        self.result_elements.append(panel)
+
         labels = [
             "Asli",
             "Filter",
@@ -277,18 +226,12 @@ class CataractDetector:
             "Deteksi Katarak",
         ]
 
-        # Tampilkan setiap gambar beserta labelnya
-        for tk_image, label_text in zip(resized_images, labels):
-            panel_frame = Frame(images_frame)
-            panel_frame.pack(side="left", padx=5, pady=5)
-            self.result_elements.append(panel_frame)
-
-            panel = Label(panel_frame, image=tk_image)
-            panel.pack()
-            self.result_elements.append(panel)
-
-            text_label = Label(panel_frame, text=label_text, font=("Arial", 8))
-            text_label.pack()
+        # Label teks di bawah setiap thumbnail; lebar kolom mengikuti
+        # thumbnail ditambah jarak antar thumbnail
+        for column, label_text in enumerate(labels):
+            _ = images_frame.columnconfigure(column, minsize=THUMBNAIL_SIZE[0] + 10)
+            text_label = Label(images_frame, text=label_text, font=("Arial", 8))
+            text_label.grid(row=1, column=column)
             self.result_elements.append(text_label)
 
     def run(self):
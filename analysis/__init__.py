@@ -0,0 +1,165 @@
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .batch import (
+        ANALYSIS_MODES,
+        AnalysisMode,
+        BatchRunner,
+        analyze_encoded,
+        analyze_packed,
+        analyze_record,
+    )
+    from .cache import ResultCache
+    from .cancellation import AnalysisCancelled
+    from .cascade import CascadeResult, analyze_cascade
+    from .combined import CombinedResult, analyze_combined, analyze_combined_file
+    from .dataset import PackedDataset, pack_dataset
+    from .instrumentation import ImageMetrics, Instrumentation, MetricsAggregator
+    from .intensity import (
+        DIAGNOSIS_CODES,
+        INTENSITY_DTYPE,
+        IntensityResult,
+        analyze_intensity,
+        analyze_intensity_batch,
+        analyze_intensity_file,
+        compute_histogram,
+        diagnose_cataract,
+        diagnosis_codes,
+    )
+    from .scheduler import ParallelPlan, plan_parallelism
+    from .segmentation import (
+        DEFAULT_PARAMS,
+        SegmentationParams,
+        SegmentationResult,
+        analyze_file,
+        segment_image,
+    )
+    from .server import MAX_QUEUED, AnalysisServer, MicroBatcher, serve
+    from .store import RESULT_DTYPE, ResultStore
+    from .stream import StreamingPipeline
+    from .sweep import StageGraph, expand_grid, run_sweep, sweep_image
+    from .video import VideoStream
+    from .watch import FolderWatcher, Journal
+    from .workspace import Workspace
+
+# Submodul dimuat saat atributnya pertama kali dipakai sehingga GUI yang hanya
+# membutuhkan segmentasi atau intensitas tidak ikut mengimpor server (asyncio),
+# store, sweep, video, watch, dataset, dan stream
+_LAZY_ATTRIBUTES = {
+    "ANALYSIS_MODES": ".batch",
+    "AnalysisCancelled": ".cancellation",
+    "AnalysisMode": ".batch",
+    "AnalysisServer": ".server",
+    "BatchRunner": ".batch",
+    "CascadeResult": ".cascade",
+    "CombinedResult": ".combined",
+    "DEFAULT_PARAMS": ".segmentation",
+    "DIAGNOSIS_CODES": ".intensity",
+    "FolderWatcher": ".watch",
+    "INTENSITY_DTYPE": ".intensity",
+    "ImageMetrics": ".instrumentation",
+    "Instrumentation": ".instrumentation",
+    "IntensityResult": ".intensity",
+    "Journal": ".watch",
+    "MAX_QUEUED": ".server",
+    "MetricsAggregator": ".instrumentation",
+    "MicroBatcher": ".server",
+    "PackedDataset": ".dataset",
+    "ParallelPlan": ".scheduler",
+    "RESULT_DTYPE": ".store",
+    "ResultCache": ".cache",
+    "ResultStore": ".store",
+    "SegmentationParams": ".segmentation",
+    "SegmentationResult": ".segmentation",
+    "StageGraph": ".sweep",
+    "StreamingPipeline": ".stream",
+    "VideoStream": ".video",
+    "Workspace": ".workspace",
+    "analyze_cascade": ".cascade",
+    "analyze_combined": ".combined",
+    "analyze_combined_file": ".combined",
+    "analyze_encoded": ".batch",
+    "analyze_file": ".segmentation",
+    "analyze_intensity": ".intensity",
+    "analyze_intensity_batch": ".intensity",
+    "analyze_intensity_file": ".intensity",
+    "analyze_packed": ".batch",
+    "analyze_record": ".batch",
+    "compute_histogram": ".intensity",
+    "diagnose_cataract": ".intensity",
+    "diagnosis_codes": ".intensity",
+    "expand_grid": ".sweep",
+    "pack_dataset": ".dataset",
+    "plan_parallelism": ".scheduler",
+    "run_sweep": ".sweep",
+    "segment_image": ".segmentation",
+    "serve": ".server",
+    "sweep_image": ".sweep",
+}
+
+__all__ = [
+    "ANALYSIS_MODES",
+    "AnalysisCancelled",
+    "AnalysisMode",
+    "AnalysisServer",
+    "BatchRunner",
+    "CascadeResult",
+    "CombinedResult",
+    "DEFAULT_PARAMS",
+    "DIAGNOSIS_CODES",
+    "FolderWatcher",
+    "INTENSITY_DTYPE",
+    "ImageMetrics",
+    "Instrumentation",
+    "IntensityResult",
+    "Journal",
+    "MAX_QUEUED",
+    "MetricsAggregator",
+    "MicroBatcher",
+    "PackedDataset",
+    "ParallelPlan",
+    "RESULT_DTYPE",
+    "ResultCache",
+    "ResultStore",
+    "SegmentationParams",
+    "SegmentationResult",
+    "StageGraph",
+    "StreamingPipeline",
+    "VideoStream",
+    "Workspace",
+    "analyze_cascade",
+    "analyze_combined",
+    "analyze_combined_file",
+    "analyze_encoded",
+    "analyze_file",
+    "analyze_intensity",
+    "analyze_intensity_batch",
+    "analyze_intensity_file",
+    "analyze_packed",
+    "analyze_record",
+    "compute_histogram",
+    "diagnose_cataract",
+    "diagnosis_codes",
+    "expand_grid",
+    "pack_dataset",
+    "plan_parallelism",
+    "run_sweep",
+    "segment_image",
+    "serve",
+    "sweep_image",
+]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    submodule = _LAZY_ATTRIBUTES[name]
+    module = importlib.import_module(submodule, __name__)
+    # Simpan semua atribut dari submodul yang sama agar __getattr__ tidak
+    # dipanggil lagi untuk atribut tersebut
+    for attribute, source in _LAZY_ATTRIBUTES.items():
+        if source == submodule:
+            globals()[attribute] = getattr(module, attribute)
+    return globals()[name]  # pyright: ignore[reportAny]
@@ -0,0 +1,591 @@
+import os
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from threading import local
+from typing import Literal, cast, final
+
+import numpy as np
+from cv2.typing import MatLike
+
+from utils import decode_image, load_image, resize_image
+
+from .cache import ResultCache, hash_file, make_key, save_masks
+from .cascade import CascadeResult, analyze_cascade
+from .combined import CombinedResult, analyze_combined
+from .dataset import PackedDataset
+from .instrumentation import Instrumentation, measure
+from .intensity import IntensityResult, analyze_intensity
+from .scheduler import configure_threads
+from .segmentation import (
+    DEFAULT_PARAMS,
+    SegmentationParams,
+    SegmentationResult,
+    segment_image,
+    segment_multires,
+)
+from .workspace import Workspace
+
+AnalysisMode = Literal["segmentation", "intensity", "cascade", "combined"]
+
+ANALYSIS_MODES: tuple[AnalysisMode, ...] = (
+    "segmentation",
+    "intensity",
+    "cascade",
+    "combined",
+)
+
+type Record = dict[str, object]
+
+# Dipanggil saat tugas selesai dengan record hasilnya, atau None jika batal
+type Finalizer = Callable[[Record | None], None]
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """
+    Deskripsi gambar yang disimpan di shared memory.
+
+    Attributes:
+        name: Nama blok shared memory.
+        shape: Bentuk array gambar.
+        dtype: Tipe data array gambar.
+    """
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+
+# Satu workspace per thread (dan per proses worker); hasil selalu diubah
+# menjadi record sebelum gambar berikutnya dianalisis di thread yang sama
+_workspaces = local()
+
+
+def _workspace() -> Workspace:
+    workspace: Workspace | None = getattr(_workspaces, "workspace", None)
+    if workspace is None:
+        workspace = Workspace()
+        _workspaces.workspace = workspace
+    return workspace
+
+
+# Dataset yang sudah dibuka di proses ini, per prefix
+_datasets: dict[str, PackedDataset] = {}
+
+
+def _dataset(prefix: str) -> PackedDataset:
+    dataset = _datasets.get(prefix)
+    if dataset is None:
+        dataset = _datasets[prefix] = PackedDataset(prefix)
+    return dataset
+
+
+def _run_analysis(
+    img: MatLike,
+    mode: AnalysisMode,
+    params: SegmentationParams,
+    instrumentation: Instrumentation | None = None,
+) -> SegmentationResult | IntensityResult | CascadeResult | CombinedResult:
+    workspace = _workspace()
+    if mode == "cascade":
+        # Cascade melakukan resize sendiri untuk screening dan segmentasi
+        return analyze_cascade(img, params, instrumentation, workspace)
+    if mode == "segmentation" and params.resolution == "multi":
+        # Resize ke width dilakukan sendiri; ROI diambil dari gambar asli
+        return segment_multires(img, params, None, instrumentation, workspace)
+
+    h, w = cast(tuple[int, int], img.shape[:2])
+    if w != params.width:
+        with measure(instrumentation, "resize"):
+            # Ukuran tujuan dihitung dengan rumus yang sama dengan resize_image
+            shape = (int(h * (params.width / float(w))), params.width, *img.shape[2:])
+            dst = workspace.buffer("resize", shape, img.dtype)
+            img = resize_image(img, width=params.width, dst=dst)
+    if mode == "intensity":
+        return analyze_intensity(
+            img, instrumentation, params.mild_threshold, params.severe_threshold
+        )
+    if mode == "combined":
+        return analyze_combined(img, params, None, instrumentation, workspace)
+    return segment_image(
+        img, params, instrumentation=instrumentation, workspace=workspace
+    )
+
+
+def analyze_image(
+    img: MatLike, mode: AnalysisMode, params: SegmentationParams = DEFAULT_PARAMS
+) -> Record:
+    """
+    Mengubah ukuran gambar dan menjalankan analisis sesuai mode.
+
+    Args:
+        img: Gambar input (BGR, atau grayscale untuk mode "intensity").
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+
+    Returns:
+        Hasil numerik analisis dalam bentuk dictionary.
+    """
+    return _run_analysis(img, mode, params).to_dict()
+
+
+def analyze_record(
+    path: str,
+    mode: AnalysisMode,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    masks_path: str | None = None,
+    instrument: bool = False,
+) -> Record:
+    """
+    Memuat dan menganalisis satu file, mengubah error menjadi record.
+
+    Args:
+        path: Path ke file gambar.
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+        masks_path: Jika diberikan, mask intermediate segmentasi disimpan
+            ke file .npz ini.
+        instrument: Jika True, ukuran per tahap disertakan pada kunci
+            "metrics" (juga untuk gambar yang gagal).
+
+    Returns:
+        Record hasil analisis dengan kunci "path" dan "status".
+    """
+    inst = Instrumentation(path) if instrument else None
+    try:
+        img = _decode(path, mode, params, inst)
+    except Exception as e:
+        return _error_record(path, e, inst)
+    return _record(path, img, mode, params, inst, masks_path)
+
+
+def _decode(
+    path: str,
+    mode: AnalysisMode,
+    params: SegmentationParams,
+    instrumentation: Instrumentation | None = None,
+) -> MatLike:
+    with measure(instrumentation, "decode"):
+        width = params.decode_width if mode == "segmentation" else params.width
+        return load_image(path, width=width, gray=mode == "intensity")
+
+
+def _record(
+    path: str,
+    img: MatLike,
+    mode: AnalysisMode,
+    params: SegmentationParams,
+    instrumentation: Instrumentation | None = None,
+    masks_path: str | None = None,
+) -> Record:
+    # Menganalisis gambar yang sudah didecode oleh _decode menjadi record
+    try:
+        result = _run_analysis(img, mode, params, instrumentation)
+    except Exception as e:
+        return _error_record(path, e, instrumentation)
+
+    if isinstance(result, CascadeResult | CombinedResult):
+        segmentation = result.segmentation
+    else:
+        segmentation = result if isinstance(result, SegmentationResult) else None
+    if masks_path is not None and segmentation is not None:
+        save_masks(masks_path, segmentation)
+    record: Record = {"path": path, "status": "ok", **result.to_dict()}
+    if instrumentation is not None:
+        record["metrics"] = instrumentation.metrics.to_dict()
+    return record
+
+
+def _error_record(
+    path: str, error: Exception, instrumentation: Instrumentation | None = None
+) -> Record:
+    record: Record = {"path": path, "status": "error", "error": str(error)}
+    if instrumentation is not None:
+        # Ukuran tahap yang sempat berjalan tetap dilaporkan
+        record["metrics"] = instrumentation.metrics.to_dict()
+    return record
+
+
+def analyze_encoded(
+    key: str,
+    data: bytes,
+    mode: AnalysisMode,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrument: bool = False,
+) -> Record:
+    """
+    Mendecode dan menganalisis gambar dari isi file di memori.
+
+    Args:
+        key: Identitas gambar; dipakai sebagai "path" pada record.
+        data: Isi file gambar (misalnya hasil upload).
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+        instrument: Jika True, ukuran per tahap disertakan pada kunci
+            "metrics".
+
+    Returns:
+        Record hasil analisis dengan kunci "path" dan "status".
+    """
+    inst = Instrumentation(key) if instrument else None
+    try:
+        with measure(inst, "decode"):
+            img = decode_image(data, gray=mode == "intensity")
+        result = _run_analysis(img, mode, params, inst)
+    except Exception as e:
+        record: Record = {"path": key, "status": "error", "error": str(e)}
+    else:
+        record = {"path": key, "status": "ok", **result.to_dict()}
+
+    if inst is not None:
+        record["metrics"] = inst.metrics.to_dict()
+    return record
+
+
+def analyze_packed(
+    prefix: str,
+    index: int,
+    mode: AnalysisMode,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrument: bool = False,
+) -> Record:
+    """
+    Menganalisis satu gambar dari dataset hasil pack_dataset tanpa decode.
+
+    Dataset dibuka sekali per proses dan gambar dibaca sebagai view ke
+    memory map. Mode intensity memakai bidang grayscale yang tersimpan,
+    sedangkan mode lain memakai bidang BGR seperti gambar hasil decode
+    berwarna, sehingga hasilnya sama dengan analisis tanpa pack.
+
+    Args:
+        prefix: Awalan nama file dataset.
+        index: Nomor gambar di dataset.
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+        instrument: Jika True, ukuran per tahap disertakan pada kunci
+            "metrics".
+
+    Returns:
+        Record hasil analisis dengan path asli gambar sebagai "path".
+    """
+    dataset = _dataset(prefix)
+    path = dataset.paths[index]
+    inst = Instrumentation(path) if instrument else None
+    try:
+        with measure(inst, "decode"):
+            if mode == "intensity":
+                img = dataset.gray(index)
+            else:
+                img = dataset.image(index)
+        result = _run_analysis(img, mode, params, inst)
+    except Exception as e:
+        record: Record = {"path": path, "status": "error", "error": str(e)}
+    else:
+        record = {"path": path, "status": "ok", **result.to_dict()}
+
+    if inst is not None:
+        record["metrics"] = inst.metrics.to_dict()
+    return record
+
+
+def _analyze_frame(
+    key: str,
+    img: MatLike,
+    mode: AnalysisMode,
+    params: SegmentationParams,
+    instrument: bool,
+) -> Record:
+    inst = Instrumentation(key) if instrument else None
+    try:
+        result = _run_analysis(img, mode, params, inst)
+    except Exception as e:
+        record: Record = {"path": key, "status": "error", "error": str(e)}
+    else:
+        record = {"path": key, "status": "ok", **result.to_dict()}
+
+    if inst is not None:
+        record["metrics"] = inst.metrics.to_dict()
+    return record
+
+
+def _analyze_shared_frame(
+    key: str,
+    frame: SharedFrame,
+    mode: AnalysisMode,
+    params: SegmentationParams,
+    instrument: bool,
+) -> Record:
+    # Worker hanya menempel ke blok milik proses induk; proses induk yang
+    # bertanggung jawab melakukan unlink
+    shm = SharedMemory(name=frame.name, track=False)
+    try:
+        img = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+        try:
+            return _analyze_frame(key, img, mode, params, instrument)
+        finally:
+            del img
+    finally:
+        shm.close()
+
+
+def _to_shared_frame(img: MatLike) -> tuple[SharedMemory, SharedFrame]:
+    array = np.ascontiguousarray(img)
+    shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    del view
+    return shm, SharedFrame(name=shm.name, shape=array.shape, dtype=array.dtype.str)
+
+
+def _release(shm: SharedMemory) -> None:
+    shm.close()
+    shm.unlink()
+
+
+def _completed(record: Record) -> Future[Record]:
+    future: Future[Record] = Future()
+    future.set_result(record)
+    return future
+
+
+@final
+class BatchRunner:
+    """
+    Menjalankan analisis banyak gambar secara paralel di process pool.
+
+    File didecode langsung di proses worker, sedangkan gambar yang sudah ada
+    di memori dikirim melalui shared memory sehingga array besar tidak
+    di-pickle. Hasil dikembalikan sesuai urutan selesai, bukan urutan input.
+    """
+
+    def __init__(
+        self,
+        mode: AnalysisMode = "segmentation",
+        params: SegmentationParams = DEFAULT_PARAMS,
+        workers: int | None = None,
+        max_in_flight: int | None = None,
+        cache: ResultCache | None = None,
+        store_masks: bool = False,
+        instrument: bool = False,
+        cv_threads: int | None = None,
+    ):
+        """
+        Inisialisasi runner.
+
+        Args:
+            mode: Salah satu dari ANALYSIS_MODES.
+            params: Parameter pipeline segmentasi.
+            workers: Jumlah proses worker (default: jumlah CPU).
+            max_in_flight: Batas jumlah tugas yang berjalan bersamaan
+                (default: dua kali jumlah worker).
+            cache: Cache hasil di disk untuk run_paths (opsional).
+            store_masks: Jika True, mask intermediate segmentasi ikut
+                disimpan di cache.
+            instrument: Jika True, setiap record yang dianalisis ulang
+                (bukan dari cache) membawa ukuran per tahap pada kunci
+                "metrics".
+            cv_threads: Jumlah thread internal OpenCV per worker (default:
+                bawaan OpenCV), misalnya dari plan_parallelism.
+        """
+        self.mode: AnalysisMode = mode
+        self.params = params
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 2
+        self.cache = cache
+        self.store_masks = store_masks
+        self.instrument = instrument
+        self.cv_threads = cv_threads
+        self._executor: ProcessPoolExecutor | None = None
+        if cv_threads is not None and self.workers == 1:
+            # Tanpa pool, analisis berjalan di proses ini
+            configure_threads(cv_threads)
+
+    def __enter__(self) -> "BatchRunner":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Menghentikan process pool jika sudah dibuat.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            if self.cv_threads is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=configure_threads,
+                    initargs=(self.cv_threads,),
+                )
+        return self._executor
+
+    def run_paths(self, paths: Iterable[str]) -> Iterator[Record]:
+        """
+        Menganalisis file gambar; decode dilakukan di proses worker.
+
+        Jika cache dipasang, file yang isi dan parameternya sudah pernah
+        dianalisis langsung diambil dari cache tanpa decode ulang.
+
+        Args:
+            paths: Path file gambar.
+
+        Yields:
+            Record hasil analisis sesuai urutan selesai.
+        """
+        yield from self._stream(paths, self._submit_path)
+
+    def _submit_path(self, path: str) -> tuple[Future[Record], Finalizer | None]:
+        cache = self.cache
+        key = None
+        if cache is not None:
+            try:
+                key = make_key(hash_file(path), self.mode, self.params)
+            except OSError:
+                # Biarkan worker yang melaporkan file yang tidak terbaca
+                key = None
+            cached = cache.get(key) if key is not None else None
+            if cached is not None:
+                return _completed({"path": path, **cached}), None
+
+        masks_path = None
+        if cache is not None and key is not None and self.store_masks:
+            masks_path = cache.mask_path(key)
+
+        args = (path, self.mode, self.params, masks_path, self.instrument)
+        if self.workers == 1:
+            future = _completed(analyze_record(*args))
+        else:
+            future = self._pool().submit(analyze_record, *args)
+
+        if cache is None or key is None:
+            return future, None
+
+        def store(record: Record | None, key: str = key) -> None:
+            # Error bisa bersifat sementara (I/O, memori) sehingga tidak disimpan
+            if record is not None and record["status"] == "ok":
+                excluded = ("path", "metrics")
+                cache.put(key, {k: v for k, v in record.items() if k not in excluded})
+
+        return future, store
+
+    def run_packed(self, prefix: str) -> Iterator[Record]:
+        """
+        Menganalisis semua gambar dataset hasil pack_dataset.
+
+        Worker membuka dataset sendiri melalui memory map sehingga yang
+        dikirim per tugas hanya nomor gambar. Cache hasil tidak dipakai
+        karena gambar sudah tidak perlu didecode.
+
+        Args:
+            prefix: Awalan nama file dataset.
+
+        Yields:
+            Record hasil analisis sesuai urutan selesai.
+
+        Raises:
+            ValueError: Jika dataset tidak dapat dibuka atau lebarnya lebih
+                kecil dari lebar parameter.
+        """
+        dataset = _dataset(prefix)
+        if dataset.width < self.params.width:
+            raise ValueError(
+                f"Lebar dataset {dataset.width} lebih kecil dari lebar analisis "
+                f"{self.params.width}"
+            )
+
+        def submit(index: int) -> tuple[Future[Record], Finalizer | None]:
+            args = (prefix, index, self.mode, self.params, self.instrument)
+            if self.workers == 1:
+                return _completed(analyze_packed(*args)), None
+            return self._pool().submit(analyze_packed, *args), None
+
+        yield from self._stream(range(len(dataset)), submit)
+
+    def run_frames(self, frames: Iterable[tuple[str, MatLike]]) -> Iterator[Record]:
+        """
+        Menganalisis gambar yang sudah ada di memori melalui shared memory.
+
+        Args:
+            frames: Pasangan (kunci, gambar BGR); kunci dipakai sebagai "path"
+                pada record.
+
+        Yields:
+            Record hasil analisis sesuai urutan selesai.
+        """
+        if self.workers == 1:
+            for key, img in frames:
+                yield _analyze_frame(key, img, self.mode, self.params, self.instrument)
+            return
+
+        pool = self._pool()
+
+        def submit(item: tuple[str, MatLike]) -> tuple[Future[Record], Finalizer]:
+            key, img = item
+            shm, frame = _to_shared_frame(img)
+            try:
+                future = pool.submit(
+                    _analyze_shared_frame,
+                    key,
+                    frame,
+                    self.mode,
+                    self.params,
+                    self.instrument,
+                )
+            except BaseException:
+                _release(shm)
+                raise
+            return future, lambda _: _release(shm)
+
+        yield from self._stream(frames, submit)
+
+    def _stream[T](
+        self,
+        items: Iterable[T],
+        submit: Callable[[T], tuple[Future[Record], Finalizer | None]],
+    ) -> Iterator[Record]:
+        pending: dict[Future[Record], Finalizer | None] = {}
+        iterator = iter(items)
+        exhausted = False
+        try:
+            while pending or not exhausted:
+                # Isi antrean sampai batas in-flight agar memori tetap terbatas
+                while not exhausted and len(pending) < self.max_in_flight:
+                    try:
+                        item = next(iterator)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    future, finalizer = submit(item)
+                    pending[future] = finalizer
+
+                if not pending:
+                    break
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finalizer = pending.pop(future)
+                    record: Record | None = None
+                    try:
+                        record = future.result()
+                    finally:
+                        # Sumber daya tetap dilepas jika worker gagal, misalnya
+                        # BrokenProcessPool
+                        if finalizer is not None:
+                            finalizer(record)
+                    yield record
+        finally:
+            for future, finalizer in pending.items():
+                _ = future.cancel()
+                if finalizer is not None:
+                    # Tunggu worker selesai membaca sebelum sumber daya dilepas
+                    _ = wait([future])
+                    finalizer(None)
@@ -0,0 +1,215 @@
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict
+from typing import cast, final
+
+import numpy as np
+
+from .segmentation import SegmentationParams, SegmentationResult
+
+# Naikkan jika format hasil atau perilaku pipeline berubah agar entri lama
+# tidak terpakai lagi
+CACHE_VERSION = 1
+
+# Gambar intermediate yang disimpan bersama hasil segmentasi
+MASK_NAMES = ("thresh_image", "img_morpho_copy", "imgg_inv")
+
+
+def hash_file(path: str) -> str:
+    """
+    Menghitung hash SHA-256 dari isi file.
+
+    Args:
+        path: Path ke file.
+
+    Returns:
+        Hash dalam bentuk heksadesimal.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def make_key(image_hash: str, mode: str, params: SegmentationParams) -> str:
+    """
+    Membuat kunci cache dari hash gambar, mode analisis, dan parameter pipeline.
+
+    Args:
+        image_hash: Hash isi file gambar.
+        mode: Mode analisis.
+        params: Parameter pipeline segmentasi.
+
+    Returns:
+        Kunci cache heksadesimal.
+    """
+    payload = json.dumps(
+        {
+            "version": CACHE_VERSION,
+            "image": image_hash,
+            "mode": mode,
+            "params": asdict(params),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def save_masks(path: str, result: SegmentationResult) -> None:
+    """
+    Menyimpan mask intermediate hasil segmentasi secara atomik.
+
+    Args:
+        path: Path file .npz tujuan.
+        result: Hasil segmentasi.
+    """
+    masks = {name: np.asarray(getattr(result, name)) for name in MASK_NAMES}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **masks)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@final
+class ResultCache:
+    """
+    Cache hasil analisis di disk dengan kunci berbasis isi file.
+
+    Setiap entri terdiri dari file JSON berisi record hasil dan, opsional,
+    file .npz berisi mask intermediate. Waktu akses terakhir disimpan sebagai
+    mtime file JSON; jika ukuran total melebihi batas, entri yang paling lama
+    tidak diakses dihapus lebih dulu (LRU).
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        Inisialisasi cache dan menghitung ukuran entri yang sudah ada.
+
+        Args:
+            directory: Direktori penyimpanan cache.
+            max_bytes: Batas ukuran total cache dalam byte.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._total = sum(size for _, _, size in self._entries())
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def mask_path(self, key: str) -> str:
+        """
+        Mengembalikan path file mask untuk kunci tertentu.
+
+        Args:
+            key: Kunci cache.
+
+        Returns:
+            Path file .npz.
+        """
+        return self._path(key, ".npz")
+
+    def get(self, key: str) -> dict[str, object] | None:
+        """
+        Mengambil record dari cache dan menandainya sebagai baru diakses.
+
+        Args:
+            key: Kunci cache.
+
+        Returns:
+            Record hasil analisis, atau None jika tidak ada di cache.
+        """
+        path = self._path(key, ".json")
+        try:
+            with open(path, encoding="utf-8") as f:
+                record = cast(dict[str, object], json.load(f))
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return record
+
+    def get_masks(self, key: str) -> dict[str, np.ndarray] | None:
+        """
+        Memuat mask intermediate dari cache.
+
+        Args:
+            key: Kunci cache.
+
+        Returns:
+            Dictionary nama mask ke array, atau None jika tidak disimpan.
+        """
+        try:
+            with np.load(self.mask_path(key)) as data:
+                return {name: data[name] for name in MASK_NAMES}
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def put(self, key: str, record: dict[str, object]) -> None:
+        """
+        Menyimpan record ke cache lalu menjalankan eviksi jika perlu.
+
+        File mask untuk kunci yang sama (jika sudah ditulis dengan save_masks)
+        ikut diperhitungkan dalam ukuran entri.
+
+        Args:
+            key: Kunci cache.
+            record: Record hasil analisis.
+        """
+        path = self._path(key, ".json")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        previous = self._entry_size(key)
+
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(record, f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+        self._total += self._entry_size(key) - previous
+        if self._total > self.max_bytes:
+            self._evict()
+
+    def _entry_size(self, key: str) -> int:
+        size = 0
+        for suffix in (".json", ".npz"):
+            try:
+                size += os.path.getsize(self._path(key, suffix))
+            except OSError:
+                pass
+        return size
+
+    def _entries(self) -> list[tuple[float, str, int]]:
+        entries: list[tuple[float, str, int]] = []
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".json"):
+                    key = entry.name.removesuffix(".json")
+                    mtime = entry.stat().st_mtime
+                    entries.append((mtime, key, self._entry_size(key)))
+        return entries
+
+    def _evict(self) -> None:
+        # Sisakan ruang agar eviksi tidak terjadi pada setiap put berikutnya
+        target = int(self.max_bytes * 0.9)
+        entries = sorted(self._entries())
+        self._total = sum(size for _, _, size in entries)
+
+        for _, key, size in entries:
+            if self._total <= target:
+                break
+            for suffix in (".json", ".npz"):
+                try:
+                    os.remove(self._path(key, suffix))
+                except OSError:
+                    pass
+            self._total -= size
@@ -0,0 +1,24 @@
+from threading import Event
+
+
+class AnalysisCancelled(Exception):
+    """
+    Dilempar ketika analisis dibatalkan sebelum selesai.
+    """
+
+
+def check_cancelled(cancel: Event | None) -> None:
+    """
+    Menghentikan analisis jika pembatalan sudah diminta.
+
+    Pipeline memanggil fungsi ini di antara tahap pemrosesan, karena
+    pemanggilan OpenCV yang sedang berjalan tidak dapat diinterupsi.
+
+    Args:
+        cancel: Event pembatalan (opsional).
+
+    Raises:
+        AnalysisCancelled: Jika event pembatalan sudah diset.
+    """
+    if cancel is not None and cancel.is_set():
+        raise AnalysisCancelled("Analisis dibatalkan")
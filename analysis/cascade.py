@@ -0,0 +1,135 @@
+from dataclasses import dataclass
+
+from cv2.typing import MatLike
+
+from utils import resize_image
+
+from .instrumentation import Instrumentation, measure
+from .intensity import IntensityResult, analyze_intensity
+from .segmentation import (
+    DEFAULT_PARAMS,
+    SegmentationParams,
+    SegmentationResult,
+    segment_image,
+    to_grayscale,
+)
+from .workspace import Workspace
+
+
+@dataclass
+class CascadeResult:
+    """
+    Hasil analisis bertingkat: screening intensitas lalu segmentasi.
+
+    Attributes:
+        screen: Hasil screening mean intensity pada gambar kecil.
+        segmentation: Hasil segmentasi, atau None jika gambar dianggap sehat
+            pada tahap screening atau segmentasi gagal.
+        intensity: Hasil mean intensity pada lebar analisis, atau None jika
+            gambar dianggap sehat pada tahap screening.
+        segmentation_error: Pesan error segmentasi, jika ada.
+    """
+
+    screen: IntensityResult
+    segmentation: SegmentationResult | None = None
+    intensity: IntensityResult | None = None
+    segmentation_error: str | None = None
+
+    @property
+    def screened_out(self) -> bool:
+        """
+        True jika segmentasi dilewati karena screening menyatakan sehat.
+        """
+        return self.intensity is None
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengubah hasil numerik (tanpa gambar) menjadi dictionary.
+
+        Mean, standard deviation, dan diagnosis diambil dari analisis pada
+        lebar analisis jika gambar lolos screening, sehingga sama dengan mode
+        intensity dan combined; gambar yang selesai di screening melaporkan
+        nilai screening.
+
+        Returns:
+            Dictionary berisi hasil intensitas, penanda screened_out, dan
+            hasil segmentasi atau pesan error segmentasi jika dijalankan.
+        """
+        intensity = self.intensity or self.screen
+        record = {**intensity.to_dict(), "screened_out": self.screened_out}
+        if self.segmentation is not None:
+            record.update(self.segmentation.to_dict())
+        elif self.segmentation_error is not None:
+            record["segmentation_error"] = self.segmentation_error
+        return record
+
+
+def needs_segmentation(
+    mean_val: float, params: SegmentationParams = DEFAULT_PARAMS
+) -> bool:
+    """
+    Menentukan apakah hasil screening perlu dilanjutkan ke segmentasi.
+
+    Gambar dilanjutkan jika mean berada di pita batas (kurang dari
+    screen_margin di bawah mild_threshold) atau di atasnya.
+
+    Args:
+        mean_val: Mean intensity hasil screening.
+        params: Parameter pipeline.
+
+    Returns:
+        True jika segmentasi perlu dijalankan.
+    """
+    return mean_val >= params.mild_threshold - params.screen_margin
+
+
+def analyze_cascade(
+    img: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+    workspace: Workspace | None = None,
+) -> CascadeResult:
+    """
+    Menjalankan screening mean intensity, lalu segmentasi jika diperlukan.
+
+    Screening memakai gambar yang diperkecil ke screen_width sehingga mata
+    yang jelas sehat selesai tanpa Hough maupun pencarian kontur. Gambar yang
+    lolos screening dianalisis ulang pada lebar params.width; konversi
+    grayscale-nya dipakai bersama oleh intensitas dan segmentasi. Seperti
+    analyze_combined, kegagalan mendeteksi iris/pupil tidak membatalkan hasil
+    intensitas.
+
+    Args:
+        img: Gambar input (BGR) yang belum di-resize.
+        params: Parameter pipeline.
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+        workspace: Buffer yang dipakai ulang untuk segmentasi (opsional).
+
+    Returns:
+        Hasil screening dan, jika dijalankan, hasil intensitas pada lebar
+        analisis beserta hasil atau pesan error segmentasi.
+    """
+    with measure(instrumentation, "screen"):
+        small = resize_image(img, width=params.screen_width)
+        screen = analyze_intensity(
+            small,
+            mild_threshold=params.mild_threshold,
+            severe_threshold=params.severe_threshold,
+        )
+    if not needs_segmentation(screen.mean_val, params):
+        return CascadeResult(screen)
+
+    with measure(instrumentation, "resize"):
+        img = resize_image(img, width=params.width)
+    with measure(instrumentation, "grayscale"):
+        gray = to_grayscale(img, workspace)
+    intensity = analyze_intensity(
+        gray, instrumentation, params.mild_threshold, params.severe_threshold
+    )
+    try:
+        segmentation = segment_image(
+            img, params, instrumentation=instrumentation, workspace=workspace, gray=gray
+        )
+    except ValueError as e:
+        return CascadeResult(screen, intensity=intensity, segmentation_error=str(e))
+    return CascadeResult(screen, segmentation, intensity)
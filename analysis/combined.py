@@ -0,0 +1,129 @@
+from dataclasses import dataclass
+from threading import Event
+
+from cv2.typing import MatLike
+
+from utils import load_image, resize_image
+
+from .cancellation import check_cancelled
+from .instrumentation import Instrumentation, measure
+from .intensity import IntensityResult, analyze_intensity
+from .segmentation import (
+    DEFAULT_PARAMS,
+    SegmentationParams,
+    SegmentationResult,
+    segment_image,
+    to_grayscale,
+)
+from .workspace import Workspace
+
+
+@dataclass
+class CombinedResult:
+    """
+    Hasil kedua algoritma (mean intensity dan segmentasi) untuk satu gambar.
+
+    Attributes:
+        intensity: Hasil analisis mean intensity beserta histogram.
+        segmentation: Hasil segmentasi, atau None jika segmentasi gagal.
+        segmentation_error: Pesan error segmentasi, jika ada.
+    """
+
+    intensity: IntensityResult
+    segmentation: SegmentationResult | None = None
+    segmentation_error: str | None = None
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengubah hasil numerik (tanpa gambar) menjadi satu laporan gabungan.
+
+        Returns:
+            Dictionary berisi hasil intensitas dan hasil segmentasi atau
+            pesan error segmentasi.
+        """
+        record = self.intensity.to_dict()
+        if self.segmentation is not None:
+            record.update(self.segmentation.to_dict())
+        else:
+            record["segmentation_error"] = self.segmentation_error
+        return record
+
+
+def analyze_combined(
+    img: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+    workspace: Workspace | None = None,
+    gray: MatLike | None = None,
+) -> CombinedResult:
+    """
+    Menjalankan kedua algoritma dari satu konversi grayscale.
+
+    Gambar grayscale dipakai bersama oleh analisis intensitas dan
+    segmentasi. Kegagalan mendeteksi iris/pupil tidak membatalkan hasil
+    intensitas.
+
+    Args:
+        img: Gambar input (BGR) yang sudah di-resize.
+        params: Parameter pipeline segmentasi.
+        cancel: Event pembatalan yang diperiksa di antara tahap (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+        workspace: Buffer yang dipakai ulang untuk segmentasi (opsional).
+        gray: Versi grayscale img yang sudah dihitung pemanggil (opsional).
+
+    Returns:
+        Hasil gabungan kedua algoritma.
+
+    Raises:
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    if gray is None:
+        with measure(instrumentation, "grayscale"):
+            gray = to_grayscale(img, workspace)
+
+    intensity = analyze_intensity(
+        gray, instrumentation, params.mild_threshold, params.severe_threshold
+    )
+    with measure(instrumentation, "histogram"):
+        _ = intensity.histogram
+    check_cancelled(cancel)
+
+    try:
+        segmentation = segment_image(
+            img, params, cancel, instrumentation, workspace, gray=gray
+        )
+    except ValueError as e:
+        return CombinedResult(intensity, segmentation_error=str(e))
+    return CombinedResult(intensity, segmentation)
+
+
+def analyze_combined_file(
+    path: str,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> CombinedResult:
+    """
+    Memuat, mengubah ukuran, dan menganalisis gambar dengan kedua algoritma.
+
+    Args:
+        path: Path ke file gambar.
+        params: Parameter pipeline segmentasi.
+        cancel: Event pembatalan yang diperiksa di antara tahap (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+
+    Returns:
+        Hasil gabungan kedua algoritma.
+
+    Raises:
+        ValueError: Jika gambar tidak dapat dibaca.
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    with measure(instrumentation, "decode"):
+        img = load_image(path, width=params.width)
+    check_cancelled(cancel)
+
+    with measure(instrumentation, "resize"):
+        img = resize_image(img, width=params.width)
+    return analyze_combined(img, params, cancel, instrumentation)
@@ -0,0 +1,226 @@
+import json
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import cast, final
+
+import numpy as np
+from cv2.typing import MatLike
+from numpy.typing import NDArray
+
+from utils import load_image, resize_image
+
+# Naikkan jika tata letak atau isi file berubah agar dataset lama ditolak
+PACK_VERSION = 2
+
+# Awal setiap gambar diratakan ke kelipatan ini agar baris pertama sejajar
+# dengan cache line
+ALIGNMENT = 64
+
+# Satu entri per gambar: posisi byte awal di file data dan ukuran gambar
+INDEX_DTYPE = np.dtype([("offset", "<u8"), ("height", "<u4"), ("width", "<u4")])
+
+
+def _files(prefix: str) -> tuple[str, str, str]:
+    return f"{prefix}.bin", f"{prefix}.idx.npy", f"{prefix}.json"
+
+
+def _prepare(path: str, width: int) -> tuple[MatLike, MatLike] | str:
+    # Dijalankan di proses worker; error dikembalikan sebagai pesan.
+    # Bidang grayscale didecode langsung ke grayscale seperti mode intensity
+    # agar mean dan diagnosis sama dengan analisis tanpa pack
+    try:
+        img = resize_image(load_image(path, width=width), width=width)
+        gray = resize_image(load_image(path, width=width, gray=True), width=width)
+    except ValueError as e:
+        return str(e)
+    if gray.shape != img.shape[:2]:
+        return "Ukuran hasil decode grayscale dan BGR berbeda"
+    return img, gray
+
+
+def _prepared(
+    paths: Iterable[str], width: int, workers: int, stack: ExitStack
+) -> Iterator[tuple[str, tuple[MatLike, MatLike] | str]]:
+    if workers == 1:
+        for path in paths:
+            yield path, _prepare(path, width)
+        return
+
+    # Jendela tugas dibatasi agar gambar hasil decode yang menunggu ditulis
+    # tidak menumpuk di memori; hasil tetap diambil sesuai urutan input
+    pool = stack.enter_context(ProcessPoolExecutor(workers))
+    window = workers * 2
+    pending: deque[tuple[str, Future[tuple[MatLike, MatLike] | str]]] = deque()
+    for path in paths:
+        pending.append((path, pool.submit(_prepare, path, width)))
+        if len(pending) >= window:
+            done_path, future = pending.popleft()
+            yield done_path, future.result()
+    while pending:
+        done_path, future = pending.popleft()
+        yield done_path, future.result()
+
+
+def pack_dataset(
+    paths: Iterable[str],
+    prefix: str,
+    width: int = 500,
+    workers: int | None = None,
+) -> tuple[int, dict[str, str]]:
+    """
+    Mendecode dan mengubah ukuran gambar sekali, lalu menyimpannya dalam
+    satu file data yang dapat di-memory-map.
+
+    Dataset terdiri dari tiga file: prefix.bin berisi bidang BGR diikuti
+    bidang grayscale setiap gambar secara berurutan, prefix.idx.npy berisi
+    offset dan ukuran setiap gambar, dan prefix.json berisi versi format,
+    lebar, serta daftar path. Bidang grayscale didecode langsung ke
+    grayscale seperti mode intensity, bukan dikonversi dari bidang BGR.
+
+    Semua file ditulis ke nama sementara lebih dulu. Metadata lama dihapus
+    sebelum file data dan indeks diganti, dan metadata baru dipindahkan
+    terakhir, sehingga dataset yang terpotong atau setengah diganti tidak
+    dapat dibuka.
+
+    Args:
+        paths: Path file gambar.
+        prefix: Awalan nama file dataset.
+        width: Lebar gambar yang disimpan.
+        workers: Jumlah proses untuk decode (default: jumlah CPU).
+
+    Returns:
+        Tuple berisi jumlah gambar yang disimpan dan path yang gagal beserta
+        pesan error-nya.
+    """
+    files = _files(prefix)
+    data_tmp, index_tmp, meta_tmp = (f"{path}.tmp" for path in files)
+    workers = workers or os.cpu_count() or 1
+
+    stored: list[str] = []
+    entries: list[tuple[int, int, int]] = []
+    failed: dict[str, str] = {}
+    offset = 0
+    with ExitStack() as stack:
+        f = stack.enter_context(open(data_tmp, "wb"))
+        for path, prepared in _prepared(paths, width, workers, stack):
+            if isinstance(prepared, str):
+                failed[path] = prepared
+                continue
+
+            img, gray = prepared
+            h, w = cast(tuple[int, int], gray.shape)
+            padding = -offset % ALIGNMENT
+            _ = f.write(bytes(padding))
+            offset += padding
+
+            entries.append((offset, h, w))
+            stored.append(path)
+            for plane in (img, gray):
+                data = np.ascontiguousarray(plane).data
+                _ = f.write(data)
+                offset += data.nbytes
+
+    with open(index_tmp, "wb") as f:
+        np.save(f, np.array(entries, dtype=INDEX_DTYPE))
+    meta = {"version": PACK_VERSION, "width": width, "paths": stored, "failed": failed}
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    data_path, index_path, meta_path = files
+    try:
+        os.remove(meta_path)
+    except FileNotFoundError:
+        pass
+    os.replace(data_tmp, data_path)
+    os.replace(index_tmp, index_path)
+    os.replace(meta_tmp, meta_path)
+    return len(stored), failed
+
+
+@final
+class PackedDataset:
+    """
+    Dataset hasil pack_dataset yang dibaca melalui memory map.
+
+    Gambar dikembalikan sebagai view read-only ke file data tanpa decode
+    maupun salinan; setelah halaman file ada di page cache, pembacaan
+    berikutnya tidak menyentuh disk. Bidang grayscale adalah hasil decode
+    grayscale seperti pada mode intensity.
+    """
+
+    def __init__(self, prefix: str):
+        """
+        Membuka dataset.
+
+        Args:
+            prefix: Awalan nama file dataset.
+
+        Raises:
+            ValueError: Jika dataset tidak ada atau versi formatnya berbeda.
+        """
+        data_path, index_path, meta_path = _files(prefix)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = cast(dict[str, object], json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Gagal membuka dataset {prefix}: {e}") from e
+        if meta.get("version") != PACK_VERSION:
+            raise ValueError(f"Versi format dataset {prefix} tidak didukung")
+
+        self.prefix = prefix
+        self.width = cast(int, meta["width"])
+        self.paths = cast(list[str], meta["paths"])
+        self.failed = cast(dict[str, str], meta["failed"])
+        self.index: NDArray[np.void] = np.load(index_path)
+        # File kosong tidak dapat di-memory-map
+        self._data: NDArray[np.uint8] = (
+            np.memmap(data_path, dtype=np.uint8, mode="r")
+            if os.path.getsize(data_path) > 0
+            else np.empty(0, dtype=np.uint8)
+        )
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def _plane(self, i: int, channels: int) -> MatLike:
+        entry = self.index[i]
+        offset = int(entry["offset"])  # pyright: ignore[reportAny]
+        h = int(entry["height"])  # pyright: ignore[reportAny]
+        w = int(entry["width"])  # pyright: ignore[reportAny]
+        if channels == 1:
+            # Bidang grayscale terletak tepat setelah bidang BGR
+            offset += h * w * 3
+        size = h * w * channels
+        plane = self._data[offset : offset + size]
+        return plane.reshape((h, w, 3) if channels == 3 else (h, w))
+
+    def image(self, i: int) -> MatLike:
+        """
+        Mengambil gambar BGR ke-i.
+
+        Args:
+            i: Nomor gambar.
+
+        Returns:
+            View read-only berukuran (tinggi, width, 3).
+        """
+        return self._plane(i, 3)
+
+    def gray(self, i: int) -> MatLike:
+        """
+        Mengambil gambar grayscale ke-i.
+
+        Args:
+            i: Nomor gambar.
+
+        Returns:
+            View read-only berukuran (tinggi, width).
+        """
+        return self._plane(i, 1)
+
+    def __iter__(self) -> Iterator[tuple[str, MatLike, MatLike]]:
+        for i, path in enumerate(self.paths):
+            yield path, self.image(i), self.gray(i)
@@ -0,0 +1,316 @@
+import json
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import TextIO, cast, final
+
+
+@dataclass
+class StageMetrics:
+    """
+    Ukuran satu tahap pipeline untuk satu gambar.
+
+    Attributes:
+        wall_s: Waktu wall-clock dalam detik.
+        cpu_s: Waktu CPU thread yang menjalankan tahap dalam detik (tidak
+            termasuk thread internal OpenCV).
+        alloc_bytes: Puncak alokasi memori selama tahap, atau 0 jika
+            tracemalloc tidak aktif atau pengukuran alokasi dimatikan.
+    """
+
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    alloc_bytes: int = 0
+
+
+@dataclass
+class ImageMetrics:
+    """
+    Ukuran semua tahap dan jumlah objek yang ditemukan untuk satu gambar.
+
+    Attributes:
+        key: Identitas gambar (biasanya path).
+        stages: Ukuran per tahap sesuai urutan eksekusi.
+        counts: Jumlah objek, misalnya lingkaran Hough atau kontur.
+    """
+
+    key: str = ""
+    stages: dict[str, StageMetrics] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengubah ukuran menjadi dictionary yang dapat diserialisasi ke JSON.
+
+        Returns:
+            Dictionary berisi key, stages, dan counts.
+        """
+        return {
+            "key": self.key,
+            "stages": {
+                name: {
+                    "wall_s": stage.wall_s,
+                    "cpu_s": stage.cpu_s,
+                    "alloc_bytes": stage.alloc_bytes,
+                }
+                for name, stage in self.stages.items()
+            },
+            "counts": dict(self.counts),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, object]) -> "ImageMetrics":
+        """
+        Membuat ImageMetrics dari hasil to_dict.
+
+        Args:
+            data: Dictionary hasil to_dict.
+
+        Returns:
+            Objek ImageMetrics.
+        """
+        stages = cast(dict[str, dict[str, float]], data["stages"])
+        return cls(
+            key=cast(str, data["key"]),
+            stages={
+                name: StageMetrics(
+                    wall_s=float(s["wall_s"]),
+                    cpu_s=float(s["cpu_s"]),
+                    alloc_bytes=int(s["alloc_bytes"]),
+                )
+                for name, s in stages.items()
+            },
+            counts=dict(cast(dict[str, int], data["counts"])),
+        )
+
+
+@final
+class Instrumentation:
+    """
+    Pengumpul ukuran opt-in untuk satu eksekusi pipeline.
+
+    Fungsi pipeline menerima Instrumentation | None; jika None, tidak ada
+    pengukuran sama sekali. Waktu CPU diukur per thread sehingga tahap yang
+    berjalan bersamaan di thread lain tidak ikut terhitung. Alokasi memori
+    hanya diukur jika tracemalloc sedang aktif dan track_alloc True.
+
+    Puncak tracemalloc bersifat global untuk seluruh proses, sehingga
+    pengukuran alokasi hanya benar jika satu gambar dianalisis pada satu
+    waktu (proses worker BatchRunner). Pipeline berbasis thread seperti
+    StreamingPipeline harus membuatnya dengan track_alloc=False.
+    """
+
+    def __init__(self, key: str = "", track_alloc: bool = True):
+        """
+        Inisialisasi pengumpul untuk satu gambar.
+
+        Args:
+            key: Identitas gambar (biasanya path).
+            track_alloc: Jika False, alokasi memori tidak diukur meskipun
+                tracemalloc aktif.
+        """
+        self.metrics = ImageMetrics(key=key)
+        self.track_alloc = track_alloc
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mengukur waktu dan alokasi satu tahap.
+
+        Args:
+            name: Nama tahap.
+        """
+        tracing = self.track_alloc and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+        else:
+            base = 0
+
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield
+        finally:
+            stage = self.metrics.stages.setdefault(name, StageMetrics())
+            stage.wall_s += time.perf_counter() - wall
+            stage.cpu_s += time.thread_time() - cpu
+            if tracing:
+                _, peak = tracemalloc.get_traced_memory()
+                stage.alloc_bytes += max(peak - base, 0)
+
+    def count(self, name: str, value: int) -> None:
+        """
+        Mencatat jumlah objek yang ditemukan pada suatu tahap.
+
+        Args:
+            name: Nama ukuran, misalnya "contours_cat".
+            value: Jumlah objek.
+        """
+        self.metrics.counts[name] = self.metrics.counts.get(name, 0) + value
+
+
+@contextmanager
+def measure(instrumentation: Instrumentation | None, name: str) -> Iterator[None]:
+    """
+    Mengukur satu tahap jika instrumentation diberikan.
+
+    Args:
+        instrumentation: Pengumpul ukuran (opsional).
+        name: Nama tahap.
+    """
+    if instrumentation is None:
+        yield
+    else:
+        with instrumentation.stage(name):
+            yield
+
+
+def record_count(
+    instrumentation: Instrumentation | None, name: str, value: int
+) -> None:
+    """
+    Mencatat jumlah objek jika instrumentation diberikan.
+
+    Args:
+        instrumentation: Pengumpul ukuran (opsional).
+        name: Nama ukuran.
+        value: Jumlah objek.
+    """
+    if instrumentation is not None:
+        instrumentation.count(name, value)
+
+
+@dataclass
+class _Summary:
+    calls: int = 0
+    total: float = 0.0
+    maximum: float = 0.0
+    max_key: str = ""
+
+    def add(self, value: float, key: str) -> None:
+        self.calls += 1
+        self.total += value
+        if value >= self.maximum:
+            self.maximum = value
+            self.max_key = key
+
+
+@final
+class MetricsAggregator:
+    """
+    Menggabungkan ukuran banyak gambar dalam satu batch.
+
+    Ukuran per gambar dapat langsung ditulis sebagai JSON lines, sedangkan
+    agregatnya (total, jumlah, maksimum) diekspor dalam format teks
+    Prometheus. Hanya agregat yang disimpan di memori.
+    """
+
+    def __init__(self, jsonl: TextIO | None = None):
+        """
+        Inisialisasi agregator.
+
+        Args:
+            jsonl: Stream tujuan untuk ukuran per gambar (opsional).
+        """
+        self.jsonl = jsonl
+        self.images = 0
+        self._wall: dict[str, _Summary] = {}
+        self._cpu: dict[str, _Summary] = {}
+        self._alloc: dict[str, _Summary] = {}
+        self._counts: dict[str, _Summary] = {}
+
+    def add(self, metrics: ImageMetrics) -> None:
+        """
+        Menambahkan ukuran satu gambar.
+
+        Args:
+            metrics: Ukuran satu gambar.
+        """
+        self.images += 1
+        key = metrics.key
+        for name, stage in metrics.stages.items():
+            self._wall.setdefault(name, _Summary()).add(stage.wall_s, key)
+            self._cpu.setdefault(name, _Summary()).add(stage.cpu_s, key)
+            self._alloc.setdefault(name, _Summary()).add(stage.alloc_bytes, key)
+        for name, value in metrics.counts.items():
+            self._counts.setdefault(name, _Summary()).add(value, key)
+
+        if self.jsonl is not None:
+            _ = self.jsonl.write(json.dumps(metrics.to_dict()) + "\n")
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengembalikan ringkasan agregat, termasuk gambar dengan nilai maksimum.
+
+        Returns:
+            Dictionary ringkasan per tahap dan per ukuran jumlah.
+        """
+
+        def summarize(summaries: dict[str, _Summary]) -> dict[str, object]:
+            return {
+                name: {
+                    "calls": s.calls,
+                    "total": s.total,
+                    "max": s.maximum,
+                    "max_key": s.max_key,
+                }
+                for name, s in summaries.items()
+            }
+
+        return {
+            "images": self.images,
+            "wall_s": summarize(self._wall),
+            "cpu_s": summarize(self._cpu),
+            "alloc_bytes": summarize(self._alloc),
+            "counts": summarize(self._counts),
+        }
+
+    def to_prometheus(self, prefix: str = "cataract") -> str:
+        """
+        Mengekspor agregat dalam format teks eksposisi Prometheus.
+
+        Args:
+            prefix: Awalan nama metrik.
+
+        Returns:
+            Teks eksposisi Prometheus.
+        """
+        lines = [
+            f"# HELP {prefix}_images_total Jumlah gambar yang diukur.",
+            f"# TYPE {prefix}_images_total counter",
+            f"{prefix}_images_total {self.images}",
+        ]
+
+        families = [
+            ("stage_seconds", "Waktu wall-clock per tahap.", "stage", self._wall),
+            ("stage_cpu_seconds", "Waktu CPU per tahap.", "stage", self._cpu),
+            ("stage_alloc_bytes", "Puncak alokasi per tahap.", "stage", self._alloc),
+            ("objects", "Jumlah objek yang ditemukan.", "name", self._counts),
+        ]
+        for metric, help_text, label, summaries in families:
+            name = f"{prefix}_{metric}"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} summary")
+            for key, s in summaries.items():
+                lines.append(f'{name}_sum{{{label}="{key}"}} {s.total:g}')
+                lines.append(f'{name}_count{{{label}="{key}"}} {s.calls}')
+
+            lines.append(f"# HELP {name}_max Nilai maksimum per gambar.")
+            lines.append(f"# TYPE {name}_max gauge")
+            for key, s in summaries.items():
+                lines.append(f'{name}_max{{{label}="{key}"}} {s.maximum:g}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = "cataract") -> None:
+        """
+        Menulis agregat ke file dalam format teks Prometheus.
+
+        Args:
+            path: Path file tujuan.
+            prefix: Awalan nama metrik.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            _ = f.write(self.to_prometheus(prefix))
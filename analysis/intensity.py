@@ -0,0 +1,276 @@
+from dataclasses import dataclass
+from functools import cached_property
+from threading import Event
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+from numpy.typing import NDArray
+
+from utils import load_image, resize_image
+
+from .cancellation import check_cancelled
+from .instrumentation import Instrumentation, measure
+
+# Batas mean intensity untuk diagnosis: di bawah MILD_THRESHOLD dianggap
+# sehat, sampai SEVERE_THRESHOLD katarak ringan, di atasnya katarak parah
+MILD_THRESHOLD = 50
+SEVERE_THRESHOLD = 100
+
+# Kode numerik status diagnosis untuk hasil berbentuk array
+DIAGNOSIS_CODES = {
+    "Tidak Ada Katarak": 1,
+    "Katarak Ringan": 2,
+    "Katarak Parah": 3,
+}
+
+# Hasil analyze_intensity_batch, satu baris per gambar
+INTENSITY_DTYPE = np.dtype(
+    [
+        ("mean", "<f8"),
+        ("std", "<f8"),
+        ("diagnosis", "u1"),
+        ("histogram", "<f4", (256,)),
+    ]
+)
+
+# Jumlah gambar yang diproses bersama; membatasi salinan kanal dan hasil
+# blur (masing-masing 1 byte per piksel per gambar) dan tetap di bawah batas
+# 512 kanal OpenCV
+BATCH_CHUNK = 64
+
+
+@dataclass
+class IntensityResult:
+    """
+    Hasil analisis mean intensity satu gambar mata.
+
+    Histogram baru dihitung saat pertama kali diakses.
+
+    Attributes:
+        mean_val: Nilai mean intensity dari gambar grayscale.
+        std_val: Nilai standard deviation dari gambar grayscale.
+        diagnosis: Tuple berisi status dan deskripsi diagnosis.
+        gray: Gambar grayscale yang telah dihaluskan.
+    """
+
+    mean_val: float
+    std_val: float
+    diagnosis: tuple[str, str]
+    gray: MatLike
+
+    @cached_property
+    def histogram(self) -> NDArray[np.float32]:
+        """
+        Jumlah piksel untuk setiap nilai intensitas 0..255.
+        """
+        return compute_histogram(self.gray)
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengubah hasil numerik (tanpa gambar) menjadi dictionary.
+
+        Returns:
+            Dictionary berisi mean, standard deviation, dan diagnosis.
+        """
+        status, description = self.diagnosis
+        return {
+            "mean": self.mean_val,
+            "std": self.std_val,
+            "diagnosis": status,
+            "description": description,
+        }
+
+
+def compute_histogram(gray: MatLike) -> NDArray[np.float32]:
+    """
+    Menghitung histogram 256 bin gambar grayscale dengan cv2.calcHist.
+
+    Args:
+        gray: Gambar grayscale uint8.
+
+    Returns:
+        Array 256 elemen berisi jumlah piksel per nilai intensitas.
+    """
+    hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
+    return hist.ravel()  # pyright: ignore[reportReturnType]
+
+
+def diagnose_cataract(
+    mean_val: float,
+    mild_threshold: float = MILD_THRESHOLD,
+    severe_threshold: float = SEVERE_THRESHOLD,
+) -> tuple[str, str]:
+    """
+    Mendiagnosis katarak berdasarkan nilai mean intensity.
+
+    Args:
+        mean_val: Nilai mean intensity dari gambar grayscale.
+        mild_threshold: Batas bawah katarak ringan.
+        severe_threshold: Batas atas katarak ringan.
+
+    Returns:
+        Tuple berisi status dan deskripsi diagnosis.
+    """
+    if mean_val < mild_threshold:
+        return "Tidak Ada Katarak", "Mata sehat"
+    elif mean_val <= severe_threshold:
+        return "Katarak Ringan", "Mata memiliki katarak ringan"
+    else:
+        return "Katarak Parah", "Mata memiliki katarak parah"
+
+
+def analyze_intensity(
+    img: MatLike,
+    instrumentation: Instrumentation | None = None,
+    mild_threshold: float = MILD_THRESHOLD,
+    severe_threshold: float = SEVERE_THRESHOLD,
+) -> IntensityResult:
+    """
+    Menghitung mean dan standard deviation intensitas pada gambar yang sudah di-resize.
+
+    Args:
+        img: Gambar input (BGR atau grayscale).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+        mild_threshold: Batas bawah katarak ringan untuk diagnosis.
+        severe_threshold: Batas atas katarak ringan untuk diagnosis.
+
+    Returns:
+        Hasil analisis intensitas beserta diagnosisnya.
+    """
+    with measure(instrumentation, "grayscale"):
+        gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    with measure(instrumentation, "blur"):
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+
+    # Hitung mean dan standard deviation
+    with measure(instrumentation, "mean_std"):
+        mean_arr, std_arr = cv2.meanStdDev(gray)
+    mean_val = float(mean_arr[0, 0])  # pyright: ignore[reportAny]
+    std_val = float(std_arr[0, 0])  # pyright: ignore[reportAny]
+
+    return IntensityResult(
+        mean_val=mean_val,
+        std_val=std_val,
+        diagnosis=diagnose_cataract(mean_val, mild_threshold, severe_threshold),
+        gray=gray,
+    )
+
+
+def diagnosis_codes(
+    means: NDArray[np.float64],
+    mild_threshold: float = MILD_THRESHOLD,
+    severe_threshold: float = SEVERE_THRESHOLD,
+) -> NDArray[np.uint8]:
+    """
+    Menerapkan batas diagnose_cataract pada array mean sekaligus.
+
+    Args:
+        means: Nilai mean intensity.
+        mild_threshold: Batas bawah katarak ringan.
+        severe_threshold: Batas atas katarak ringan.
+
+    Returns:
+        Kode DIAGNOSIS_CODES untuk setiap mean.
+    """
+    codes = np.full(means.shape, DIAGNOSIS_CODES["Katarak Parah"], np.uint8)
+    codes[means <= severe_threshold] = DIAGNOSIS_CODES["Katarak Ringan"]
+    codes[means < mild_threshold] = DIAGNOSIS_CODES["Tidak Ada Katarak"]
+    return codes
+
+
+def analyze_intensity_batch(
+    grays: NDArray[np.uint8],
+    mild_threshold: float = MILD_THRESHOLD,
+    severe_threshold: float = SEVERE_THRESHOLD,
+) -> NDArray[np.void]:
+    """
+    Menghitung blur, mean, standard deviation, histogram, dan diagnosis
+    untuk tumpukan gambar grayscale berukuran sama.
+
+    Setiap kelompok BATCH_CHUNK gambar dijadikan kanal satu gambar sehingga
+    satu GaussianBlur memproses semuanya tanpa mencampur piksel antar
+    gambar. Histogram setiap gambar dihitung cv2.calcHist langsung dari
+    kanalnya tanpa salinan, lalu mean dan standard deviation diturunkan dari
+    histogram. Hasilnya sama dengan analyze_intensity dan compute_histogram
+    per gambar, kecuali pembulatan floating point pada standard deviation.
+
+    Args:
+        grays: Array uint8 berukuran N x H x W.
+        mild_threshold: Batas bawah katarak ringan untuk diagnosis.
+        severe_threshold: Batas atas katarak ringan untuk diagnosis.
+
+    Returns:
+        Array terstruktur INTENSITY_DTYPE dengan N baris (kosong jika N nol).
+
+    Raises:
+        ValueError: Jika grays bukan array uint8 tiga dimensi atau gambarnya
+            tidak memiliki piksel.
+    """
+    if grays.ndim != 3 or grays.dtype != np.uint8:
+        raise ValueError("Input harus array uint8 berukuran N x H x W")
+
+    n, h, w = grays.shape
+    if n and h * w == 0:
+        raise ValueError("Gambar tidak memiliki piksel")
+    results = np.zeros(n, dtype=INTENSITY_DTYPE)
+    levels = np.arange(256, dtype=np.float64)
+    for start in range(0, n, BATCH_CHUNK):
+        chunk = grays[start : start + BATCH_CHUNK]
+        k = len(chunk)
+        channels = np.ascontiguousarray(chunk.transpose(1, 2, 0))
+        # OpenCV mengembalikan H x W untuk satu kanal
+        blurred = cv2.GaussianBlur(channels, (5, 5), 0).reshape(h, w, k)
+
+        # calcHist membaca satu kanal dari gambar multi-kanal secara langsung
+        hist = np.stack(
+            [
+                cv2.calcHist([blurred], [i], None, [256], [0, 256]).ravel()
+                for i in range(k)
+            ]
+        ).astype(np.float64)
+
+        mean = hist @ levels / (h * w)
+        var = hist @ (levels * levels) / (h * w) - mean * mean
+        rows = results[start : start + k]
+        rows["mean"] = mean
+        rows["std"] = np.sqrt(np.maximum(var, 0))
+        rows["histogram"] = hist
+
+    results["diagnosis"] = diagnosis_codes(
+        results["mean"], mild_threshold, severe_threshold
+    )
+    return results
+
+
+def analyze_intensity_file(
+    path: str,
+    width: int = 500,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> IntensityResult:
+    """
+    Memuat gambar dari file, mengubah ukurannya, dan menganalisis intensitasnya.
+
+    Args:
+        path: Path ke file gambar.
+        width: Lebar gambar setelah resize.
+        cancel: Event pembatalan yang diperiksa setelah decode (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+
+    Returns:
+        Hasil analisis intensitas.
+
+    Raises:
+        ValueError: Jika gambar tidak dapat dibaca.
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    # Hanya kanal grayscale yang dibutuhkan, jadi decode langsung ke grayscale
+    with measure(instrumentation, "decode"):
+        img = load_image(path, width=width, gray=True)
+    check_cancelled(cancel)
+
+    # Ubah ukuran gambar untuk konsistensi
+    with measure(instrumentation, "resize"):
+        img = resize_image(img, width=width)
+    return analyze_intensity(img, instrumentation)
@@ -0,0 +1,41 @@
+from collections.abc import Sequence
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+THUMBNAIL_SIZE = (120, 120)
+
+
+def render_mosaic(
+    images: Sequence[MatLike],
+    size: tuple[int, int] = THUMBNAIL_SIZE,
+    gap: int = 10,
+) -> MatLike:
+    """
+    Menyusun thumbnail gambar-gambar tahap pemrosesan menjadi satu mosaic.
+
+    Setiap gambar diperkecil dengan INTER_AREA langsung dari array numpy;
+    gambar grayscale disalin ke ketiga kanal tanpa konversi terpisah.
+
+    Args:
+        images: Gambar RGB atau grayscale (uint8).
+        size: Ukuran setiap thumbnail (lebar, tinggi).
+        gap: Jarak antar thumbnail dalam piksel.
+
+    Returns:
+        Gambar RGB berisi semua thumbnail dari kiri ke kanan.
+    """
+    width, height = size
+    count = len(images)
+    mosaic_width = max(count * width + (count - 1) * gap, 0)
+    # Latar belakang mengikuti warna default jendela Tk (#d9d9d9)
+    mosaic = np.full((height, mosaic_width, 3), 217, np.uint8)
+
+    for i, img in enumerate(images):
+        x = i * (width + gap)
+        thumbnail = cv2.resize(img, size, interpolation=cv2.INTER_AREA)
+        if thumbnail.ndim == 2:
+            thumbnail = thumbnail[:, :, np.newaxis]
+        mosaic[:, x : x + width] = thumbnail
+    return mosaic
@@ -0,0 +1,139 @@
+import os
+from collections.abc import Sequence
+from dataclasses import dataclass
+from itertools import islice
+
+import cv2
+
+from utils import decoded_shape
+
+from .segmentation import DEFAULT_PARAMS, SegmentationParams
+
+# Di bawah ukuran ini (piksel per gambar setelah resize) overhead membagi
+# filter, morfologi, dan resize ke beberapa thread lebih besar dari hasilnya
+PARALLEL_PIXELS = 500_000
+
+# Jumlah file yang headernya dibaca untuk memperkirakan ukuran gambar
+SIZE_SAMPLE = 16
+
+
+@dataclass(frozen=True)
+class ParallelPlan:
+    """
+    Pembagian core antara proses worker dan thread internal OpenCV.
+
+    Attributes:
+        workers: Jumlah proses worker (1 berarti analisis di proses utama).
+        cv_threads: Jumlah thread OpenCV per worker (cv2.setNumThreads).
+        reason: Penjelasan singkat mengapa konfigurasi ini dipilih.
+    """
+
+    workers: int
+    cv_threads: int
+    reason: str
+
+    def describe(self) -> str:
+        """
+        Mengembalikan ringkasan konfigurasi untuk ditampilkan ke pengguna.
+
+        Returns:
+            Teks berisi jumlah proses, thread OpenCV, dan alasannya.
+        """
+        return (
+            f"{self.workers} proses x {self.cv_threads} thread OpenCV "
+            f"({self.reason})"
+        )
+
+
+def image_pixels(
+    params: SegmentationParams = DEFAULT_PARAMS, paths: Sequence[str] = ()
+) -> int:
+    """
+    Memperkirakan jumlah piksel terbesar yang didecode dan diproses per
+    gambar.
+
+    Ukuran dibaca dari header beberapa file pertama, pada skala decode yang
+    sama dengan load_image untuk params.decode_width; dengan
+    resolution="multi" ini mencakup measure_width, atau resolusi asli jika
+    measure_width 0. Tanpa header yang terbaca, ukuran diperkirakan dari
+    lebar decode dengan aspect ratio 4:3, rasio umum kamera slit-lamp.
+
+    Args:
+        params: Parameter pipeline.
+        paths: Path file gambar (opsional).
+
+    Returns:
+        Perkiraan jumlah piksel.
+    """
+    width = params.decode_width
+    sizes: list[int] = []
+    for path in islice(paths, SIZE_SAMPLE):
+        shape = decoded_shape(path, width, gray=True)
+        if shape is not None:
+            sizes.append(shape[0] * shape[1])
+    if sizes:
+        return max(sizes)
+    if width is None:
+        # Resolusi asli yang tidak diketahui dianggap besar
+        return PARALLEL_PIXELS
+    return width * width * 3 // 4
+
+
+def plan_parallelism(
+    items: int | None,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    workers: int | None = None,
+    cpus: int | None = None,
+    paths: Sequence[str] = (),
+) -> ParallelPlan:
+    """
+    Memilih antara paralelisme antar-gambar (proses) dan intra-gambar
+    (thread OpenCV) agar jumlah thread tidak melebihi jumlah core.
+
+    Batch yang berisi setidaknya satu gambar per core mendapat satu proses
+    per core dengan OpenCV single-thread. Batch yang lebih kecil memakai
+    satu proses per gambar, dan core sisanya dibagi ke thread OpenCV jika
+    gambarnya cukup besar untuk mendapat manfaat (lihat image_pixels).
+
+    Args:
+        items: Jumlah gambar, atau None jika tidak diketahui (misalnya
+            mode watch).
+        params: Parameter pipeline; menentukan skala decode.
+        workers: Jumlah proses yang diminta pengguna (opsional); hanya
+            jumlah thread OpenCV yang dipilih.
+        cpus: Jumlah core (default: jumlah CPU).
+        paths: Path file gambar untuk membaca ukuran sebenarnya dari
+            header (opsional).
+
+    Returns:
+        Konfigurasi yang dipilih.
+    """
+    cpus = cpus or os.cpu_count() or 1
+
+    if workers is not None:
+        large = image_pixels(params, paths) >= PARALLEL_PIXELS
+        threads = max(cpus // workers, 1) if large else 1
+        return ParallelPlan(workers, threads, "jumlah proses ditentukan pengguna")
+    if items is None:
+        return ParallelPlan(cpus, 1, "jumlah gambar tidak diketahui")
+    if items >= cpus:
+        return ParallelPlan(cpus, 1, "gambar cukup untuk semua core")
+
+    workers = max(items, 1)
+    if image_pixels(params, paths) < PARALLEL_PIXELS:
+        return ParallelPlan(workers, 1, "gambar terlalu kecil untuk dibagi ke thread")
+    return ParallelPlan(
+        workers, max(cpus // workers, 1), "sisa core dipakai thread OpenCV"
+    )
+
+
+def configure_threads(threads: int) -> None:
+    """
+    Mengatur jumlah thread internal OpenCV di proses ini.
+
+    Dipakai sebagai initializer proses worker.
+
+    Args:
+        threads: Jumlah thread OpenCV.
+    """
+    cv2.setNumThreads(threads)
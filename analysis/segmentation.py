@@ -0,0 +1,911 @@
+from dataclasses import dataclass, field, replace
+from functools import cached_property
+from threading import Event
+from typing import Literal, cast
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from utils import load_image, resize_image
+
+from .cancellation import check_cancelled
+from .instrumentation import Instrumentation, measure, record_count
+from .intensity import MILD_THRESHOLD, SEVERE_THRESHOLD
+from .workspace import Workspace
+
+
+@dataclass(frozen=True)
+class SegmentationParams:
+    """
+    Parameter pipeline segmentasi iris/pupil/katarak.
+
+    Nilai default sama dengan konstanta yang dipakai pada aplikasi
+    DegreeOfCataract.
+
+    Dengan localization="pyramid", iris dicari dulu pada level piramida
+    yang lebarnya tidak lebih dari pyramid_width dengan rentang radius
+    min_radius_ratio..max_radius_ratio dari sisi terpendek gambar, lalu
+    diperhalus di ROI resolusi penuh dengan toleransi radius refine_margin.
+
+    Dengan measurement="pixels", area dihitung dari jumlah piksel komponen
+    terhubung, bukan dari luas kontur, sehingga tidak ada loop Python per
+    kontur pada gambar yang ber-noise.
+
+    mild_threshold dan severe_threshold adalah batas mean intensity untuk
+    diagnosis pada mode yang menjalankan analisis intensitas.
+
+    screen_width dan screen_margin hanya dipakai mode cascade: screening
+    mean intensity dijalankan pada gambar selebar screen_width, dan
+    segmentasi dilewati jika mean berada lebih dari screen_margin di bawah
+    mild_threshold.
+
+    Dengan resolution="multi", iris dilokalisasi pada gambar selebar width,
+    lalu thresholding, morfologi, dan pengukuran area dijalankan hanya pada
+    ROI iris dari gambar asli, diperkecil ke measure_width jika gambar asli
+    lebih lebar (0 berarti resolusi asli). Lihat segment_multires.
+    """
+
+    width: int = 500
+    filter_size: int = 5
+    threshold: int = 50
+    kernel_size: int = 10
+    hough_dp: float = 1
+    hough_min_dist: float = 20
+    hough_param1: float = 50
+    hough_param2: float = 30
+    min_area: float = 50
+    localization: Literal["full", "pyramid"] = "full"
+    pyramid_width: int = 160
+    min_radius_ratio: float = 0.05
+    max_radius_ratio: float = 0.5
+    refine_margin: float = 0.15
+    measurement: Literal["contours", "pixels"] = "contours"
+    mild_threshold: float = MILD_THRESHOLD
+    severe_threshold: float = SEVERE_THRESHOLD
+    screen_width: int = 64
+    screen_margin: float = 5.0
+    resolution: Literal["single", "multi"] = "single"
+    measure_width: int = 0
+
+    @property
+    def decode_width(self) -> int | None:
+        """
+        Lebar minimal gambar hasil decode yang dibutuhkan pipeline.
+
+        None berarti gambar harus didecode pada resolusi asli.
+        """
+        if self.resolution == "single":
+            return self.width
+        return max(self.measure_width, self.width) if self.measure_width else None
+
+
+DEFAULT_PARAMS = SegmentationParams()
+
+
+@dataclass
+class SegmentationResult:
+    """
+    Hasil segmentasi satu gambar mata.
+
+    Gambar untuk visualisasi (img_rgb dan cimg_cat) baru dibuat saat pertama
+    kali diakses, sehingga analisis tanpa GUI tidak membayar konversi warna
+    dan penggambaran kontur.
+
+    Attributes:
+        pupil_area: Area pupil dalam piksel.
+        cat_area: Total area katarak dalam piksel.
+        cataract_percentage: Persentase katarak terhadap pupil + katarak.
+        circle: Lingkaran iris (x, y, r) yang terdeteksi.
+        image: Gambar input yang sudah di-resize (BGR).
+        imgfiltered: Gambar setelah difilter.
+        thresh_image: Gambar setelah thresholding.
+        img_morpho_copy: Mask pupil yang dihasilkan.
+        imgg_inv: Gambar mask yang diinversi.
+        cat_contours: Kontur katarak yang dihitung (backend "contours").
+        cat_mask: Mask komponen katarak yang dihitung (backend "pixels").
+    """
+
+    pupil_area: float
+    cat_area: float
+    cataract_percentage: float
+    circle: tuple[int, int, int]
+    image: MatLike
+    imgfiltered: MatLike
+    thresh_image: MatLike
+    img_morpho_copy: MatLike
+    imgg_inv: MatLike
+    cat_contours: list[MatLike] = field(default_factory=list, repr=False)
+    cat_mask: MatLike | None = field(default=None, repr=False)
+
+    @cached_property
+    def img_rgb(self) -> MatLike:
+        """
+        Gambar asli dalam RGB.
+        """
+        return cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB)
+
+    @cached_property
+    def cimg_cat(self) -> MatLike:
+        """
+        Gambar akhir (RGB) dengan area katarak yang ditandai hijau.
+        """
+        if self.cat_mask is not None:
+            return blend_overlay(self.img_rgb, self.cat_mask)
+
+        cimg_cat = self.img_rgb.copy()
+        if self.cat_contours:
+            _ = cv2.drawContours(cimg_cat, self.cat_contours, -1, (0, 255, 0), 2)
+        return cimg_cat
+
+    def to_dict(self) -> dict[str, object]:
+        """
+        Mengubah hasil numerik (tanpa gambar) menjadi dictionary.
+
+        Returns:
+            Dictionary berisi area, persentase, dan lingkaran iris.
+        """
+        x, y, r = self.circle
+        return {
+            "pupil_area": self.pupil_area,
+            "cat_area": self.cat_area,
+            "cataract_percentage": self.cataract_percentage,
+            "circle_x": x,
+            "circle_y": y,
+            "circle_r": r,
+        }
+
+
+def to_grayscale(img: MatLike, workspace: Workspace | None = None) -> MatLike:
+    """
+    Mengubah gambar BGR menjadi grayscale.
+
+    Args:
+        img: Gambar input (BGR).
+        workspace: Buffer yang dipakai ulang (opsional).
+
+    Returns:
+        Gambar grayscale.
+    """
+    if workspace is None:
+        return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=workspace.like("gray", img))
+
+
+def filter_image(
+    gray: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    workspace: Workspace | None = None,
+) -> MatLike:
+    """
+    Menghaluskan gambar dengan box filter ternormalisasi.
+
+    Args:
+        gray: Gambar grayscale.
+        params: Parameter pipeline.
+        workspace: Buffer dan kernel yang dipakai ulang (opsional).
+
+    Returns:
+        Gambar yang telah difilter.
+    """
+    size = params.filter_size
+    if workspace is None:
+        kernel = np.ones((size, size), np.float32) / (size * size)
+        return cv2.filter2D(gray, -1, kernel)
+    return cv2.filter2D(
+        gray,
+        -1,
+        workspace.box_kernel(size),
+        dst=workspace.like("imgfiltered", gray),
+    )
+
+
+def threshold_image(
+    imgfiltered: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    workspace: Workspace | None = None,
+) -> MatLike:
+    """
+    Melakukan thresholding biner terbalik untuk segmentasi.
+
+    Args:
+        imgfiltered: Gambar yang telah difilter.
+        params: Parameter pipeline.
+        workspace: Buffer yang dipakai ulang (opsional).
+
+    Returns:
+        Gambar biner hasil thresholding.
+    """
+    dst = None if workspace is None else workspace.like("thresh_image", imgfiltered)
+    _, thresh_image = cv2.threshold(
+        imgfiltered, params.threshold, 255, cv2.THRESH_BINARY_INV, dst=dst
+    )
+    return thresh_image
+
+
+def open_image(
+    thresh_image: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    workspace: Workspace | None = None,
+) -> MatLike:
+    """
+    Operasi morfologi (opening) untuk membersihkan noise.
+
+    Args:
+        thresh_image: Gambar biner hasil thresholding.
+        params: Parameter pipeline.
+        workspace: Buffer dan kernel yang dipakai ulang (opsional).
+
+    Returns:
+        Gambar hasil opening.
+    """
+    size = params.kernel_size
+    if workspace is None:
+        kernelOp = np.ones((size, size), np.uint8)
+        return cv2.morphologyEx(thresh_image, cv2.MORPH_OPEN, kernelOp)
+    return cv2.morphologyEx(
+        thresh_image,
+        cv2.MORPH_OPEN,
+        workspace.morph_kernel(size),
+        dst=workspace.like("morpho", thresh_image),
+    )
+
+
+def detect_iris(
+    morpho: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+) -> tuple[int, int, int]:
+    """
+    Mendeteksi lingkaran iris menggunakan Hough Transform.
+
+    Args:
+        morpho: Gambar hasil opening.
+        params: Parameter pipeline.
+        instrumentation: Pencatat jumlah lingkaran kandidat (opsional).
+
+    Returns:
+        Koordinat dan radius (x, y, r) dari lingkaran pertama yang terdeteksi.
+
+    Raises:
+        ValueError: Jika tidak ada lingkaran yang terdeteksi.
+    """
+    if params.localization == "pyramid":
+        return detect_iris_pyramid(morpho, params, instrumentation)
+
+    circles = cv2.HoughCircles(
+        morpho,
+        cv2.HOUGH_GRADIENT,
+        params.hough_dp,
+        params.hough_min_dist,
+        param1=params.hough_param1,
+        param2=params.hough_param2,
+        minRadius=0,
+        maxRadius=0,
+    )
+
+    found = 0 if circles is None else len(circles[0])
+    record_count(instrumentation, "hough_circles", found)
+
+    # HoughCircles mengembalikan None jika tidak ada lingkaran
+    if circles is None or circles.size == 0:
+        raise ValueError("Tidak ada lingkaran (iris) yang terdeteksi")
+
+    circles = np.round(circles[0, :]).astype("int")
+    if len(circles) == 0:
+        raise ValueError("Tidak ditemukan lingkaran (iris) yang valid")
+
+    x = cast(int, circles[0][0])
+    y = cast(int, circles[0][1])
+    r = cast(int, circles[0][2])
+    return int(x), int(y), int(r)
+
+
+def _first_circle(circles: MatLike | None) -> tuple[float, float, float] | None:
+    # HoughCircles mengurutkan kandidat berdasarkan jumlah vote
+    if circles is None or circles.size == 0:
+        return None
+    x, y, r = (float(v) for v in circles[0, 0])  # pyright: ignore[reportAny]
+    return x, y, r
+
+
+def refine_circle(
+    morpho: MatLike,
+    circle: tuple[float, float, float],
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+) -> tuple[int, int, int] | None:
+    """
+    Memperhalus perkiraan lingkaran dengan Hough di ROI kecil di sekitarnya.
+
+    Rentang radius dibatasi pada r +- refine_margin * r sehingga biaya
+    Hough sebanding dengan ukuran ROI, bukan ukuran gambar.
+
+    Args:
+        morpho: Gambar hasil opening pada resolusi penuh.
+        circle: Perkiraan lingkaran (x, y, r) dalam koordinat morpho.
+        params: Parameter pipeline.
+        instrumentation: Pencatat jumlah lingkaran kandidat (opsional).
+
+    Returns:
+        Lingkaran (x, y, r) hasil penghalusan, atau None jika tidak ditemukan.
+    """
+    x, y, r = circle
+    rows = cast(int, morpho.shape[0])
+    cols = cast(int, morpho.shape[1])
+    margin = max(int(r * params.refine_margin), 2)
+    reach = int(r) + 2 * margin
+
+    x0, y0 = max(int(x) - reach, 0), max(int(y) - reach, 0)
+    x1, y1 = min(int(x) + reach + 1, cols), min(int(y) + reach + 1, rows)
+    if x1 - x0 < 3 or y1 - y0 < 3:
+        return None
+
+    circles = cv2.HoughCircles(
+        morpho[y0:y1, x0:x1],
+        cv2.HOUGH_GRADIENT,
+        params.hough_dp,
+        # Hanya satu lingkaran yang dicari di ROI
+        float(max(x1 - x0, y1 - y0)),
+        param1=params.hough_param1,
+        param2=params.hough_param2,
+        minRadius=max(int(r) - margin, 1),
+        maxRadius=int(r) + margin,
+    )
+    found = _first_circle(circles)
+    record_count(instrumentation, "hough_refine_circles", 0 if found is None else 1)
+    if found is None:
+        return None
+
+    fx, fy, fr = found
+    return round(fx) + x0, round(fy) + y0, round(fr)
+
+
+def detect_iris_pyramid(
+    morpho: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+) -> tuple[int, int, int]:
+    """
+    Mendeteksi iris secara coarse-to-fine menggunakan piramida gambar.
+
+    Hough dijalankan pada level piramida kecil dengan rentang radius yang
+    dibatasi, lalu hasilnya diperhalus di ROI pada resolusi penuh. Jika
+    penghalusan gagal, perkiraan dari level kasar yang dipakai.
+
+    Args:
+        morpho: Gambar hasil opening.
+        params: Parameter pipeline.
+        instrumentation: Pencatat jumlah lingkaran kandidat (opsional).
+
+    Returns:
+        Koordinat dan radius (x, y, r) dari iris.
+
+    Raises:
+        ValueError: Jika tidak ada lingkaran yang terdeteksi pada level kasar.
+    """
+    coarse = morpho
+    scale = 1
+    while cast(int, coarse.shape[1]) > params.pyramid_width:
+        coarse = cv2.pyrDown(coarse)
+        scale *= 2
+
+    min_dim = min(cast(int, coarse.shape[0]), cast(int, coarse.shape[1]))
+    circles = cv2.HoughCircles(
+        coarse,
+        cv2.HOUGH_GRADIENT,
+        params.hough_dp,
+        max(params.hough_min_dist / scale, 1.0),
+        param1=params.hough_param1,
+        # Jumlah vote sebanding dengan keliling lingkaran yang mengecil
+        param2=max(params.hough_param2 / scale, 10.0),
+        minRadius=max(int(min_dim * params.min_radius_ratio), 1),
+        maxRadius=max(int(min_dim * params.max_radius_ratio), 2),
+    )
+    found = 0 if circles is None else len(circles[0])
+    record_count(instrumentation, "hough_circles", found)
+
+    estimate = _first_circle(circles)
+    if estimate is None:
+        raise ValueError("Tidak ada lingkaran (iris) yang terdeteksi")
+
+    x, y, r = (v * scale for v in estimate)
+    if scale == 1:
+        return round(x), round(y), round(r)
+
+    refined = refine_circle(morpho, (x, y, r), params, instrumentation)
+    if refined is None:
+        return round(x), round(y), round(r)
+    return refined
+
+
+def mask_circle(
+    morpho: MatLike,
+    circle: tuple[int, int, int],
+    workspace: Workspace | None = None,
+) -> MatLike:
+    """
+    Mengisolasi area iris dengan mask sirkular.
+
+    Args:
+        morpho: Gambar hasil opening.
+        circle: Lingkaran iris (x, y, r).
+        workspace: Buffer yang dipakai ulang (opsional).
+
+    Returns:
+        Salinan gambar dengan piksel di luar lingkaran bernilai 0.
+    """
+    x, y, r = circle
+    rows = cast(int, morpho.shape[0])
+    cols = cast(int, morpho.shape[1])
+    if workspace is not None:
+        img_morpho_copy = workspace.like("img_morpho_copy", morpho)
+        img_morpho_copy.fill(0)
+        mask = workspace.circle_mask((rows, cols), circle)
+        return cv2.copyTo(morpho, mask, img_morpho_copy)
+
+    img_morpho_copy = morpho.copy()
+
+    # Buat mask sirkular menggunakan operasi vektor untuk efisiensi
+    y_grid, x_grid = np.ogrid[:rows, :cols]
+    mask = (x_grid - x) ** 2 + (y_grid - y) ** 2 <= r**2
+    img_morpho_copy[~mask] = 0
+    return img_morpho_copy
+
+
+def measure_pupil(
+    img_morpho_copy: MatLike, instrumentation: Instrumentation | None = None
+) -> float:
+    """
+    Menghitung area pupil dari kontur eksternal terbesar.
+
+    Args:
+        img_morpho_copy: Mask pupil.
+        instrumentation: Pencatat jumlah kontur (opsional).
+
+    Returns:
+        Area pupil dalam piksel.
+
+    Raises:
+        ValueError: Jika area pupil tidak dapat dideteksi.
+    """
+    contours_pupil, _ = cv2.findContours(
+        img_morpho_copy, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_NONE
+    )
+    record_count(instrumentation, "contours_pupil", len(contours_pupil))
+
+    pupil_area = 0.0
+    if contours_pupil:
+        largest_contour = max(contours_pupil, key=cv2.contourArea)
+        pupil_area = cv2.contourArea(largest_contour)
+
+    if pupil_area == 0:
+        raise ValueError("Tidak dapat mendeteksi area pupil")
+    return pupil_area
+
+
+def measure_cataract(
+    imgg_inv: MatLike,
+    pupil_area: float,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+) -> tuple[float, list[MatLike]]:
+    """
+    Menghitung total area katarak dari kontur pada mask yang diinversi.
+
+    Args:
+        imgg_inv: Mask pupil yang diinversi.
+        pupil_area: Area pupil dalam piksel.
+        params: Parameter pipeline.
+        instrumentation: Pencatat jumlah kontur (opsional).
+
+    Returns:
+        Tuple berisi total area katarak dan daftar kontur yang dihitung.
+    """
+    contours_cat, _ = cv2.findContours(imgg_inv, cv2.RETR_LIST, cv2.CHAIN_APPROX_NONE)
+
+    cat_area = 0.0
+    kept: list[MatLike] = []
+    for cnt in contours_cat:
+        area = cv2.contourArea(cnt)
+        if area < pupil_area and area > params.min_area:  # Filter noise kecil
+            kept.append(cnt)
+            cat_area += area
+
+    record_count(instrumentation, "contours_cat", len(contours_cat))
+    record_count(instrumentation, "contours_kept", len(kept))
+    return cat_area, kept
+
+
+def measure_pupil_pixels(
+    img_morpho_copy: MatLike, instrumentation: Instrumentation | None = None
+) -> float:
+    """
+    Menghitung area pupil sebagai jumlah piksel komponen terhubung terbesar
+    beserta lubang di dalamnya.
+
+    Lubang (bercak katarak yang dikelilingi pupil) ikut dihitung agar
+    definisinya sama dengan luas kontur eksternal pada measure_pupil.
+
+    Args:
+        img_morpho_copy: Mask pupil.
+        instrumentation: Pencatat jumlah komponen (opsional).
+
+    Returns:
+        Area pupil dalam piksel.
+
+    Raises:
+        ValueError: Jika area pupil tidak dapat dideteksi.
+    """
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(
+        img_morpho_copy, connectivity=8
+    )
+    record_count(instrumentation, "components_pupil", n - 1)
+
+    # Label 0 adalah latar belakang
+    if n < 2:
+        raise ValueError("Tidak dapat mendeteksi area pupil")
+    largest = 1 + int(np.argmax(stats[1:, cv2.CC_STAT_AREA]))  # pyright: ignore[reportAny]
+
+    # Latar yang terhubung (4-connectivity) ke tepi bingkai 1 piksel
+    # adalah luar pupil; piksel latar yang tersisa adalah lubang
+    component = np.zeros((labels.shape[0] + 2, labels.shape[1] + 2), np.uint8)
+    component[1:-1, 1:-1][labels == largest] = 255
+    _ = cv2.floodFill(component, None, (0, 0), 255, flags=4)
+    holes = component.size - cv2.countNonZero(component)
+    return float(stats[largest, cv2.CC_STAT_AREA] + holes)  # pyright: ignore[reportAny]
+
+
+def measure_cataract_pixels(
+    imgg_inv: MatLike,
+    pupil_area: float,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    instrumentation: Instrumentation | None = None,
+    workspace: Workspace | None = None,
+) -> tuple[float, MatLike]:
+    """
+    Menghitung total area katarak dari komponen terhubung mask yang diinversi.
+
+    Filter noise sama dengan measure_cataract (min_area < area < pupil_area),
+    tetapi diterapkan sekaligus pada array luas semua komponen.
+
+    Args:
+        imgg_inv: Mask pupil yang diinversi.
+        pupil_area: Area pupil dalam piksel.
+        params: Parameter pipeline.
+        instrumentation: Pencatat jumlah komponen (opsional).
+        workspace: Buffer label yang dipakai ulang (opsional).
+
+    Returns:
+        Tuple berisi total area katarak dan mask (uint8) komponen yang dihitung.
+    """
+    labels = None
+    if workspace is not None:
+        labels = workspace.buffer("labels", imgg_inv.shape, np.int32)
+    n, labels, stats, _ = cv2.connectedComponentsWithStats(
+        imgg_inv, labels=labels, connectivity=8
+    )
+    areas = stats[:, cv2.CC_STAT_AREA]
+    keep = (areas > params.min_area) & (areas < pupil_area)
+    keep[0] = False
+
+    record_count(instrumentation, "components_cat", n - 1)
+    record_count(instrumentation, "components_kept", int(keep.sum()))
+
+    # Lookup table label -> 0/255 membentuk mask dalam satu operasi
+    lut = np.where(keep, 255, 0).astype(np.uint8)
+    if workspace is None:
+        return float(areas[keep].sum()), lut[labels]  # pyright: ignore[reportAny]
+    cat_mask = workspace.like("cat_mask", imgg_inv)
+    _ = np.take(lut, labels, out=cat_mask)
+    return float(areas[keep].sum()), cat_mask  # pyright: ignore[reportAny]
+
+
+def blend_overlay(
+    img_rgb: MatLike,
+    mask: MatLike,
+    color: tuple[int, int, int] = (0, 255, 0),
+    alpha: float = 0.5,
+) -> MatLike:
+    """
+    Mewarnai area mask pada salinan gambar dengan satu blend bermask.
+
+    Args:
+        img_rgb: Gambar RGB.
+        mask: Mask uint8; piksel bukan nol akan diwarnai.
+        color: Warna overlay (RGB).
+        alpha: Bobot warna overlay.
+
+    Returns:
+        Gambar RGB baru dengan overlay.
+    """
+    overlay = np.empty_like(img_rgb)
+    overlay[:] = color
+    blended = cv2.addWeighted(img_rgb, 1 - alpha, overlay, alpha, 0)
+    out = img_rgb.copy()
+    _ = cv2.copyTo(blended, mask, out)
+    return out
+
+
+def compute_percentage(pupil_area: float, cat_area: float) -> float:
+    """
+    Menghitung persentase katarak.
+
+    Args:
+        pupil_area: Area pupil dalam piksel.
+        cat_area: Area katarak dalam piksel.
+
+    Returns:
+        Persentase katarak terhadap total area pupil dan katarak.
+    """
+    if cat_area > 0:
+        return (cat_area / (pupil_area + cat_area)) * 100
+    return 0.0
+
+
+def _measure_areas(
+    img_morpho_copy: MatLike,
+    imgg_inv: MatLike,
+    params: SegmentationParams,
+    cancel: Event | None,
+    inst: Instrumentation | None,
+    ws: Workspace | None,
+) -> tuple[float, float, list[MatLike], MatLike | None]:
+    # Mengembalikan area pupil, area katarak, dan kontur atau mask katarak
+    # sesuai backend pengukuran
+    if params.measurement == "pixels":
+        with measure(inst, "components_pupil"):
+            pupil_area = measure_pupil_pixels(img_morpho_copy, inst)
+        check_cancelled(cancel)
+        with measure(inst, "components_cat"):
+            cat_area, cat_mask = measure_cataract_pixels(
+                imgg_inv, pupil_area, params, inst, ws
+            )
+        return pupil_area, cat_area, [], cat_mask
+
+    with measure(inst, "contours_pupil"):
+        pupil_area = measure_pupil(img_morpho_copy, inst)
+    check_cancelled(cancel)
+    with measure(inst, "contours_cat"):
+        cat_area, contours = measure_cataract(imgg_inv, pupil_area, params, inst)
+    return pupil_area, cat_area, contours, None
+
+
+def segment_image(
+    img: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+    workspace: Workspace | None = None,
+    gray: MatLike | None = None,
+    prior: tuple[int, int, int] | None = None,
+) -> SegmentationResult:
+    """
+    Menjalankan seluruh pipeline segmentasi pada gambar yang sudah di-resize.
+
+    Args:
+        img: Gambar input (BGR).
+        params: Parameter pipeline.
+        cancel: Event pembatalan yang diperiksa di antara tahap (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+        workspace: Buffer yang dipakai ulang antar gambar (opsional). Gambar
+            pada hasil akan tertimpa oleh pemanggilan berikutnya, termasuk
+            sumber img_rgb dan cimg_cat yang dibuat saat diakses.
+        gray: Versi grayscale img yang sudah dihitung pemanggil (opsional).
+        prior: Lingkaran iris dari frame sebelumnya (opsional). Jika
+            diberikan, iris dicari hanya di sekitarnya dengan refine_circle,
+            dan Hough penuh baru dijalankan jika pelacakan gagal.
+
+    Returns:
+        Hasil segmentasi beserta gambar dari setiap tahap.
+
+    Raises:
+        ValueError: Jika iris atau pupil tidak dapat dideteksi.
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    inst = instrumentation
+    ws = workspace
+    if gray is None:
+        with measure(inst, "grayscale"):
+            gray = to_grayscale(img, ws)
+
+    with measure(inst, "filter"):
+        imgfiltered = filter_image(gray, params, ws)
+    with measure(inst, "threshold"):
+        thresh_image = threshold_image(imgfiltered, params, ws)
+    with measure(inst, "morphology"):
+        morpho = open_image(thresh_image, params, ws)
+    check_cancelled(cancel)
+
+    with measure(inst, "hough"):
+        circle = None
+        if prior is not None:
+            circle = refine_circle(morpho, prior, params, inst)
+            record_count(inst, "tracking_lost", 1 if circle is None else 0)
+        if circle is None:
+            circle = detect_iris(morpho, params, inst)
+    check_cancelled(cancel)
+
+    with measure(inst, "masking"):
+        img_morpho_copy = mask_circle(morpho, circle, ws)
+
+        # Inversi gambar untuk mendeteksi katarak (area putih)
+        inv_dst = None if ws is None else ws.like("imgg_inv", img_morpho_copy)
+        imgg_inv = cv2.bitwise_not(img_morpho_copy, dst=inv_dst)
+
+    pupil_area, cat_area, contours, cat_mask = _measure_areas(
+        img_morpho_copy, imgg_inv, params, cancel, inst, ws
+    )
+    return SegmentationResult(
+        pupil_area=pupil_area,
+        cat_area=cat_area,
+        cataract_percentage=compute_percentage(pupil_area, cat_area),
+        circle=circle,
+        image=img,
+        imgfiltered=imgfiltered,
+        thresh_image=thresh_image,
+        img_morpho_copy=img_morpho_copy,
+        imgg_inv=imgg_inv,
+        cat_contours=contours,
+        cat_mask=cat_mask,
+    )
+
+
+def segment_multires(
+    img: MatLike,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+    workspace: Workspace | None = None,
+) -> SegmentationResult:
+    """
+    Melokalisasi iris pada resolusi rendah, lalu mengukur area pada ROI iris
+    beresolusi tinggi.
+
+    Opasitas kecil yang hilang karena resize ke width tetap terukur,
+    sedangkan biaya tahap per piksel hanya sebanding dengan luas ROI.
+    kernel_size dan min_area diskalakan agar ukuran fisiknya sama dengan
+    pipeline resolusi rendah; filter_size tidak diskalakan karena berfungsi
+    meredam noise per piksel. Lingkaran diperhalus di ROI dengan
+    refine_circle.
+
+    Area dikembalikan dalam satuan piksel gambar selebar width dan lingkaran
+    dalam koordinat gambar tersebut, sehingga sebanding dengan
+    segment_image. Gambar pada hasil adalah potongan ROI pada resolusi
+    pengukuran.
+
+    Args:
+        img: Gambar input (BGR) yang belum di-resize.
+        params: Parameter pipeline.
+        cancel: Event pembatalan yang diperiksa di antara tahap (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+        workspace: Buffer untuk tahap resolusi rendah (opsional).
+
+    Returns:
+        Hasil segmentasi pada ROI.
+
+    Raises:
+        ValueError: Jika iris atau pupil tidak dapat dideteksi.
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    inst = instrumentation
+    ws = workspace
+    with measure(inst, "resize"):
+        small = resize_image(img, width=params.width)
+    with measure(inst, "grayscale"):
+        gray = to_grayscale(small, ws)
+    with measure(inst, "filter"):
+        imgfiltered = filter_image(gray, params, ws)
+    with measure(inst, "threshold"):
+        thresh_image = threshold_image(imgfiltered, params, ws)
+    with measure(inst, "morphology"):
+        morpho = open_image(thresh_image, params, ws)
+    with measure(inst, "hough"):
+        circle = detect_iris(morpho, params, inst)
+    check_cancelled(cancel)
+
+    rows = cast(int, img.shape[0])
+    cols = cast(int, img.shape[1])
+    measure_cols = min(params.measure_width or cols, cols)
+    # Skala dari gambar width ke resolusi pengukuran, dan dari asli ke sana
+    scale = measure_cols / params.width
+    shrink = measure_cols / cols
+
+    with measure(inst, "roi_crop"):
+        x, y, r = circle
+        factor = cols / params.width
+        reach = r * factor * (1 + params.refine_margin)
+        x0 = max(int(x * factor - reach), 0)
+        y0 = max(int(y * factor - reach), 0)
+        x1 = min(int(x * factor + reach) + 1, cols)
+        y1 = min(int(y * factor + reach) + 1, rows)
+        roi = img[y0:y1, x0:x1]
+        if shrink < 1:
+            size = (
+                max(round((x1 - x0) * shrink), 1),
+                max(round((y1 - y0) * shrink), 1),
+            )
+            roi = cv2.resize(roi, size, interpolation=cv2.INTER_AREA)
+        roi_circle = (
+            x * factor * shrink - x0 * shrink,
+            y * factor * shrink - y0 * shrink,
+            r * scale,
+        )
+    record_count(inst, "roi_pixels", cast(int, roi.shape[0]) * cast(int, roi.shape[1]))
+
+    roi_params = replace(
+        params,
+        kernel_size=max(round(params.kernel_size * scale), 1),
+        min_area=params.min_area * scale * scale,
+    )
+    with measure(inst, "roi_grayscale"):
+        roi_gray = to_grayscale(roi)
+    with measure(inst, "roi_filter"):
+        roi_filtered = filter_image(roi_gray, roi_params)
+    with measure(inst, "roi_threshold"):
+        roi_thresh = threshold_image(roi_filtered, roi_params)
+    with measure(inst, "roi_morphology"):
+        roi_morpho = open_image(roi_thresh, roi_params)
+    check_cancelled(cancel)
+
+    with measure(inst, "roi_refine"):
+        refined = refine_circle(roi_morpho, roi_circle, roi_params, inst)
+    if refined is None:
+        cx, cy, cr = roi_circle
+        refined = (round(cx), round(cy), round(cr))
+
+    with measure(inst, "masking"):
+        img_morpho_copy = mask_circle(roi_morpho, refined)
+        imgg_inv = cv2.bitwise_not(img_morpho_copy)
+
+    pupil_area, cat_area, contours, cat_mask = _measure_areas(
+        img_morpho_copy, imgg_inv, roi_params, cancel, inst, None
+    )
+    area_scale = scale * scale
+    return SegmentationResult(
+        pupil_area=pupil_area / area_scale,
+        cat_area=cat_area / area_scale,
+        cataract_percentage=compute_percentage(pupil_area, cat_area),
+        circle=circle,
+        image=roi,
+        imgfiltered=roi_filtered,
+        thresh_image=roi_thresh,
+        img_morpho_copy=img_morpho_copy,
+        imgg_inv=imgg_inv,
+        cat_contours=contours,
+        cat_mask=cat_mask,
+    )
+
+
+def analyze_file(
+    path: str,
+    params: SegmentationParams = DEFAULT_PARAMS,
+    cancel: Event | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> SegmentationResult:
+    """
+    Memuat gambar dari file, mengubah ukurannya, dan menjalankan segmentasi.
+
+    Args:
+        path: Path ke file gambar.
+        params: Parameter pipeline.
+        cancel: Event pembatalan yang diperiksa di antara tahap (opsional).
+        instrumentation: Pengumpul ukuran per tahap (opsional).
+
+    Returns:
+        Hasil segmentasi.
+
+    Raises:
+        ValueError: Jika gambar tidak dapat dibaca atau iris/pupil tidak terdeteksi.
+        AnalysisCancelled: Jika pembatalan diminta sebelum selesai.
+    """
+    with measure(instrumentation, "decode"):
+        img = load_image(path, width=params.decode_width)
+    check_cancelled(cancel)
+    if params.resolution == "multi":
+        return segment_multires(img, params, cancel, instrumentation)
+
+    # Ubah ukuran gambar untuk konsistensi
+    with measure(instrumentation, "resize"):
+        img = resize_image(img, width=params.width)
+    return segment_image(img, params, cancel, instrumentation)
@@ -0,0 +1,394 @@
+import asyncio
+import json
+import math
+import os
+import time
+from collections import deque
+from contextlib import AsyncExitStack
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import final
+
+from .batch import AnalysisMode, Record, analyze_encoded
+from .segmentation import DEFAULT_PARAMS, SegmentationParams
+
+# Batas ukuran upload agar satu permintaan tidak menghabiskan memori
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+# Batas jumlah upload yang diterima bersamaan (sedang dibaca, menunggu di
+# antrean, atau sedang dianalisis); upload berikutnya ditolak dengan 503 agar
+# memori tidak tumbuh tanpa batas saat worker tertinggal
+MAX_QUEUED = 32
+
+_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    411: "Length Required",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    503: "Service Unavailable",
+}
+
+
+def analyze_batch(
+    items: list[tuple[str, bytes]], mode: AnalysisMode, params: SegmentationParams
+) -> list[Record]:
+    """
+    Menganalisis satu micro-batch upload di proses worker.
+
+    Args:
+        items: Pasangan (kunci, isi file gambar).
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+
+    Returns:
+        Record hasil analisis sesuai urutan items.
+    """
+    return [analyze_encoded(key, data, mode, params) for key, data in items]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Menghitung persentil dengan metode nearest-rank.
+
+    Args:
+        values: Nilai yang sudah diurutkan naik.
+        q: Persentil antara 0 dan 100.
+
+    Returns:
+        Nilai persentil, atau 0.0 jika values kosong.
+    """
+    if not values:
+        return 0.0
+    rank = max(math.ceil(q * len(values) / 100), 1)
+    return values[min(rank, len(values)) - 1]
+
+
+@dataclass
+class ServerStats:
+    """
+    Statistik server sejak dijalankan.
+
+    Attributes:
+        requests: Jumlah upload yang dianalisis.
+        errors: Jumlah upload yang gagal dianalisis.
+        batches: Jumlah micro-batch yang dikirim ke worker.
+        latencies: Latensi upload terakhir (detik), dari diterima sampai
+            hasil siap.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    batches: int = 0
+    latencies: deque[float] = field(default_factory=lambda: deque(maxlen=4096))
+
+    def to_dict(self, queued: int) -> dict[str, object]:
+        """
+        Mengubah statistik menjadi dictionary untuk endpoint /stats.
+
+        Args:
+            queued: Jumlah upload yang sedang menunggu di antrean.
+
+        Returns:
+            Dictionary berisi jumlah permintaan, ukuran batch rata-rata,
+            dan persentil latensi dalam milidetik.
+        """
+        ordered = sorted(self.latencies)
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "queued": queued,
+            "latency_ms": {
+                f"p{q}": percentile(ordered, q) * 1000 for q in (50, 90, 95, 99)
+            },
+        }
+
+
+@dataclass
+class _Job:
+    key: str
+    data: bytes
+    received: float
+    future: asyncio.Future[Record]
+
+
+@final
+class MicroBatcher:
+    """
+    Mengumpulkan upload menjadi micro-batch sebelum dikirim ke worker pool.
+
+    Batch dikirim begitu berisi max_batch upload atau upload pertamanya sudah
+    menunggu max_wait detik. Jumlah batch yang berjalan bersamaan dibatasi
+    jumlah worker sehingga antrean menumpuk di sini, bukan di pool. Antrean
+    sendiri dibatasi max_queue upload; AnalysisServer memesan slot sebelum
+    membaca body sehingga antrean tidak pernah penuh saat submit dipanggil.
+    """
+
+    def __init__(
+        self,
+        executor: Executor,
+        workers: int,
+        mode: AnalysisMode = "combined",
+        params: SegmentationParams = DEFAULT_PARAMS,
+        max_batch: int = 8,
+        max_wait: float = 0.01,
+        max_queue: int = MAX_QUEUED,
+    ):
+        """
+        Inisialisasi batcher.
+
+        Args:
+            executor: Pool yang menjalankan analyze_batch.
+            workers: Batas jumlah batch yang berjalan bersamaan.
+            mode: Salah satu dari ANALYSIS_MODES.
+            params: Parameter pipeline segmentasi.
+            max_batch: Jumlah upload maksimum per batch.
+            max_wait: Waktu tunggu maksimum upload pertama dalam batch (detik).
+            max_queue: Jumlah upload maksimum yang menunggu di antrean.
+
+        Raises:
+            ValueError: Jika max_queue tidak positif.
+        """
+        if max_queue < 1:
+            raise ValueError("Ukuran antrean harus positif")
+
+        self.executor = executor
+        self.mode: AnalysisMode = mode
+        self.params = params
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.stats = ServerStats()
+        self._queue: asyncio.Queue[_Job] = asyncio.Queue(max_queue)
+        self._slots = asyncio.Semaphore(workers)
+        self._tasks: set[asyncio.Task[None]] = set()
+
+    @property
+    def queued(self) -> int:
+        """
+        Jumlah upload yang menunggu dikirim ke worker.
+        """
+        return self._queue.qsize()
+
+    async def submit(self, key: str, data: bytes) -> Record:
+        """
+        Memasukkan satu upload ke antrean dan menunggu hasilnya.
+
+        Args:
+            key: Identitas upload; dipakai sebagai "path" pada record.
+            data: Isi file gambar.
+
+        Returns:
+            Record hasil analisis.
+
+        Raises:
+            asyncio.QueueFull: Jika antrean sudah berisi max_queue upload.
+        """
+        future: asyncio.Future[Record] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(_Job(key, data, time.perf_counter(), future))
+        return await future
+
+    async def run(self) -> None:
+        """
+        Loop pengirim batch; dijalankan sebagai task sampai dibatalkan.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = batch[0].received + self.max_wait
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            task = loop.create_task(self._dispatch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, batch: list[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        items = [(job.key, job.data) for job in batch]
+        try:
+            records = await loop.run_in_executor(
+                self.executor, analyze_batch, items, self.mode, self.params
+            )
+        except Exception as e:
+            records = [
+                {"path": job.key, "status": "error", "error": str(e)} for job in batch
+            ]
+        finally:
+            self._slots.release()
+
+        now = time.perf_counter()
+        self.stats.batches += 1
+        for job, record in zip(batch, records):
+            self.stats.requests += 1
+            if record["status"] != "ok":
+                self.stats.errors += 1
+            self.stats.latencies.append(now - job.received)
+            if not job.future.done():
+                job.future.set_result(record)
+
+
+@final
+class AnalysisServer:
+    """
+    Server HTTP lokal (asyncio, tanpa dependensi tambahan) untuk analisis.
+
+    Endpoint:
+        POST /analyze: body berisi file gambar; mengembalikan hasil analisis
+            sebagai JSON (422 jika gambar tidak dapat dianalisis, 503 jika
+            sudah ada max_queue upload yang sedang diproses).
+        GET /stats: statistik permintaan dan persentil latensi.
+        GET /health: pemeriksaan sederhana bahwa server berjalan.
+
+    Setiap koneksi melayani satu permintaan (Connection: close). Kapasitas
+    upload dipesan sebelum body dibaca dan baru dilepas setelah respons
+    terkirim, sehingga paling banyak max_queue body upload berada di memori.
+    """
+
+    def __init__(self, batcher: MicroBatcher, max_body: int = MAX_BODY_BYTES):
+        """
+        Inisialisasi server.
+
+        Args:
+            batcher: Batcher yang menjalankan analisis.
+            max_body: Ukuran upload maksimum dalam byte.
+        """
+        self.batcher = batcher
+        self.max_body = max_body
+        self._counter = 0
+        # Antrean batcher tidak pernah penuh karena setiap job memegang slot
+        self._uploads = asyncio.Semaphore(batcher.max_queue)
+
+    @property
+    def busy(self) -> bool:
+        """
+        True jika kapasitas upload habis dan upload baru akan ditolak.
+        """
+        return self._uploads.locked()
+
+    async def handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Melayani satu koneksi HTTP.
+
+        Args:
+            reader: Stream masuk dari klien.
+            writer: Stream keluar ke klien.
+        """
+        # Slot upload yang dipesan _respond dilepas setelah respons terkirim
+        async with AsyncExitStack() as stack:
+            try:
+                status, body = await self._respond(reader, stack)
+            except (
+                asyncio.IncompleteReadError,
+                asyncio.LimitOverrunError,
+                ValueError,
+            ):
+                status, body = 400, {"error": "Permintaan HTTP tidak valid"}
+
+            payload = json.dumps(body).encode()
+            head = (
+                f"HTTP/1.1 {status} {_REASONS[status]}\r\n"
+                "Content-Type: application/json\r\n"
+                f"Content-Length: {len(payload)}\r\n"
+                "Connection: close\r\n\r\n"
+            )
+            try:
+                writer.write(head.encode() + payload)
+                await writer.drain()
+            except ConnectionError:
+                pass
+            finally:
+                writer.close()
+
+    async def _respond(
+        self, reader: asyncio.StreamReader, stack: AsyncExitStack
+    ) -> tuple[int, object]:
+        request_line = (await reader.readuntil(b"\r\n")).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ValueError("request line")
+        method, target, _ = request_line
+        path = target.split("?", 1)[0]
+
+        headers: dict[str, str] = {}
+        while (line := await reader.readuntil(b"\r\n")) != b"\r\n":
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if path == "/health":
+            return 200, {"status": "ok"}
+        if path == "/stats":
+            if method != "GET":
+                return 405, {"error": "Gunakan GET"}
+            return 200, self.batcher.stats.to_dict(self.batcher.queued)
+        if path != "/analyze":
+            return 404, {"error": f"Endpoint {path} tidak dikenal"}
+        if method != "POST":
+            return 405, {"error": "Gunakan POST dengan isi file gambar"}
+
+        if "content-length" not in headers:
+            return 411, {"error": "Header Content-Length wajib diisi"}
+        length = int(headers["content-length"])
+        if length > self.max_body:
+            return 413, {"error": f"Ukuran upload melebihi {self.max_body} byte"}
+        # Pesan slot sebelum membaca body agar upload besar tidak menumpuk di
+        # memori; tidak ada await antara pemeriksaan dan acquire
+        if self._uploads.locked():
+            return 503, {"error": "Server sedang penuh, coba lagi nanti"}
+        await self._uploads.acquire()
+        _ = stack.callback(self._uploads.release)
+
+        data = await reader.readexactly(length)
+        self._counter += 1
+        key = headers.get("x-image-id", f"upload-{self._counter}")
+        record = await self.batcher.submit(key, data)
+        return (200 if record["status"] == "ok" else 422), record
+
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    mode: AnalysisMode = "combined",
+    params: SegmentationParams = DEFAULT_PARAMS,
+    workers: int | None = None,
+    max_batch: int = 8,
+    max_wait: float = 0.01,
+    max_queue: int = MAX_QUEUED,
+) -> None:
+    """
+    Menjalankan server analisis sampai dibatalkan.
+
+    Args:
+        host: Alamat yang didengarkan.
+        port: Port yang didengarkan.
+        mode: Salah satu dari ANALYSIS_MODES.
+        params: Parameter pipeline segmentasi.
+        workers: Jumlah proses worker (default: jumlah CPU).
+        max_batch: Jumlah upload maksimum per micro-batch.
+        max_wait: Waktu tunggu maksimum sebelum batch dikirim (detik).
+        max_queue: Jumlah upload maksimum yang menunggu di antrean.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        batcher = MicroBatcher(
+            executor, workers, mode, params, max_batch, max_wait, max_queue
+        )
+        server = AnalysisServer(batcher)
+        dispatcher = asyncio.create_task(batcher.run())
+        try:
+            async with await asyncio.start_server(server.handle, host, port) as srv:
+                await srv.serve_forever()
+        finally:
+            _ = dispatcher.cancel()
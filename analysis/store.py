@@ -0,0 +1,434 @@
+import hashlib
+import json
+import math
+import os
+import tempfile
+from collections.abc import Iterable, Iterator
+from threading import Lock
+from typing import cast, final
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .batch import Record
+from .intensity import DIAGNOSIS_CODES
+
+# Naikkan jika RESULT_DTYPE berubah agar store lama ditolak
+STORE_VERSION = 1
+
+# Satu baris per gambar; nilai yang tidak ada diisi NaN (float) atau -1 (int)
+RESULT_DTYPE = np.dtype(
+    [
+        ("path_hash", "<u8"),
+        ("status", "u1"),
+        # Kode dari DIAGNOSIS_CODES; 0 berarti mode tanpa diagnosis
+        ("diagnosis", "u1"),
+        ("screened_out", "u1"),
+        ("circle_x", "<i4"),
+        ("circle_y", "<i4"),
+        ("circle_r", "<i4"),
+        ("pupil_area", "<f4"),
+        ("cat_area", "<f4"),
+        ("cataract_percentage", "<f4"),
+        ("mean", "<f4"),
+        ("std", "<f4"),
+        ("elapsed_ms", "<f4"),
+    ]
+)
+
+_INDEX_NAME = "index.json"
+
+# Dibuat secara eksklusif oleh penulis dan dihapus saat store ditutup
+_LOCK_NAME = "writer.lock"
+
+
+def path_hash(path: str) -> int:
+    """
+    Menghitung hash 64-bit dari path gambar untuk kolom path_hash.
+
+    Args:
+        path: Path gambar.
+
+    Returns:
+        Hash sebagai integer tanpa tanda.
+    """
+    digest = hashlib.blake2b(path.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def diagnosis_code(diagnosis: str) -> int:
+    """
+    Mengubah status diagnosis menjadi kode kolom "diagnosis".
+
+    Args:
+        diagnosis: Status dari diagnose_cataract.
+
+    Returns:
+        Kode diagnosis.
+
+    Raises:
+        ValueError: Jika status tidak dikenal.
+    """
+    if diagnosis not in DIAGNOSIS_CODES:
+        raise ValueError(f"Diagnosis {diagnosis} tidak dikenal")
+    return DIAGNOSIS_CODES[diagnosis]
+
+
+def _fill_row(row: np.void, record: Record) -> None:
+    def number(key: str, missing: float) -> float:
+        value = record.get(key)
+        return missing if value is None else float(value)  # pyright: ignore[reportArgumentType]
+
+    row["path_hash"] = path_hash(str(record.get("path", "")))
+    row["status"] = record.get("status") == "ok"
+    row["diagnosis"] = DIAGNOSIS_CODES.get(str(record.get("diagnosis")), 0)
+    row["screened_out"] = bool(record.get("screened_out"))
+    for key in ("circle_x", "circle_y", "circle_r"):
+        row[key] = number(key, -1)
+    for key in ("pupil_area", "cat_area", "cataract_percentage", "mean", "std"):
+        row[key] = number(key, math.nan)
+
+    metrics = cast(dict[str, object] | None, record.get("metrics"))
+    if metrics is None:
+        row["elapsed_ms"] = math.nan
+    else:
+        stages = cast(dict[str, dict[str, float]], metrics["stages"])
+        row["elapsed_ms"] = sum(stage["wall_s"] for stage in stages.values()) * 1000
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            _ = f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@final
+class ResultStore:
+    """
+    Penyimpanan hasil append-only dalam segmen array terstruktur NumPy.
+
+    Record ditampung di buffer berukuran segment_size lalu ditulis sebagai
+    satu file segmen biner (RESULT_DTYPE, tanpa header) yang tidak pernah
+    diubah lagi. File index.json mencatat setiap segmen beserta jumlah
+    baris, rentang persentase katarak, dan jumlah per kode diagnosis,
+    sehingga query dapat melewati segmen yang pasti tidak cocok tanpa
+    membacanya. Segmen dibaca melalui memory map tanpa salinan. Segmen
+    yang belum tercatat di indeks (misalnya karena proses berhenti saat
+    menulis) diabaikan.
+
+    Satu direktori hanya boleh memiliki satu penulis. Append pertama
+    membuat file writer.lock secara eksklusif dan close() menghapusnya;
+    penulis kedua ditolak dengan ValueError. Pembaca (query, summary) tidak
+    memerlukan lock. Jika proses berhenti tanpa close(), baris di buffer
+    (hingga segment_size baris) hilang dan writer.lock harus dihapus
+    manual; perkecil segment_size atau panggil flush() untuk mempersempit
+    jendela kehilangan tersebut.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 65536):
+        """
+        Membuka atau membuat store.
+
+        Args:
+            directory: Direktori store.
+            segment_size: Jumlah baris maksimum per segmen, sekaligus jumlah
+                baris maksimum yang hilang jika proses berhenti sebelum flush.
+
+        Raises:
+            ValueError: Jika store dibuat dengan versi format lain atau
+                segment_size tidak positif.
+        """
+        if segment_size < 1:
+            raise ValueError("Ukuran segmen harus positif")
+        self.directory = directory
+        self.segment_size = segment_size
+        os.makedirs(directory, exist_ok=True)
+
+        self._segments = self._read_index()
+        self._buffer = np.zeros(segment_size, dtype=RESULT_DTYPE)
+        self._pending = 0
+        self._lock = Lock()
+        self._writer = False
+
+    def _read_index(self) -> list[dict[str, object]]:
+        try:
+            with open(os.path.join(self.directory, _INDEX_NAME), encoding="utf-8") as f:
+                index = cast(dict[str, object], json.load(f))
+        except FileNotFoundError:
+            return []
+        if index.get("version") != STORE_VERSION:
+            raise ValueError(f"Versi format store {self.directory} tidak didukung")
+        return cast(list[dict[str, object]], index["segments"])
+
+    def _acquire_locked(self) -> None:
+        if self._writer:
+            return
+        path = os.path.join(self.directory, _LOCK_NAME)
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            raise ValueError(
+                f"Store {self.directory} sedang ditulis proses lain (hapus {path} "
+                "jika tidak ada proses lain yang menulis)"
+            ) from None
+        with os.fdopen(fd, "w") as f:
+            _ = f.write(str(os.getpid()))
+        self._writer = True
+        # Segmen yang ditulis penulis sebelumnya setelah store ini dibuka
+        self._segments = self._read_index()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Menulis baris yang masih di buffer dan melepas lock penulis.
+        """
+        with self._lock:
+            try:
+                self._flush_locked()
+            finally:
+                if self._writer:
+                    os.remove(os.path.join(self.directory, _LOCK_NAME))
+                    self._writer = False
+
+    def __len__(self) -> int:
+        stored = sum(cast(int, segment["count"]) for segment in self._segments)
+        return stored + self._pending
+
+    def append(self, record: Record) -> None:
+        """
+        Menambahkan satu record hasil analisis.
+
+        Args:
+            record: Record dari BatchRunner; kunci yang tidak ada disimpan
+                sebagai NaN atau -1.
+
+        Raises:
+            ValueError: Jika store sedang ditulis proses lain.
+        """
+        with self._lock:
+            self._acquire_locked()
+            _fill_row(self._buffer[self._pending], record)
+            self._pending += 1
+            if self._pending == self.segment_size:
+                self._flush_locked()
+
+    def extend(self, records: Iterable[Record]) -> None:
+        """
+        Menambahkan banyak record.
+
+        Args:
+            records: Record hasil analisis.
+
+        Raises:
+            ValueError: Jika store sedang ditulis proses lain.
+        """
+        for record in records:
+            self.append(record)
+
+    def flush(self) -> None:
+        """
+        Menulis baris di buffer sebagai segmen baru dan memperbarui indeks.
+        """
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if self._pending == 0:
+            return
+        rows = self._buffer[: self._pending]
+        name = f"segment-{len(self._segments):06d}.bin"
+        _write_atomic(os.path.join(self.directory, name), rows.tobytes())
+
+        percentages = rows["cataract_percentage"]
+        valid = percentages[~np.isnan(percentages)]
+        codes, counts = np.unique(rows["diagnosis"], return_counts=True)
+        self._segments.append(
+            {
+                "name": name,
+                "count": int(self._pending),
+                "min_percentage": float(valid.min()) if valid.size else None,
+                "max_percentage": float(valid.max()) if valid.size else None,
+                "diagnosis": {
+                    str(code): int(count)
+                    for code, count in zip(codes.tolist(), counts.tolist())
+                },
+            }
+        )
+        # Indeks ditulis setelah segmen sehingga selalu menunjuk file lengkap
+        index = {"version": STORE_VERSION, "segments": self._segments}
+        _write_atomic(
+            os.path.join(self.directory, _INDEX_NAME), json.dumps(index).encode()
+        )
+        self._pending = 0
+
+    def segments(self) -> Iterator[NDArray[np.void]]:
+        """
+        Membaca segmen yang sudah ditulis sebagai memory map read-only.
+
+        Yields:
+            Array terstruktur RESULT_DTYPE per segmen, tanpa salinan.
+        """
+        for segment in list(self._segments):
+            path = os.path.join(self.directory, cast(str, segment["name"]))
+            yield np.memmap(path, dtype=RESULT_DTYPE, mode="r")
+
+    def load(self) -> NDArray[np.void]:
+        """
+        Menggabungkan semua segmen menjadi satu array.
+
+        Berbeda dengan segments(), hasilnya adalah salinan di memori.
+
+        Returns:
+            Array terstruktur RESULT_DTYPE.
+        """
+        return np.concatenate([*self.segments(), np.empty(0, dtype=RESULT_DTYPE)])
+
+    def select(
+        self,
+        min_percentage: float | None = None,
+        max_percentage: float | None = None,
+        diagnosis: str | None = None,
+    ) -> Iterator[NDArray[np.void]]:
+        """
+        Memfilter baris per segmen berdasarkan rentang persentase katarak
+        dan/atau diagnosis.
+
+        Segmen yang menurut indeks tidak mungkin cocok tidak dibaca. Tanpa
+        filter, setiap segmen dikembalikan utuh tanpa salinan.
+
+        Args:
+            min_percentage: Batas bawah persentase (inklusif, opsional).
+            max_percentage: Batas atas persentase (inklusif, opsional).
+            diagnosis: Status diagnosis dari diagnose_cataract (opsional).
+
+        Yields:
+            Baris yang cocok dari setiap segmen sebagai array RESULT_DTYPE.
+
+        Raises:
+            ValueError: Jika diagnosis tidak dikenal.
+        """
+        code = None if diagnosis is None else diagnosis_code(diagnosis)
+        for segment, rows in zip(list(self._segments), self.segments()):
+            if not self._may_match(segment, min_percentage, max_percentage, code):
+                continue
+            if min_percentage is None and max_percentage is None and code is None:
+                yield rows
+                continue
+
+            mask = np.ones(len(rows), dtype=bool)
+            percentages = rows["cataract_percentage"]
+            if min_percentage is not None:
+                mask &= percentages >= min_percentage
+            if max_percentage is not None:
+                mask &= percentages <= max_percentage
+            if code is not None:
+                mask &= rows["diagnosis"] == code
+            yield rows[mask]
+
+    def query(
+        self,
+        min_percentage: float | None = None,
+        max_percentage: float | None = None,
+        diagnosis: str | None = None,
+    ) -> NDArray[np.void]:
+        """
+        Mengambil baris yang cocok dengan filter sebagai satu array.
+
+        Args:
+            min_percentage: Batas bawah persentase (inklusif, opsional).
+            max_percentage: Batas atas persentase (inklusif, opsional).
+            diagnosis: Status diagnosis dari diagnose_cataract (opsional).
+
+        Returns:
+            Salinan baris yang cocok sebagai array RESULT_DTYPE.
+
+        Raises:
+            ValueError: Jika diagnosis tidak dikenal.
+        """
+        matches = self.select(min_percentage, max_percentage, diagnosis)
+        return np.concatenate([*matches, np.empty(0, dtype=RESULT_DTYPE)])
+
+    @staticmethod
+    def _may_match(
+        segment: dict[str, object],
+        min_percentage: float | None,
+        max_percentage: float | None,
+        code: int | None,
+    ) -> bool:
+        if code is not None:
+            diagnoses = cast(dict[str, int], segment["diagnosis"])
+            if str(code) not in diagnoses:
+                return False
+        if min_percentage is None and max_percentage is None:
+            return True
+
+        low = cast(float | None, segment["min_percentage"])
+        high = cast(float | None, segment["max_percentage"])
+        if low is None or high is None:
+            # Segmen tanpa persentase (misalnya mode intensity)
+            return False
+        if min_percentage is not None and high < min_percentage:
+            return False
+        return max_percentage is None or low <= max_percentage
+
+    def summary(
+        self,
+        min_percentage: float | None = None,
+        max_percentage: float | None = None,
+        diagnosis: str | None = None,
+    ) -> dict[str, object]:
+        """
+        Menghitung statistik agregat baris yang cocok per segmen, tanpa
+        menggabungkan segmen.
+
+        Args:
+            min_percentage: Batas bawah persentase (inklusif, opsional).
+            max_percentage: Batas atas persentase (inklusif, opsional).
+            diagnosis: Status diagnosis dari diagnose_cataract (opsional).
+
+        Returns:
+            Dictionary berisi jumlah baris, jumlah yang berhasil, jumlah per
+            diagnosis, serta rata-rata persentase katarak dan waktu analisis.
+
+        Raises:
+            ValueError: Jika diagnosis tidak dikenal.
+        """
+        rows = ok = 0
+        percentage_sum = elapsed_sum = 0.0
+        percentage_count = elapsed_count = 0
+        codes = np.zeros(max(DIAGNOSIS_CODES.values()) + 1, dtype=np.int64)
+        for data in self.select(min_percentage, max_percentage, diagnosis):
+            rows += len(data)
+            ok += int(np.count_nonzero(data["status"]))
+            codes += np.bincount(data["diagnosis"], minlength=len(codes))
+
+            percentages = data["cataract_percentage"]
+            valid = ~np.isnan(percentages)
+            percentage_sum += float(percentages[valid].sum(dtype=np.float64))
+            percentage_count += int(np.count_nonzero(valid))
+            elapsed = data["elapsed_ms"]
+            valid = ~np.isnan(elapsed)
+            elapsed_sum += float(elapsed[valid].sum(dtype=np.float64))
+            elapsed_count += int(np.count_nonzero(valid))
+
+        return {
+            "rows": rows,
+            "ok": ok,
+            "diagnosis": {
+                name: int(codes[code]) for name, code in DIAGNOSIS_CODES.items()
+            },
+            "mean_percentage": (
+                percentage_sum / percentage_count if percentage_count else None
+            ),
+            "mean_elapsed_ms": elapsed_sum / elapsed_count if elapsed_count else None,
+        }
@@ -0,0 +1,235 @@
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import cast, final
+
+from cv2.typing import MatLike
+
+from utils import decode_peak_bytes, decoded_shape
+
+from .batch import AnalysisMode, Record, _decode, _error_record, _record
+from .instrumentation import Instrumentation
+from .scheduler import configure_threads
+from .segmentation import DEFAULT_PARAMS, SegmentationParams
+
+# Perkiraan rasio ukuran hasil decode terhadap ukuran file jika header tidak
+# dapat dibaca (kompresi JPEG foto umumnya sekitar 1:10)
+UNKNOWN_EXPANSION = 10
+
+# Perkiraan memori kerja per piksel hasil resize untuk satu thread analisis:
+# salinan BGR (3), grayscale dan mask 8-bit antar-tahap, serta label kontur
+# int32 (4)
+WORKSPACE_BYTES_PER_PIXEL = 16
+
+
+@final
+@dataclass
+class _Task:
+    path: str
+    # Memori puncak decode, diganti ukuran gambar setelah decode selesai
+    reserved: int
+    # Memori kerja per gambar di luar workspace thread (ROI mode multi)
+    analysis: int
+    instrumentation: Instrumentation | None
+    img: MatLike | None = None
+
+
+@final
+class StreamingPipeline:
+    """
+    Menganalisis kumpulan gambar berukuran bebas dengan memori terbatas.
+
+    Path dibaca secara lazy satu per satu. Gambar didecode lebih dulu di
+    thread pool kecil (imread melepas GIL) sementara thread analisis
+    memproses gambar yang sudah siap, sehingga decode dan analisis saling
+    tumpang tindih. Setiap gambar memesan memori puncak decode yang
+    diperkirakan dari header file sebelum diterima (untuk PNG, BMP, dan
+    TIFF termasuk gambar resolusi asli, karena hanya JPEG yang didecode
+    langsung pada skala tereduksi); gambar berikutnya baru dibaca dari disk
+    setelah ada anggaran yang dilepas oleh gambar yang selesai. Setelah
+    decode, pesanan diganti dengan ukuran gambar sebenarnya.
+
+    Anggaran mencakup gambar yang sedang didecode, menunggu analisis, atau
+    sedang dianalisis, memori kerja ROI per gambar pada mode multi, ditambah
+    memori kerja tetap setiap thread analisis.
+    Satu gambar selalu diterima meskipun ukurannya sendiri melebihi batas
+    agar pipeline tidak berhenti. Hasil dikembalikan sesuai urutan selesai,
+    bukan urutan input.
+    """
+
+    def __init__(
+        self,
+        mode: AnalysisMode = "segmentation",
+        params: SegmentationParams = DEFAULT_PARAMS,
+        workers: int | None = None,
+        decode_threads: int = 2,
+        memory_limit_mb: int = 256,
+        max_in_flight: int | None = None,
+        instrument: bool = False,
+        cv_threads: int | None = None,
+    ):
+        """
+        Inisialisasi pipeline.
+
+        Args:
+            mode: Salah satu dari ANALYSIS_MODES.
+            params: Parameter pipeline segmentasi.
+            workers: Jumlah thread analisis (default: jumlah CPU).
+            decode_threads: Jumlah thread decode.
+            memory_limit_mb: Batas memori gambar dan memori kerja dalam MB.
+            max_in_flight: Batas jumlah gambar yang diproses bersamaan
+                (default: jumlah thread analisis ditambah dua kali jumlah
+                thread decode).
+            instrument: Jika True, setiap record membawa ukuran per tahap
+                pada kunci "metrics" (tanpa alokasi memori, karena thread
+                analisis berjalan bersamaan).
+            cv_threads: Jumlah thread internal OpenCV (default: bawaan
+                OpenCV), misalnya dari plan_parallelism.
+
+        Raises:
+            ValueError: Jika jumlah thread atau batas memori tidak positif.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        if self.workers < 1 or decode_threads < 1:
+            raise ValueError("Jumlah thread harus positif")
+        if memory_limit_mb <= 0:
+            raise ValueError("Batas memori harus positif")
+
+        self.mode: AnalysisMode = mode
+        self.params = params
+        self.decode_threads = decode_threads
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.max_in_flight = max_in_flight or self.workers + decode_threads * 2
+        self.instrument = instrument
+        self.peak_reserved = 0
+        if cv_threads is not None:
+            # Thread analisis berbagi pengaturan OpenCV proses ini
+            configure_threads(cv_threads)
+
+    def working_set(self) -> int:
+        """
+        Memperkirakan memori kerja tetap semua thread analisis.
+
+        Workspace per thread menyimpan buffer seukuran gambar selebar
+        params.width dan tetap hidup di antara gambar. Pengukuran ROI pada
+        mode multi tidak memakai workspace dan dipesan per gambar.
+
+        Returns:
+            Perkiraan dalam byte.
+        """
+        width = self.params.width
+        # Aspect ratio 4:3 seperti perkiraan pada plan_parallelism
+        pixels = width * width * 3 // 4
+        return self.workers * pixels * WORKSPACE_BYTES_PER_PIXEL
+
+    def _estimate(self, path: str) -> tuple[int, int]:
+        # Mengembalikan memori puncak decode dan memori kerja ROI
+        gray = self.mode == "intensity"
+        multi = self.mode == "segmentation" and self.params.resolution == "multi"
+        width = self.params.decode_width if multi else self.params.width
+        peak = decode_peak_bytes(path, width, gray)
+        shape = decoded_shape(path, width, gray)
+        if peak is None or shape is None:
+            try:
+                peak = os.path.getsize(path) * UNKNOWN_EXPANSION
+            except OSError:
+                # Decode akan gagal dan dilaporkan sebagai record error
+                return 0, 0
+            pixels = peak // 3
+        else:
+            pixels = shape[0] * shape[1]
+        # ROI tidak lebih besar dari gambar hasil decode (resolusi asli jika
+        # measure_width 0)
+        return peak, pixels * WORKSPACE_BYTES_PER_PIXEL if multi else 0
+
+    def _load(self, task: _Task) -> int:
+        # Gambar disimpan di task, bukan sebagai hasil future, agar dapat
+        # dilepas segera setelah analisisnya selesai
+        task.img = _decode(task.path, self.mode, self.params, task.instrumentation)
+        return task.img.nbytes  # pyright: ignore[reportAny]
+
+    def _analyze(self, task: _Task) -> Record:
+        # Task hanya dikirim ke analisis setelah _load berhasil
+        img, task.img = cast(MatLike, task.img), None
+        return _record(task.path, img, self.mode, self.params, task.instrumentation)
+
+    def run(self, paths: Iterable[str]) -> Iterator[Record]:
+        """
+        Menganalisis file gambar dalam batas memori.
+
+        Args:
+            paths: Path file gambar; boleh berupa generator yang sangat
+                panjang seperti iter_image_files.
+
+        Yields:
+            Record hasil analisis sesuai urutan selesai.
+        """
+        budget = max(self.memory_limit - self.working_set(), 0)
+        iterator = iter(paths)
+        waiting: _Task | None = None
+        exhausted = False
+        reserved = 0
+        decoding: dict[Future[int], _Task] = {}
+        analyzing: dict[Future[Record], _Task] = {}
+
+        with (
+            ThreadPoolExecutor(self.decode_threads, "decode") as decoder,
+            ThreadPoolExecutor(self.workers, "analysis") as analyzer,
+        ):
+            try:
+                while True:
+                    # Terima gambar baru selama anggaran dan jumlahnya cukup
+                    while not exhausted:
+                        if len(decoding) + len(analyzing) >= self.max_in_flight:
+                            break
+                        if waiting is None:
+                            try:
+                                path = next(iterator)
+                            except StopIteration:
+                                exhausted = True
+                                break
+                            # reset_peak tracemalloc berlaku untuk semua
+                            # thread sehingga alokasi per tahap tidak diukur
+                            inst = (
+                                Instrumentation(path, track_alloc=False)
+                                if self.instrument
+                                else None
+                            )
+                            waiting = _Task(path, *self._estimate(path), inst)
+                        idle = not decoding and not analyzing
+                        needed = waiting.reserved + waiting.analysis
+                        if reserved + needed > budget and not idle:
+                            break
+
+                        task, waiting = waiting, None
+                        reserved += needed
+                        decoding[decoder.submit(self._load, task)] = task
+                    self.peak_reserved = max(self.peak_reserved, reserved)
+
+                    if not decoding and not analyzing:
+                        break
+
+                    done, _ = wait([*decoding, *analyzing], return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in decoding:
+                            task = decoding.pop(future)  # pyright: ignore[reportArgumentType]
+                            try:
+                                nbytes = cast(int, future.result())
+                            except Exception as e:
+                                reserved -= task.reserved + task.analysis
+                                yield _error_record(task.path, e, task.instrumentation)
+                                continue
+                            # Ganti perkiraan dengan ukuran hasil decode sebenarnya
+                            reserved += nbytes - task.reserved
+                            task.reserved = nbytes
+                            self.peak_reserved = max(self.peak_reserved, reserved)
+                            analyzing[analyzer.submit(self._analyze, task)] = task
+                        else:
+                            task = analyzing.pop(future)  # pyright: ignore[reportArgumentType]
+                            reserved -= task.reserved + task.analysis
+                            yield cast(Record, future.result())
+            finally:
+                # Gambar yang belum dimulai tidak perlu didecode atau dianalisis
+                for pending in (*decoding, *analyzing):
+                    _ = pending.cancel()
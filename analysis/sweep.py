@@ -0,0 +1,333 @@
+import itertools
+import os
+from collections.abc import Callable, Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, replace
+from typing import cast, final
+
+import cv2
+from cv2.typing import MatLike
+
+from utils import load_image, resize_image
+
+from .batch import Record
+from .intensity import analyze_intensity, diagnose_cataract
+from .segmentation import (
+    DEFAULT_PARAMS,
+    SegmentationParams,
+    compute_percentage,
+    detect_iris,
+    filter_image,
+    mask_circle,
+    measure_cataract,
+    measure_cataract_pixels,
+    measure_pupil,
+    measure_pupil_pixels,
+    open_image,
+    threshold_image,
+    to_grayscale,
+)
+
+type Sweep = Mapping[str, Sequence[object]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    Satu simpul pada graf tahap pipeline.
+
+    Attributes:
+        name: Nama tahap.
+        inputs: Nama tahap yang hasilnya menjadi argumen fn, sesuai urutan.
+        fields: Nama field SegmentationParams yang memengaruhi tahap ini.
+        fn: Fungsi fn(params, *hasil_input) yang menghitung hasil tahap.
+    """
+
+    name: str
+    inputs: tuple[str, ...]
+    fields: tuple[str, ...]
+    fn: Callable[..., object]
+
+
+@dataclass
+class _Failed:
+    error: Exception
+
+
+@final
+class StageGraph:
+    """
+    Graf tahap pipeline dengan memoization berdasarkan parameter.
+
+    Kunci memo suatu tahap terdiri dari nilai field miliknya dan kunci semua
+    tahap input, sehingga hasil tahap hanya dihitung ulang jika parameter
+    yang benar-benar memengaruhinya berubah. Misalnya gambar hasil filter
+    dipakai bersama oleh semua nilai threshold, dan gambar threshold oleh
+    semua ukuran kernel opening. Error (misalnya iris tidak terdeteksi) juga
+    dimemo.
+    """
+
+    def __init__(self, stages: Iterable[Stage]):
+        """
+        Inisialisasi graf.
+
+        Args:
+            stages: Tahap-tahap graf; input harus didefinisikan lebih dulu,
+                kecuali "source" yang dipasang dengan reset().
+
+        Raises:
+            ValueError: Jika suatu tahap memakai input yang belum didefinisikan.
+        """
+        self.stages: dict[str, Stage] = {}
+        for stage in stages:
+            for name in stage.inputs:
+                if name != "source" and name not in self.stages:
+                    raise ValueError(
+                        f"Tahap {stage.name} memakai input {name} yang belum "
+                        "didefinisikan"
+                    )
+            self.stages[stage.name] = stage
+        self.memo: dict[tuple[object, ...], object] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def reset(self, source: MatLike) -> None:
+        """
+        Mengosongkan memo dan memasang gambar sumber baru.
+
+        Args:
+            source: Gambar hasil decode yang menjadi input tahap "source".
+        """
+        self.memo = {("source",): source}
+
+    def key(self, name: str, params: SegmentationParams) -> tuple[object, ...]:
+        """
+        Menghitung kunci memo suatu tahap untuk parameter tertentu.
+
+        Args:
+            name: Nama tahap.
+            params: Parameter pipeline.
+
+        Returns:
+            Tuple yang dapat di-hash.
+        """
+        if name == "source":
+            return ("source",)
+        stage = self.stages[name]
+        own = tuple(getattr(params, field) for field in stage.fields)  # pyright: ignore[reportAny]
+        return (name, own, *(self.key(i, params) for i in stage.inputs))
+
+    def evaluate(self, name: str, params: SegmentationParams) -> object:
+        """
+        Mengambil hasil tahap dari memo atau menghitungnya.
+
+        Args:
+            name: Nama tahap.
+            params: Parameter pipeline.
+
+        Returns:
+            Hasil tahap.
+
+        Raises:
+            Exception: Error yang terjadi saat tahap (atau inputnya) dihitung.
+        """
+        key = self.key(name, params)
+        if key in self.memo:
+            self.hits += 1
+            value = self.memo[key]
+        else:
+            self.misses += 1
+            stage = self.stages[name]
+            try:
+                inputs = [self.evaluate(i, params) for i in stage.inputs]
+                value = stage.fn(params, *inputs)
+            except Exception as e:
+                value = _Failed(e)
+            self.memo[key] = value
+
+        if isinstance(value, _Failed):
+            raise value.error
+        return value
+
+
+def _measure(
+    params: SegmentationParams, masked: tuple[MatLike, MatLike]
+) -> tuple[float, float]:
+    img_morpho_copy, imgg_inv = masked
+    if params.measurement == "pixels":
+        pupil_area = measure_pupil_pixels(img_morpho_copy)
+        cat_area, _ = measure_cataract_pixels(imgg_inv, pupil_area, params)
+    else:
+        pupil_area = measure_pupil(img_morpho_copy)
+        cat_area, _ = measure_cataract(imgg_inv, pupil_area, params)
+    return pupil_area, cat_area
+
+
+def _mask(
+    _: SegmentationParams, morpho: MatLike, circle: tuple[int, int, int]
+) -> tuple[MatLike, MatLike]:
+    img_morpho_copy = mask_circle(morpho, circle)
+    return img_morpho_copy, cv2.bitwise_not(img_morpho_copy)
+
+
+# Field yang memengaruhi pencarian iris
+_HOUGH_FIELDS = (
+    "hough_dp",
+    "hough_min_dist",
+    "hough_param1",
+    "hough_param2",
+    "localization",
+    "pyramid_width",
+    "min_radius_ratio",
+    "max_radius_ratio",
+    "refine_margin",
+)
+
+# Tahap pipeline segmentasi dan intensitas; diagnosis tidak dimemo karena
+# hanya membandingkan mean dengan batas
+PIPELINE_STAGES = (
+    Stage("resize", ("source",), ("width",), lambda p, i: resize_image(i, p.width)),
+    Stage("gray", ("resize",), (), lambda _, i: to_grayscale(i)),
+    Stage("filter", ("gray",), ("filter_size",), lambda p, i: filter_image(i, p)),
+    Stage(
+        "threshold", ("filter",), ("threshold",), lambda p, i: threshold_image(i, p)
+    ),
+    Stage(
+        "morphology", ("threshold",), ("kernel_size",), lambda p, i: open_image(i, p)
+    ),
+    Stage("hough", ("morphology",), _HOUGH_FIELDS, lambda p, i: detect_iris(i, p)),
+    Stage("masking", ("morphology", "hough"), (), _mask),
+    Stage("areas", ("masking",), ("measurement", "min_area"), _measure),
+    Stage("intensity", ("gray",), (), lambda _, i: analyze_intensity(i)),
+)
+
+
+# Field yang dipakai tahap di atas atau diagnosis; field lain (misalnya
+# resolution dan screen_width) tidak berpengaruh pada pipeline sweep
+SWEEP_FIELDS = frozenset(
+    {name for stage in PIPELINE_STAGES for name in stage.fields}
+    | {"mild_threshold", "severe_threshold"}
+)
+
+
+def expand_grid(
+    sweep: Sweep, base: SegmentationParams = DEFAULT_PARAMS
+) -> list[SegmentationParams]:
+    """
+    Membuat semua kombinasi parameter dari grid.
+
+    Urutan kombinasi membuat field yang didefinisikan lebih dulu pada
+    SegmentationParams (tahap awal pipeline) berubah paling jarang.
+
+    Args:
+        sweep: Nama field ke daftar nilai yang dicoba.
+        base: Parameter untuk field yang tidak disapu.
+
+    Returns:
+        Daftar parameter untuk setiap titik grid.
+
+    Raises:
+        ValueError: Jika nama field tidak dikenal atau tidak dipakai
+            pipeline sweep (lihat SWEEP_FIELDS).
+    """
+    order = [f.name for f in fields(SegmentationParams)]
+    for name in sweep:
+        if name not in order:
+            raise ValueError(f"Parameter {name} tidak dikenal")
+        if name not in SWEEP_FIELDS:
+            raise ValueError(f"Parameter {name} tidak didukung oleh sweep")
+
+    names = sorted(sweep, key=order.index)
+    return [
+        replace(base, **dict(zip(names, values)))  # pyright: ignore[reportArgumentType]
+        for values in itertools.product(*(sweep[name] for name in names))
+    ]
+
+
+def sweep_image(
+    path: str, points: Sequence[SegmentationParams], swept: Sequence[str]
+) -> tuple[list[Record], int, int]:
+    """
+    Mengevaluasi semua titik grid pada satu gambar dengan memo bersama.
+
+    Args:
+        path: Path ke file gambar.
+        points: Parameter setiap titik grid.
+        swept: Nama field yang disapu; nilainya disertakan pada record.
+
+    Returns:
+        Tuple berisi record per titik grid, jumlah tahap yang diambil dari
+        memo, dan jumlah tahap yang dihitung.
+    """
+    try:
+        # Decode sekali pada lebar terbesar yang dicoba
+        img = load_image(path, width=max(p.width for p in points))
+    except ValueError as e:
+        records: list[Record] = [
+            {"path": path, "point": i, "status": "error", "error": str(e)}
+            for i in range(len(points))
+        ]
+        return records, 0, 0
+
+    graph = StageGraph(PIPELINE_STAGES)
+    graph.reset(img)
+    records = []
+    for i, params in enumerate(points):
+        record: Record = {"path": path, "point": i}
+        record.update({name: getattr(params, name) for name in swept})  # pyright: ignore[reportAny]
+        try:
+            intensity = graph.evaluate("intensity", params)
+            mean_val = cast(float, intensity.mean_val)  # pyright: ignore[reportAttributeAccessIssue]
+            status, description = diagnose_cataract(
+                mean_val, params.mild_threshold, params.severe_threshold
+            )
+            record.update(
+                mean=mean_val,
+                std=intensity.std_val,  # pyright: ignore[reportAttributeAccessIssue]
+                diagnosis=status,
+                description=description,
+            )
+            pupil_area, cat_area = cast(
+                tuple[float, float], graph.evaluate("areas", params)
+            )
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        else:
+            record.update(
+                status="ok",
+                pupil_area=pupil_area,
+                cat_area=cat_area,
+                cataract_percentage=compute_percentage(pupil_area, cat_area),
+            )
+        records.append(record)
+    return records, graph.hits, graph.misses
+
+
+def run_sweep(
+    paths: Iterable[str],
+    points: Sequence[SegmentationParams],
+    swept: Sequence[str],
+    workers: int | None = None,
+) -> Iterator[tuple[list[Record], int, int]]:
+    """
+    Menjalankan sweep pada banyak gambar, satu gambar per tugas worker.
+
+    Args:
+        paths: Path file gambar.
+        points: Parameter setiap titik grid.
+        swept: Nama field yang disapu.
+        workers: Jumlah proses worker (default: jumlah CPU).
+
+    Yields:
+        Hasil sweep_image untuk setiap gambar sesuai urutan input.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for path in paths:
+            yield sweep_image(path, points, swept)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(
+            sweep_image, paths, itertools.repeat(points), itertools.repeat(swept)
+        )
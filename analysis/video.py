@@ -0,0 +1,187 @@
+import statistics
+import time
+from collections.abc import Iterator
+from typing import cast, final
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from utils import resize_image
+
+from .batch import Record
+from .instrumentation import Instrumentation
+from .segmentation import (
+    DEFAULT_PARAMS,
+    SegmentationParams,
+    segment_image,
+    to_grayscale,
+)
+from .workspace import Workspace
+
+# Lebar thumbnail untuk mendeteksi frame yang hampir identik
+SIGNATURE_WIDTH = 32
+
+
+@final
+class VideoStream:
+    """
+    Menganalisis video frame demi frame dengan pelacakan iris.
+
+    Lingkaran iris dari frame sebelumnya dipakai untuk membatasi pencarian
+    pada frame berikutnya; HoughCircles penuh hanya dijalankan pada frame
+    pertama dan saat pelacakan gagal. Frame yang hampir identik dengan frame
+    terakhir yang dianalisis (selisih rata-rata thumbnail grayscale di bawah
+    duplicate_threshold) tidak dianalisis ulang dan memakai hasil frame
+    tersebut.
+
+    Iterasi menghasilkan satu record per frame; ringkasan tersedia dari
+    summary() selama maupun setelah iterasi.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        params: SegmentationParams = DEFAULT_PARAMS,
+        duplicate_threshold: float = 2.0,
+        max_frames: int | None = None,
+    ):
+        """
+        Inisialisasi stream.
+
+        Args:
+            path: Path file video (atau URL yang didukung VideoCapture).
+            params: Parameter pipeline segmentasi.
+            duplicate_threshold: Batas selisih intensitas rata-rata (0-255)
+                untuk menganggap frame duplikat; 0 menonaktifkan.
+            max_frames: Jumlah frame maksimum yang dibaca (opsional).
+        """
+        self.path = path
+        self.params = params
+        self.duplicate_threshold = duplicate_threshold
+        self.max_frames = max_frames
+
+        self.frames = 0
+        self.analyzed = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.tracking_losses = 0
+        self.elapsed = 0.0
+        self._percentages: list[float] = []
+
+    def __iter__(self) -> Iterator[Record]:
+        capture = cv2.VideoCapture(self.path)
+        if not capture.isOpened():
+            raise ValueError(f"Gagal membuka video {self.path}")
+
+        fps = capture.get(cv2.CAP_PROP_FPS) or 0.0
+        workspace = Workspace()
+        prior: tuple[int, int, int] | None = None
+        last_signature: MatLike | None = None
+        last_result: Record | None = None
+        start = time.perf_counter()
+        try:
+            while self.max_frames is None or self.frames < self.max_frames:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                index = self.frames
+                self.frames += 1
+
+                img = resize_image(frame, width=self.params.width)
+                gray = to_grayscale(img)
+                signature = self._signature(gray)
+
+                record: Record = {"frame": index}
+                if fps > 0:
+                    record["time_s"] = index / fps
+
+                if (
+                    last_result is not None
+                    and last_signature is not None
+                    and self._is_duplicate(signature, last_signature)
+                ):
+                    self.duplicates += 1
+                    record.update(last_result, duplicate=True)
+                    self.elapsed = time.perf_counter() - start
+                    yield record
+                    continue
+
+                last_signature = signature
+                last_result = self._analyze(img, gray, prior, workspace)
+                if last_result["status"] == "ok":
+                    prior = (
+                        cast(int, last_result["circle_x"]),
+                        cast(int, last_result["circle_y"]),
+                        cast(int, last_result["circle_r"]),
+                    )
+                else:
+                    # Cari ulang dari awal pada frame berikutnya
+                    prior = None
+
+                record.update(last_result, duplicate=False)
+                self.elapsed = time.perf_counter() - start
+                yield record
+        finally:
+            capture.release()
+
+    def _signature(self, gray: MatLike) -> MatLike:
+        return resize_image(gray, width=SIGNATURE_WIDTH)
+
+    def _is_duplicate(self, signature: MatLike, previous: MatLike) -> bool:
+        if self.duplicate_threshold <= 0 or signature.shape != previous.shape:
+            return False
+        diff = cv2.absdiff(signature, previous)
+        return float(np.mean(diff)) < self.duplicate_threshold  # pyright: ignore[reportAny]
+
+    def _analyze(
+        self,
+        img: MatLike,
+        gray: MatLike,
+        prior: tuple[int, int, int] | None,
+        workspace: Workspace,
+    ) -> Record:
+        self.analyzed += 1
+        # Hanya dipakai untuk membaca jumlah kegagalan pelacakan
+        inst = Instrumentation()
+        try:
+            result = segment_image(
+                img,
+                self.params,
+                instrumentation=inst,
+                workspace=workspace,
+                gray=gray,
+                prior=prior,
+            )
+        except ValueError as e:
+            self.errors += 1
+            return {"status": "error", "error": str(e)}
+        finally:
+            self.tracking_losses += inst.metrics.counts.get("tracking_lost", 0)
+
+        self._percentages.append(result.cataract_percentage)
+        return {"status": "ok", **result.to_dict()}
+
+    def summary(self) -> dict[str, object]:
+        """
+        Mengembalikan ringkasan frame yang sudah diproses.
+
+        Returns:
+            Dictionary berisi jumlah frame, frame yang dianalisis, duplikat,
+            error, kecepatan pemrosesan, dan statistik persentase katarak.
+        """
+        percentages = self._percentages
+        return {
+            "path": self.path,
+            "frames": self.frames,
+            "analyzed": self.analyzed,
+            "duplicates": self.duplicates,
+            "errors": self.errors,
+            "tracking_losses": self.tracking_losses,
+            "fps": self.frames / self.elapsed if self.elapsed > 0 else 0.0,
+            "mean_percentage": statistics.fmean(percentages) if percentages else None,
+            "median_percentage": (
+                statistics.median(percentages) if percentages else None
+            ),
+            "max_percentage": max(percentages) if percentages else None,
+        }
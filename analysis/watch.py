@@ -0,0 +1,326 @@
+import json
+import os
+import queue
+from collections.abc import Callable
+from dataclasses import dataclass
+from threading import Event, Lock, Thread
+from typing import TextIO, cast, final
+
+from utils import iter_image_files
+
+from .batch import BatchRunner, Record
+from .cache import hash_file
+
+
+@dataclass(frozen=True)
+class FileState:
+    """
+    Identitas satu file pada saat diproses.
+
+    Attributes:
+        mtime_ns: Waktu modifikasi dalam nanodetik.
+        size: Ukuran file dalam byte.
+        sha256: Hash isi file.
+    """
+
+    mtime_ns: int
+    size: int
+    sha256: str
+
+
+@final
+class Journal:
+    """
+    Jurnal append-only (JSON lines) berisi setiap file yang sudah diproses.
+
+    Setiap baris menyimpan path, mtime, ukuran, hash isi, dan record hasil.
+    Saat dibuka ulang, jurnal dibaca kembali sehingga file yang tidak berubah
+    tidak diproses lagi, dan file dengan isi yang sama (misalnya disalin
+    ulang) memakai hasil sebelumnya. Baris terakhir yang terpotong karena
+    proses berhenti mendadak diabaikan.
+    """
+
+    def __init__(self, path: str):
+        """
+        Membuka jurnal dan memuat entri yang sudah ada.
+
+        Args:
+            path: Path file jurnal.
+        """
+        self.path = path
+        self._files: dict[str, tuple[int, int]] = {}
+        self._results: dict[str, Record] = {}
+        self._lock = Lock()
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = cast(dict[str, object], json.loads(line))
+                    except json.JSONDecodeError:
+                        continue
+                    self._load(entry)
+
+        self._file: TextIO = open(path, "a", encoding="utf-8")
+
+    def _load(self, entry: dict[str, object]) -> None:
+        path = cast(str, entry["path"])
+        self._files[path] = (cast(int, entry["mtime_ns"]), cast(int, entry["size"]))
+        record = cast(Record, entry["record"])
+        if record.get("status") == "ok":
+            self._results[cast(str, entry["sha256"])] = record
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Menutup file jurnal.
+        """
+        self._file.close()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def is_processed(self, path: str, mtime_ns: int, size: int) -> bool:
+        """
+        Memeriksa apakah file dengan mtime dan ukuran ini sudah diproses.
+
+        Args:
+            path: Path file.
+            mtime_ns: Waktu modifikasi dalam nanodetik.
+            size: Ukuran file dalam byte.
+
+        Returns:
+            True jika file sudah tercatat dan tidak berubah.
+        """
+        with self._lock:
+            return self._files.get(path) == (mtime_ns, size)
+
+    def lookup(self, sha256: str) -> Record | None:
+        """
+        Mengambil record hasil yang berhasil untuk isi file yang sama.
+
+        Args:
+            sha256: Hash isi file.
+
+        Returns:
+            Record tanpa kunci "path", atau None jika belum pernah diproses.
+        """
+        with self._lock:
+            record = self._results.get(sha256)
+        return None if record is None else dict(record)
+
+    def append(self, path: str, state: FileState, record: Record) -> None:
+        """
+        Mencatat satu file yang sudah diproses.
+
+        Args:
+            path: Path file.
+            state: Identitas file saat diproses.
+            record: Record hasil (kunci "path" dan "metrics" tidak disimpan).
+        """
+        stored = {k: v for k, v in record.items() if k not in ("path", "metrics")}
+        entry: dict[str, object] = {
+            "path": path,
+            "mtime_ns": state.mtime_ns,
+            "size": state.size,
+            "sha256": state.sha256,
+            "record": stored,
+        }
+        with self._lock:
+            _ = self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            self._load(entry)
+
+
+@final
+class FolderWatcher:
+    """
+    Memantau direktori dengan polling dan menganalisis gambar baru.
+
+    Thread pemindai memasukkan file baru ke antrean terbatas; jika antrean
+    penuh, pemindaian menunggu sehingga lonjakan upload tidak menumpuk di
+    memori. File baru dianggap siap setelah ukuran dan mtime-nya sama pada
+    dua pemindaian berturut-turut, agar file yang masih ditulis tidak ikut
+    diproses.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        runner: BatchRunner,
+        journal: Journal,
+        recursive: bool = False,
+        interval: float = 2.0,
+        queue_size: int = 64,
+    ):
+        """
+        Inisialisasi watcher.
+
+        Args:
+            directory: Direktori yang dipantau.
+            runner: Runner yang menjalankan analisis.
+            journal: Jurnal file yang sudah diproses.
+            recursive: Jika True, pantau juga subdirektori.
+            interval: Jeda antar pemindaian dalam detik.
+            queue_size: Batas jumlah file yang menunggu dianalisis.
+        """
+        self.directory = directory
+        self.runner = runner
+        self.journal = journal
+        self.recursive = recursive
+        self.interval = interval
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=queue_size)
+        self._pending: dict[str, FileState] = {}
+        self._candidates: dict[str, tuple[int, int]] = {}
+        self._lock = Lock()
+        self._output_lock = Lock()
+        self._stop = Event()
+        self._done = Event()
+
+    def stop(self) -> None:
+        """
+        Meminta watcher berhenti setelah file yang sedang dianalisis selesai.
+        """
+        self._stop.set()
+
+    def run(
+        self, on_record: Callable[[Record], None], once: bool = False
+    ) -> None:
+        """
+        Menjalankan pemantauan sampai stop dipanggil.
+
+        Args:
+            on_record: Dipanggil untuk setiap record hasil, baik hasil
+                analisis maupun hasil yang diambil dari jurnal.
+            once: Jika True, berhenti setelah semua file yang ada selesai
+                diproses.
+        """
+        self._stop.clear()
+        self._done.clear()
+        scanner = Thread(target=self._scan_loop, args=(on_record, once), daemon=True)
+        scanner.start()
+        try:
+            while (chunk := self._next_chunk()) is not None:
+                for record in self.runner.run_paths(chunk):
+                    path = cast(str, record["path"])
+                    with self._lock:
+                        state = self._pending.pop(path)
+                    self.journal.append(path, state, record)
+                    with self._output_lock:
+                        on_record(record)
+        finally:
+            self._stop.set()
+            self._done.set()
+            scanner.join()
+
+    def _next_chunk(self) -> list[str] | None:
+        # Menunggu file pertama, lalu mengambil file lain yang sudah
+        # mengantre sampai batas in-flight runner. None berarti selesai.
+        while True:
+            try:
+                path = self._queue.get(timeout=0.5)
+                break
+            except queue.Empty:
+                if self._stop.is_set():
+                    return None
+        if path is None:
+            return None
+
+        chunk = [path]
+        while len(chunk) < self.runner.max_in_flight:
+            try:
+                path = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if path is None:
+                # Kembalikan penanda akhir untuk pemanggilan berikutnya
+                self._queue.put(None)
+                break
+            chunk.append(path)
+        return chunk
+
+    def _scan_loop(self, on_record: Callable[[Record], None], once: bool) -> None:
+        try:
+            while not self._stop.is_set():
+                waiting = self.scan(on_record)
+                if once and not waiting:
+                    break
+                _ = self._stop.wait(self.interval)
+        finally:
+            self._put(None)
+
+    def scan(self, on_record: Callable[[Record], None]) -> int:
+        """
+        Memindai direktori satu kali dan mengantrekan file yang siap.
+
+        Args:
+            on_record: Dipanggil untuk file yang hasilnya diambil dari jurnal.
+
+        Returns:
+            Jumlah file yang masih menunggu stabil atau sedang diproses.
+        """
+        candidates: dict[str, tuple[int, int]] = {}
+        for path in iter_image_files([self.directory], recursive=self.recursive):
+            if self._stop.is_set():
+                break
+            with self._lock:
+                if path in self._pending:
+                    continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+
+            current = (st.st_mtime_ns, st.st_size)
+            if self.journal.is_processed(path, *current):
+                continue
+            if self._candidates.get(path) != current:
+                # Tunggu satu pemindaian lagi untuk memastikan file selesai ditulis
+                candidates[path] = current
+                continue
+            self._submit(path, current, on_record)
+
+        self._candidates = candidates
+        with self._lock:
+            return len(candidates) + len(self._pending)
+
+    def _submit(
+        self,
+        path: str,
+        current: tuple[int, int],
+        on_record: Callable[[Record], None],
+    ) -> None:
+        try:
+            state = FileState(*current, sha256=hash_file(path))
+        except OSError:
+            return
+
+        cached = self.journal.lookup(state.sha256)
+        if cached is not None:
+            record = {"path": path, **cached}
+            self.journal.append(path, state, record)
+            with self._output_lock:
+                on_record(record)
+            return
+
+        with self._lock:
+            self._pending[path] = state
+        self._put(path)
+
+    def _put(self, path: str | None) -> None:
+        # Menunggu selama antrean penuh (back-pressure). File baru tidak
+        # diantrekan lagi setelah stop diminta, tetapi penanda akhir (None)
+        # tetap dikirim selama analisis masih membaca antrean
+        while not self._done.is_set():
+            if path is not None and self._stop.is_set():
+                return
+            try:
+                self._queue.put(path, timeout=0.5)
+                return
+            except queue.Full:
+                continue
@@ -0,0 +1,133 @@
+from typing import cast, final
+
+import numpy as np
+from cv2.typing import MatLike
+from numpy.typing import DTypeLike, NDArray
+
+
+@final
+class Workspace:
+    """
+    Buffer yang dipakai ulang antar gambar oleh pipeline segmentasi.
+
+    Setiap buffer diidentifikasi dengan nama dan hanya dialokasikan ulang
+    jika shape atau dtype-nya berubah, sehingga batch dengan ukuran gambar
+    yang sama tidak melakukan alokasi besar setelah gambar pertama. Kernel
+    filter dan morfologi juga dihitung sekali per ukuran.
+
+    Gambar pada hasil yang dibuat dengan workspace menunjuk ke buffer ini dan
+    akan tertimpa oleh gambar berikutnya; salin dulu jika perlu disimpan.
+    Workspace tidak thread-safe.
+    """
+
+    def __init__(self):
+        """
+        Inisialisasi workspace kosong.
+        """
+        self._buffers: dict[str, NDArray[np.generic]] = {}
+        self._box_kernels: dict[int, NDArray[np.float32]] = {}
+        self._morph_kernels: dict[int, NDArray[np.uint8]] = {}
+
+    def buffer(
+        self, name: str, shape: tuple[int, ...], dtype: DTypeLike = np.uint8
+    ) -> NDArray[np.generic]:
+        """
+        Mengembalikan buffer bernama dengan shape dan dtype tertentu.
+
+        Isi buffer tidak diinisialisasi ulang.
+
+        Args:
+            name: Nama buffer, misalnya "gray".
+            shape: Shape yang dibutuhkan.
+            dtype: Tipe data yang dibutuhkan.
+
+        Returns:
+            Array yang dapat dipakai sebagai argumen dst OpenCV.
+        """
+        buf = self._buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != np.dtype(dtype):
+            buf = np.empty(shape, dtype)
+            self._buffers[name] = buf
+        return buf
+
+    def like(self, name: str, img: MatLike, channels: int | None = None) -> MatLike:
+        """
+        Mengembalikan buffer bernama seukuran gambar.
+
+        Args:
+            name: Nama buffer.
+            img: Gambar acuan untuk tinggi, lebar, dan dtype.
+            channels: Jumlah kanal; None berarti grayscale (2 dimensi).
+
+        Returns:
+            Buffer dengan tinggi dan lebar yang sama dengan img.
+        """
+        rows = cast(int, img.shape[0])
+        cols = cast(int, img.shape[1])
+        shape = (rows, cols) if channels is None else (rows, cols, channels)
+        return self.buffer(name, shape, img.dtype)
+
+    def box_kernel(self, size: int) -> NDArray[np.float32]:
+        """
+        Mengembalikan kernel box filter ternormalisasi berukuran size x size.
+
+        Args:
+            size: Ukuran kernel.
+
+        Returns:
+            Kernel float32.
+        """
+        kernel = self._box_kernels.get(size)
+        if kernel is None:
+            kernel = np.ones((size, size), np.float32) / (size * size)
+            self._box_kernels[size] = kernel
+        return kernel
+
+    def morph_kernel(self, size: int) -> NDArray[np.uint8]:
+        """
+        Mengembalikan kernel morfologi persegi berukuran size x size.
+
+        Args:
+            size: Ukuran kernel.
+
+        Returns:
+            Kernel uint8.
+        """
+        kernel = self._morph_kernels.get(size)
+        if kernel is None:
+            kernel = np.ones((size, size), np.uint8)
+            self._morph_kernels[size] = kernel
+        return kernel
+
+    def circle_mask(
+        self, shape: tuple[int, int], circle: tuple[int, int, int]
+    ) -> NDArray[np.uint8]:
+        """
+        Membuat mask sirkular (x - cx)^2 + (y - cy)^2 <= r^2 tanpa alokasi baru.
+
+        Hasilnya identik dengan mask np.ogrid pada mask_circle.
+
+        Args:
+            shape: Tinggi dan lebar gambar.
+            circle: Lingkaran (x, y, r).
+
+        Returns:
+            Mask uint8 bernilai 1 di dalam lingkaran dan 0 di luar.
+        """
+        rows, cols = shape
+        x, y, r = circle
+
+        dx = self.buffer("circle_dx", (1, cols), np.int64)
+        dy = self.buffer("circle_dy", (rows, 1), np.int64)
+        dx[0] = np.arange(cols)
+        dy[:, 0] = np.arange(rows)
+        _ = np.subtract(dx, x, out=dx)
+        _ = np.multiply(dx, dx, out=dx)
+        _ = np.subtract(dy, y, out=dy)
+        _ = np.multiply(dy, dy, out=dy)
+
+        dist = self.buffer("circle_dist", (rows, cols), np.int64)
+        _ = np.add(dy, dx, out=dist)
+        inside = cast(NDArray[np.bool_], self.buffer("circle_mask", (rows, cols), bool))
+        _ = np.less_equal(dist, r * r, out=inside)
+        return inside.view(np.uint8)
@@ -0,0 +1,602 @@
+"""
+Harness kesetaraan hasil antara pipeline referensi dan varian yang dipercepat.
+
+Setiap varian (decode tereduksi, interpolasi lain, pengukuran area piksel,
+Hough coarse-to-fine, kandidat Hough lebih sedikit, cascade, multi-resolusi,
+atau mode intensity) dijalankan pada korpus yang sama dengan pipeline
+referensi (decode penuh, INTER_AREA, parameter default). Area pupil, area
+katarak, persentase, posisi lingkaran, mean, dan diagnosis dibandingkan
+dengan toleransi yang dapat diatur, lalu dilaporkan bersama percepatannya.
+
+Varian yang hanya mengganti jalur data (dataset hasil pack dan intensitas
+batch) dibandingkan dengan varian file yang setara, bukan dengan referensi,
+dan harus menghasilkan nilai yang sama persis.
+
+    python -m benchmarks.equivalence arsip/ --recursive --variant pixels
+    python -m benchmarks.equivalence --resolution 12mp --images 8 --strict
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Literal
+
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from analysis import (
+    DEFAULT_PARAMS,
+    DIAGNOSIS_CODES,
+    AnalysisMode,
+    PackedDataset,
+    SegmentationParams,
+    analyze_combined,
+    analyze_intensity_batch,
+    analyze_packed,
+    analyze_record,
+    pack_dataset,
+)
+from benchmarks.synthetic import RESOLUTIONS, SYNTHETIC_PARAMS, write_eye_image
+from utils import iter_image_files, load_image, resize_image
+
+type Record = dict[str, object]
+
+# Sumber gambar varian: file per gambar, dataset hasil pack_dataset, atau
+# tumpukan grayscale untuk analyze_intensity_batch
+type Source = Literal["file", "packed", "batch"]
+
+
+@dataclass(frozen=True)
+class Variant:
+    """
+    Satu konfigurasi pipeline yang dibandingkan dengan referensi.
+
+    Attributes:
+        name: Nama varian pada laporan.
+        params: Parameter pipeline segmentasi.
+        reduced_decode: Jika True, JPEG didecode pada skala 1/2, 1/4, atau
+            1/8 seperti load_image dengan width (hanya mode combined dari
+            file; mode lain selalu memakai decode analyze_record).
+        interpolation: Metode interpolasi resize (hanya mode combined dari
+            file).
+        mode: Salah satu dari ANALYSIS_MODES.
+        source: Asal gambar yang dianalisis.
+        baseline: Nama varian pembanding yang harus disamai persis, atau
+            None untuk membandingkan dengan referensi memakai toleransi.
+    """
+
+    name: str
+    params: SegmentationParams = DEFAULT_PARAMS
+    reduced_decode: bool = True
+    interpolation: int = cv2.INTER_AREA
+    mode: AnalysisMode = "combined"
+    source: Source = "file"
+    baseline: str | None = None
+
+
+@dataclass(frozen=True)
+class Tolerances:
+    """
+    Batas deviasi varian terhadap referensi yang masih dianggap setara.
+
+    Attributes:
+        area: Selisih area pupil dan area katarak, relatif terhadap area
+            pupil referensi.
+        percentage: Selisih persentase katarak dalam poin persen.
+        circle: Selisih posisi pusat dan radius lingkaran iris dalam piksel.
+        mean: Selisih mean intensity dalam level keabuan.
+    """
+
+    area: float = 0.02
+    percentage: float = 1.0
+    circle: float = 3.0
+    mean: float = 0.5
+
+
+# Pipeline sebelum percepatan apa pun: decode penuh lalu resize INTER_AREA
+REFERENCE = Variant("reference", reduced_decode=False)
+
+# Toleransi varian yang dibandingkan dengan baseline; selisih mean hanya
+# boleh berasal dari pembulatan floating point (mean dari histogram)
+EXACT = Tolerances(area=0.0, percentage=0.0, circle=0.0, mean=1e-6)
+
+VARIANTS = {
+    variant.name: variant
+    for variant in (
+        Variant("reduced-decode"),
+        Variant("linear-resize", interpolation=cv2.INTER_LINEAR),
+        Variant("pixels", replace(DEFAULT_PARAMS, measurement="pixels")),
+        Variant("pyramid", replace(DEFAULT_PARAMS, localization="pyramid")),
+        # Ambang akumulator lebih tinggi menghasilkan kandidat Hough lebih sedikit
+        Variant("strict-hough", replace(DEFAULT_PARAMS, hough_param2=40)),
+        # Gambar yang selesai di screening hanya dibandingkan diagnosisnya
+        Variant("cascade", mode="cascade"),
+        Variant(
+            "multires",
+            replace(DEFAULT_PARAMS, resolution="multi"),
+            mode="segmentation",
+        ),
+        Variant("intensity", mode="intensity"),
+        Variant("packed", source="packed", baseline="reduced-decode"),
+        Variant(
+            "packed-intensity", mode="intensity", source="packed", baseline="intensity"
+        ),
+        Variant(
+            "batch-intensity", mode="intensity", source="batch", baseline="intensity"
+        ),
+    )
+}
+
+
+def rebase(variant: Variant, base: SegmentationParams) -> Variant:
+    """
+    Menerapkan perubahan parameter varian di atas parameter dasar lain.
+
+    Args:
+        variant: Varian yang parameternya relatif terhadap DEFAULT_PARAMS.
+        base: Parameter dasar baru, misalnya untuk korpus sintetis.
+
+    Returns:
+        Varian dengan parameter dasar base dan perubahan yang sama.
+    """
+    changes = {
+        f.name: getattr(variant.params, f.name)
+        for f in fields(SegmentationParams)
+        if getattr(variant.params, f.name) != getattr(DEFAULT_PARAMS, f.name)
+    }
+    return replace(variant, params=replace(base, **changes))
+
+
+def run_variant(path: str, variant: Variant) -> tuple[Record, float]:
+    """
+    Menganalisis satu gambar dari file dengan satu varian dan mengukur
+    waktunya.
+
+    Args:
+        path: Path file gambar.
+        variant: Konfigurasi pipeline dengan source "file".
+
+    Returns:
+        Tuple berisi record hasil analisis (atau error) dan waktu dari decode
+        sampai hasil dalam detik.
+    """
+    params = variant.params
+    start = time.perf_counter()
+    if variant.mode != "combined":
+        # Decode dan resize sama dengan mode batch pada main.py
+        record = analyze_record(path, variant.mode, params)
+        return record, time.perf_counter() - start
+    try:
+        width = params.width if variant.reduced_decode else None
+        img = load_image(path, width=width)
+        img = resize_image(img, width=params.width, inter=variant.interpolation)
+        record = {"status": "ok", **analyze_combined(img, params).to_dict()}
+    except ValueError as e:
+        record = {"status": "error", "error": str(e)}
+    return record, time.perf_counter() - start
+
+
+def run_packed(
+    paths: list[str], variant: Variant, prefix: str
+) -> tuple[list[Record], float]:
+    """
+    Menganalisis korpus dari dataset hasil pack_dataset.
+
+    Dataset dibuat sekali dan waktu pack tidak ikut diukur karena pada
+    pemakaian sebenarnya dataset dipakai ulang oleh banyak analisis.
+
+    Args:
+        paths: Path file gambar korpus.
+        variant: Konfigurasi pipeline dengan source "packed".
+        prefix: Awalan nama file dataset.
+
+    Returns:
+        Tuple berisi record sesuai urutan paths dan waktu analisis rata-rata
+        per gambar dalam detik.
+    """
+    params = variant.params
+    if not os.path.exists(f"{prefix}.json"):
+        _ = pack_dataset(paths, prefix, params.width, workers=1)
+    dataset = PackedDataset(prefix)
+
+    records: dict[str, Record] = {}
+    start = time.perf_counter()
+    for index, path in enumerate(dataset.paths):
+        records[path] = analyze_packed(prefix, index, variant.mode, params)
+    elapsed = time.perf_counter() - start
+
+    missing: Record = {"status": "error", "error": "Gagal dipack"}
+    return [records.get(path, missing) for path in paths], elapsed / len(paths)
+
+
+def run_batch(paths: list[str], variant: Variant) -> tuple[list[Record], float]:
+    """
+    Menganalisis intensitas korpus dengan analyze_intensity_batch.
+
+    Gambar didecode seperti mode intensity, lalu dikelompokkan per ukuran
+    karena analyze_intensity_batch membutuhkan tumpukan berukuran sama.
+
+    Args:
+        paths: Path file gambar korpus.
+        variant: Konfigurasi pipeline dengan source "batch".
+
+    Returns:
+        Tuple berisi record sesuai urutan paths dan waktu rata-rata per
+        gambar (termasuk decode) dalam detik.
+    """
+    params = variant.params
+    names = {code: name for name, code in DIAGNOSIS_CODES.items()}
+    records: list[Record] = [{} for _ in paths]
+    groups: dict[tuple[int, ...], list[tuple[int, MatLike]]] = {}
+
+    start = time.perf_counter()
+    for i, path in enumerate(paths):
+        try:
+            gray = load_image(path, width=params.width, gray=True)
+        except ValueError as e:
+            records[i] = {"status": "error", "error": str(e)}
+            continue
+        gray = resize_image(gray, width=params.width)
+        groups.setdefault(gray.shape, []).append((i, gray))
+    for members in groups.values():
+        results = analyze_intensity_batch(
+            np.stack([gray for _, gray in members]),
+            params.mild_threshold,
+            params.severe_threshold,
+        )
+        for (i, _), row in zip(members, results):
+            records[i] = {
+                "status": "ok",
+                "mean": float(row["mean"]),
+                "std": float(row["std"]),
+                "diagnosis": names[int(row["diagnosis"])],
+            }
+    return records, (time.perf_counter() - start) / len(paths)
+
+
+def _float(record: Record, key: str) -> float:
+    return float(record[key])  # pyright: ignore[reportArgumentType]
+
+
+def compare(
+    reference: Record,
+    candidate: Record,
+    tolerances: Tolerances,
+    segments: bool = True,
+) -> Record:
+    """
+    Menghitung deviasi hasil varian terhadap referensi untuk satu gambar.
+
+    Hanya besaran yang dihasilkan varian yang dibandingkan: varian mode
+    intensity tidak membawa area, varian mode segmentation tidak membawa
+    mean dan diagnosis, dan gambar yang selesai di screening cascade hanya
+    membawa diagnosis screening.
+
+    Args:
+        reference: Record hasil pipeline referensi atau baseline.
+        candidate: Record hasil varian.
+        tolerances: Batas deviasi.
+        segments: False jika varian tidak menjalankan segmentasi sehingga
+            kegagalan segmentasi referensi diabaikan.
+
+    Returns:
+        Dictionary berisi deviasi setiap besaran dan penanda "within" yang
+        bernilai True jika semua deviasi masih dalam toleransi.
+    """
+    ref_ok = reference["status"] == "ok"
+    if segments:
+        ref_ok = ref_ok and "segmentation_error" not in reference
+    cand_ok = candidate["status"] == "ok" and "segmentation_error" not in candidate
+    diagnosis_match = (
+        "diagnosis" not in candidate
+        or reference.get("diagnosis") == candidate["diagnosis"]
+    )
+    if not (ref_ok and cand_ok):
+        # Kedua pipeline harus gagal bersama agar dianggap setara
+        return {
+            "status_match": ref_ok == cand_ok,
+            "diagnosis_match": diagnosis_match,
+            "within": ref_ok == cand_ok and diagnosis_match,
+        }
+
+    deviation: dict[str, float] = {}
+    if "mean" in candidate and not candidate.get("screened_out"):
+        deviation["mean"] = abs(_float(candidate, "mean") - _float(reference, "mean"))
+    if "pupil_area" in candidate:
+        pupil = max(_float(reference, "pupil_area"), 1.0)
+        deviation["pupil_area"] = abs(_float(candidate, "pupil_area") - pupil) / pupil
+        deviation["cat_area"] = (
+            abs(_float(candidate, "cat_area") - _float(reference, "cat_area")) / pupil
+        )
+        deviation["percentage"] = abs(
+            _float(candidate, "cataract_percentage")
+            - _float(reference, "cataract_percentage")
+        )
+        deviation["circle_center"] = math.dist(
+            (_float(candidate, "circle_x"), _float(candidate, "circle_y")),
+            (_float(reference, "circle_x"), _float(reference, "circle_y")),
+        )
+        deviation["circle_radius"] = abs(
+            _float(candidate, "circle_r") - _float(reference, "circle_r")
+        )
+
+    limits = {
+        "mean": tolerances.mean,
+        "pupil_area": tolerances.area,
+        "cat_area": tolerances.area,
+        "percentage": tolerances.percentage,
+        "circle_center": tolerances.circle,
+        "circle_radius": tolerances.circle,
+    }
+    within = diagnosis_match and all(
+        value <= limits[key] for key, value in deviation.items()
+    )
+    return {
+        "status_match": True,
+        "diagnosis_match": diagnosis_match,
+        "within": within,
+        **deviation,
+    }
+
+
+def evaluate(
+    paths: list[str],
+    variants: list[Variant],
+    tolerances: Tolerances,
+    repeat: int = 1,
+    workdir: str | None = None,
+    base: SegmentationParams = DEFAULT_PARAMS,
+) -> list[Record]:
+    """
+    Menjalankan referensi dan semua varian pada korpus lalu meringkasnya.
+
+    Referensi dan varian file dijalankan bergantian per gambar agar
+    perubahan beban mesin memengaruhi keduanya secara sama. Waktu per
+    gambar adalah waktu tercepat dari beberapa pengulangan. Varian dataset
+    dan batch dijalankan per korpus; waktunya adalah rata-rata per gambar
+    dari pengulangan tercepat. Baseline varian ikut dijalankan meskipun
+    tidak dipilih.
+
+    Args:
+        paths: Path file gambar korpus.
+        variants: Varian yang dibandingkan.
+        tolerances: Batas deviasi terhadap referensi.
+        repeat: Jumlah pengulangan per gambar untuk pengukuran waktu.
+        workdir: Direktori untuk dataset varian packed (default: direktori
+            sementara).
+        base: Parameter dasar referensi dan semua varian.
+
+    Returns:
+        Laporan per varian (diawali referensi) berisi waktu median,
+        percepatan, jumlah gambar dalam toleransi, dan deviasi maksimum.
+    """
+    needed = {REFERENCE.name: rebase(REFERENCE, base)}
+    pending = list(variants)
+    while pending:
+        variant = pending.pop()
+        needed[variant.name] = rebase(variant, base)
+        if variant.baseline is not None and variant.baseline not in needed:
+            pending.append(VARIANTS[variant.baseline])
+
+    times: dict[str, list[float]] = {name: [] for name in needed}
+    records: dict[str, list[Record]] = {name: [] for name in needed}
+
+    file_variants = [v for v in needed.values() if v.source == "file"]
+    for path in paths:
+        for variant in file_variants:
+            best = math.inf
+            for _ in range(repeat):
+                record, elapsed = run_variant(path, variant)
+                best = min(best, elapsed)
+            times[variant.name].append(best)
+            records[variant.name].append(record)
+
+    with tempfile.TemporaryDirectory(dir=workdir) as tmp:
+        for variant in needed.values():
+            if variant.source == "file":
+                continue
+            best = math.inf
+            for _ in range(repeat):
+                if variant.source == "packed":
+                    prefix = os.path.join(tmp, f"packed-{variant.params.width}")
+                    result, elapsed = run_packed(paths, variant, prefix)
+                else:
+                    result, elapsed = run_batch(paths, variant)
+                best = min(best, elapsed)
+            times[variant.name] = [best] * len(paths)
+            records[variant.name] = result
+
+    reference_ms = statistics.median(times[REFERENCE.name]) * 1000
+    reports: list[Record] = [
+        {"variant": REFERENCE.name, "median_ms": reference_ms, "speedup": 1.0}
+    ]
+    for variant in (needed[v.name] for v in variants):
+        baseline = variant.baseline or REFERENCE.name
+        limits = EXACT if variant.baseline is not None else tolerances
+        segments = variant.mode != "intensity"
+        results = [
+            compare(expected, record, limits, segments)
+            for expected, record in zip(records[baseline], records[variant.name])
+        ]
+        median_ms = statistics.median(times[variant.name]) * 1000
+        report: Record = {
+            "variant": variant.name,
+            "baseline": baseline,
+            "median_ms": median_ms,
+            "speedup": reference_ms / median_ms if median_ms > 0 else math.inf,
+            "images": len(results),
+            "within": sum(1 for r in results if r["within"]),
+            "status_mismatches": sum(1 for r in results if not r["status_match"]),
+            "diagnosis_mismatches": sum(
+                1 for r in results if not r["diagnosis_match"]
+            ),
+        }
+        for key in ("pupil_area", "cat_area", "percentage", "circle_center", "mean"):
+            values = [_float(r, key) for r in results if key in r]
+            report[f"max_{key}"] = max(values, default=0.0)
+        reports.append(report)
+    return reports
+
+
+def print_report(reports: list[Record], tolerances: Tolerances) -> None:
+    """
+    Mencetak laporan kecepatan dan deviasi dalam bentuk tabel.
+
+    Args:
+        reports: Laporan dari evaluate.
+        tolerances: Batas deviasi yang dipakai.
+    """
+    print(
+        f"Toleransi: area {tolerances.area:.1%} dari pupil, persentase "
+        f"{tolerances.percentage} poin, lingkaran {tolerances.circle} px, "
+        f"mean {tolerances.mean} (varian dengan baseline: sama persis)"
+    )
+    print(
+        f"\n{'varian':16s} {'median':>10s} {'speedup':>8s} {'setara':>9s} "
+        f"{'diagnosis':>9s} {'maks %':>8s} {'maks px':>8s} {'maks mean':>9s}"
+    )
+    for report in reports:
+        line = (
+            f"{report['variant']:16s} {report['median_ms']:8.2f}ms "
+            f"{report['speedup']:7.2f}x"
+        )
+        if "images" in report:
+            line += (
+                f" {report['within']:>4}/{report['images']:<4}"
+                f" {report['diagnosis_mismatches']:>9}"
+                f" {report['max_percentage']:8.2f}"
+                f" {report['max_circle_center']:8.2f}"
+                f" {report['max_mean']:9.3f}"
+            )
+            if report["baseline"] != REFERENCE.name:
+                line += f"  (vs {report['baseline']})"
+        print(line)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Menjalankan harness kesetaraan dan mencetak atau menyimpan laporannya.
+
+    Args:
+        argv: Argumen command line (default: sys.argv).
+
+    Returns:
+        Kode keluar proses; 1 jika --strict dan ada varian yang keluar dari
+        toleransi.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument(
+        "paths", nargs="*", help="File gambar atau direktori (default: sintetis)"
+    )
+    _ = parser.add_argument(
+        "-r", "--recursive", action="store_true", help="Pindai subdirektori"
+    )
+    _ = parser.add_argument(
+        "--variant",
+        choices=list(VARIANTS),
+        action="append",
+        help="Varian yang dibandingkan (dapat diulang, default: semua)",
+    )
+    _ = parser.add_argument(
+        "--resolution",
+        choices=list(RESOLUTIONS),
+        action="append",
+        help="Resolusi korpus sintetis (dapat diulang, default: vga dan 12mp)",
+    )
+    _ = parser.add_argument(
+        "--images",
+        type=int,
+        default=4,
+        help="Jumlah gambar sintetis per resolusi (default: 4)",
+    )
+    _ = parser.add_argument(
+        "--area-tolerance",
+        type=float,
+        default=0.02,
+        help="Selisih area relatif terhadap area pupil (default: 0.02)",
+    )
+    _ = parser.add_argument(
+        "--percentage-tolerance",
+        type=float,
+        default=1.0,
+        help="Selisih persentase katarak dalam poin (default: 1)",
+    )
+    _ = parser.add_argument(
+        "--circle-tolerance",
+        type=float,
+        default=3.0,
+        help="Selisih pusat dan radius lingkaran dalam piksel (default: 3)",
+    )
+    _ = parser.add_argument(
+        "--hough-param2",
+        type=int,
+        default=None,
+        help=(
+            "Ambang akumulator Hough dasar untuk referensi dan semua varian "
+            f"(default: {DEFAULT_PARAMS.hough_param2}, atau "
+            f"{SYNTHETIC_PARAMS.hough_param2} untuk korpus sintetis)"
+        ),
+    )
+    _ = parser.add_argument(
+        "--mean-tolerance",
+        type=float,
+        default=0.5,
+        help="Selisih mean intensity dalam level keabuan (default: 0.5)",
+    )
+    _ = parser.add_argument("--repeat", type=int, default=3, help="Jumlah pengulangan")
+    _ = parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Keluar dengan kode 1 jika ada gambar di luar toleransi",
+    )
+    _ = parser.add_argument("--json", default=None, help="Simpan laporan ke file JSON")
+    args = parser.parse_args(argv)
+
+    tolerances = Tolerances(
+        args.area_tolerance,
+        args.percentage_tolerance,
+        args.circle_tolerance,
+        args.mean_tolerance,
+    )
+    variants = [VARIANTS[name] for name in args.variant or VARIANTS]
+    hough_param2 = args.hough_param2
+    if hough_param2 is None:
+        defaults = DEFAULT_PARAMS if args.paths else SYNTHETIC_PARAMS
+        hough_param2 = defaults.hough_param2
+    base = replace(DEFAULT_PARAMS, hough_param2=hough_param2)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.paths:
+            paths = list(iter_image_files(args.paths, recursive=args.recursive))
+        else:
+            paths = [
+                write_eye_image(
+                    os.path.join(tmp, f"{resolution}-{seed}.jpg"), resolution, seed
+                )
+                for resolution in args.resolution or ["vga", "12mp"]
+                for seed in range(args.images)
+            ]
+        if not paths:
+            print("Error: tidak ada gambar", file=sys.stderr)
+            return 2
+        reports = evaluate(paths, variants, tolerances, args.repeat, tmp, base)
+
+    print_report(reports, tolerances)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+
+    if args.strict and any(r["within"] != r["images"] for r in reports[1:]):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Benchmark per tahap pipeline segmentasi dan histogram.
+
+Gambar mata sintetis dibuat untuk setiap resolusi, ditulis sebagai JPEG,
+lalu setiap tahap (decode, resize, filter, threshold, morfologi, Hough,
+masking, kontur, thumbnail, histogram) diukur terpisah. Laporan berisi
+median waktu per tahap, throughput end-to-end, dan memori puncak. Pipeline
+memakai SYNTHETIC_PARAMS agar iris gambar sintetis terdeteksi.
+
+    python -m benchmarks.stages --resolution vga --resolution 24mp --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import cv2
+from cv2.typing import MatLike
+
+from analysis import SegmentationParams, analyze_file
+from analysis.intensity import analyze_intensity
+from analysis.preview import render_mosaic
+from analysis.segmentation import (
+    detect_iris,
+    filter_image,
+    mask_circle,
+    measure_cataract,
+    measure_pupil,
+    open_image,
+    threshold_image,
+    to_grayscale,
+)
+from benchmarks.synthetic import RESOLUTIONS, SYNTHETIC_PARAMS, write_eye_image
+from utils import load_image, resize_image
+
+type Stages = list[tuple[str, Callable[[], object]]]
+
+
+def render_histogram(histogram: object, mean_val: float) -> None:
+    """
+    Menggambar histogram seperti aplikasi GUI, tetapi ke canvas Agg.
+
+    Args:
+        histogram: Jumlah piksel per nilai intensitas 0..255.
+        mean_val: Nilai mean untuk garis vertikal.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(6.4, 4.8))
+    ax = fig.add_subplot()
+    _ = ax.stairs(histogram, range(257), fill=True)  # pyright: ignore[reportUnknownMemberType,reportArgumentType]
+    _ = ax.axvline(mean_val, color="k", linestyle="dashed", linewidth=1)  # pyright: ignore[reportUnknownMemberType]
+    FigureCanvasAgg(fig).draw()
+
+
+def run_pipeline(path: str, params: SegmentationParams) -> dict[str, float]:
+    """
+    Menjalankan seluruh tahap sekali dan mengukur waktu masing-masing.
+
+    Args:
+        path: Path gambar.
+        params: Parameter pipeline segmentasi.
+
+    Returns:
+        Dictionary nama tahap ke waktu dalam detik.
+    """
+    state: dict[str, object] = {}
+
+    def step(name: str, fn: Callable[[], object]) -> None:
+        state[name] = fn()
+
+    def get(name: str) -> MatLike:
+        return state[name]  # pyright: ignore[reportReturnType]
+
+    stages: Stages = [
+        ("decode", lambda: load_image(path, width=params.width)),
+        ("resize", lambda: resize_image(get("decode"), width=params.width)),
+        ("grayscale", lambda: to_grayscale(get("resize"))),
+        ("filter", lambda: filter_image(get("grayscale"), params)),
+        ("threshold", lambda: threshold_image(get("filter"), params)),
+        ("morphology", lambda: open_image(get("threshold"), params)),
+        ("hough", lambda: detect_iris(get("morphology"), params)),
+        ("masking", lambda: mask_circle(get("morphology"), state["hough"])),  # pyright: ignore[reportArgumentType]
+        ("contouring", lambda: _contours(get("masking"), params)),
+        ("thumbnails", lambda: _thumbnails(state)),
+        ("histogram", lambda: _histogram(get("resize"))),
+        (
+            "histogram_render",
+            lambda: render_histogram(
+                state["histogram"].histogram,  # pyright: ignore[reportAttributeAccessIssue]
+                state["histogram"].mean_val,  # pyright: ignore[reportAttributeAccessIssue]
+            ),
+        ),
+    ]
+
+    timings: dict[str, float] = {}
+    for name, fn in stages:
+        start = time.perf_counter()
+        step(name, fn)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+def _contours(img_morpho_copy: MatLike, params: SegmentationParams) -> MatLike:
+    imgg_inv = cv2.bitwise_not(img_morpho_copy)
+    pupil_area = measure_pupil(img_morpho_copy)
+    _ = measure_cataract(imgg_inv, pupil_area, params)
+    return imgg_inv
+
+
+def _histogram(img: MatLike) -> object:
+    result = analyze_intensity(img)
+    _ = result.histogram
+    return result
+
+
+def _thumbnails(state: dict[str, object]) -> object:
+    bgr: MatLike = state["resize"]  # pyright: ignore[reportAssignmentType]
+    rgb = cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB)
+    images: list[MatLike] = [
+        rgb,
+        state["filter"],  # pyright: ignore[reportListItemType]
+        state["threshold"],  # pyright: ignore[reportListItemType]
+        state["masking"],  # pyright: ignore[reportListItemType]
+        state["contouring"],  # pyright: ignore[reportListItemType]
+        # Gambar deteksi akhir berukuran sama; biaya thumbnail-nya identik
+        rgb,
+    ]
+    return render_mosaic(images)
+
+
+def benchmark_resolution(
+    resolution: str, repeat: int, params: SegmentationParams, directory: str
+) -> dict[str, object]:
+    """
+    Mengukur semua tahap untuk satu resolusi.
+
+    Args:
+        resolution: Nama resolusi dari RESOLUTIONS.
+        repeat: Jumlah pengulangan per tahap.
+        params: Parameter pipeline segmentasi.
+        directory: Direktori untuk gambar sintetis.
+
+    Returns:
+        Laporan berisi median per tahap, throughput, dan memori puncak.
+    """
+    path = write_eye_image(os.path.join(directory, f"{resolution}.jpg"), resolution)
+
+    # Pemanasan agar import dan inisialisasi OpenCV tidak ikut terukur
+    _ = run_pipeline(path, params)
+
+    runs = [run_pipeline(path, params) for _ in range(repeat)]
+    stages = {name: statistics.median(r[name] for r in runs) for name in runs[0]}
+
+    end_to_end: list[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _ = analyze_file(path, params)
+        end_to_end.append(time.perf_counter() - start)
+    median_total = statistics.median(end_to_end)
+
+    # Memori diukur pada run terpisah karena tracemalloc memperlambat eksekusi
+    tracemalloc.start()
+    try:
+        _ = run_pipeline(path, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    width, height = RESOLUTIONS[resolution]
+    return {
+        "resolution": resolution,
+        "width": width,
+        "height": height,
+        "stages_ms": {name: value * 1000 for name, value in stages.items()},
+        "segmentation_ms": median_total * 1000,
+        "images_per_sec": 1 / median_total if median_total > 0 else float("inf"),
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def print_report(report: dict[str, object]) -> None:
+    """
+    Mencetak laporan satu resolusi dalam bentuk tabel.
+
+    Args:
+        report: Laporan dari benchmark_resolution.
+    """
+    print(f"\n{report['resolution']} ({report['width']}x{report['height']})")
+    stages: dict[str, float] = report["stages_ms"]  # pyright: ignore[reportAssignmentType]
+    for name, value in stages.items():
+        print(f"  {name:18s} {value:10.2f} ms")
+    print(f"  {'segmentasi total':18s} {report['segmentation_ms']:10.2f} ms")
+    print(f"  {'throughput':18s} {report['images_per_sec']:10.2f} gambar/detik")
+    print(f"  {'memori puncak':18s} {report['peak_mb']:10.2f} MB")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Menjalankan benchmark per tahap dan mencetak atau menyimpan laporannya.
+
+    Args:
+        argv: Argumen command line (default: sys.argv).
+
+    Returns:
+        Kode keluar proses.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument(
+        "--resolution",
+        choices=list(RESOLUTIONS),
+        action="append",
+        help="Resolusi yang diukur (dapat diulang, default: vga dan 12mp)",
+    )
+    _ = parser.add_argument("--repeat", type=int, default=5, help="Jumlah pengulangan")
+    _ = parser.add_argument("--json", default=None, help="Simpan laporan ke file JSON")
+    args = parser.parse_args(argv)
+
+    reports: list[dict[str, object]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for resolution in args.resolution or ["vga", "12mp"]:
+            report = benchmark_resolution(
+                resolution, args.repeat, SYNTHETIC_PARAMS, tmp
+            )
+            print_report(report)
+            reports.append(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Benchmark waktu startup aplikasi GUI.
+
+Setiap percobaan menjalankan interpreter Python baru (cold start) dan
+mengukur dua hal: waktu sampai jendela pertama kali digambar, dan waktu
+sampai hasil analisis pertama tampil. Membutuhkan display.
+
+    python -m benchmarks.startup --runs 5 --max-window-ms 800
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+APPS = {
+    "DegreeOfCataract": "CataractDetector",
+    "CataractDetectionHistogram": "SimpleCataractDetector",
+}
+
+# Dijalankan di proses anak; time.monotonic memakai jam sistem yang sama
+# dengan proses induk sehingga selisihnya dapat dibandingkan
+CHILD_SCRIPT = """
+import sys, time
+sys.path.insert(0, sys.argv[1])
+module_name, class_name, image = sys.argv[2:5]
+module = __import__(module_name)
+app = getattr(module, class_name)()
+app.root.update()
+print("window", time.monotonic(), flush=True)
+if image:
+    app.analyze_path(image)
+    while app.task.busy:
+        app.root.update()
+        time.sleep(0.001)
+    print("result", time.monotonic(), flush=True)
+app.root.destroy()
+"""
+
+
+def measure_once(module: str, cls: str, image: str) -> dict[str, float]:
+    """
+    Menjalankan satu cold start aplikasi dan mengukur waktunya.
+
+    Args:
+        module: Nama modul aplikasi.
+        cls: Nama kelas aplikasi.
+        image: Path gambar untuk hasil pertama (kosong untuk melewati).
+
+    Returns:
+        Dictionary berisi "window" dan (opsional) "result" dalam milidetik.
+
+    Raises:
+        RuntimeError: Jika proses anak gagal (misalnya tidak ada display).
+    """
+    start = time.monotonic()
+    proc = subprocess.run(
+        [sys.executable, "-c", CHILD_SCRIPT, ROOT, module, cls, image],
+        capture_output=True,
+        text=True,
+        cwd=ROOT,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    timings: dict[str, float] = {}
+    for line in proc.stdout.splitlines():
+        name, stamp = line.split()
+        timings[name] = (float(stamp) - start) * 1000
+    return timings
+
+
+def write_sample_image(directory: str) -> str:
+    """
+    Menulis gambar mata sintetis untuk pengukuran hasil pertama.
+
+    Args:
+        directory: Direktori tujuan.
+
+    Returns:
+        Path file gambar.
+    """
+    from benchmarks.synthetic import write_eye_image
+
+    return write_eye_image(os.path.join(directory, "eye.jpg"), "5mp")
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Menjalankan benchmark startup dan mencetak ringkasannya.
+
+    Args:
+        argv: Argumen command line (default: sys.argv).
+
+    Returns:
+        Kode keluar; 1 jika median melebihi batas yang diberikan.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    _ = parser.add_argument("--runs", type=int, default=5, help="Jumlah percobaan")
+    _ = parser.add_argument("--image", default=None, help="Gambar untuk hasil pertama")
+    _ = parser.add_argument(
+        "--app", choices=sorted(APPS), action="append", help="Aplikasi yang diukur"
+    )
+    _ = parser.add_argument(
+        "--max-window-ms",
+        type=float,
+        default=None,
+        help="Batas median start-ke-jendela",
+    )
+    _ = parser.add_argument(
+        "--max-result-ms", type=float, default=None, help="Batas median start-ke-hasil"
+    )
+    args = parser.parse_args(argv)
+
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        image = args.image or write_sample_image(tmp)
+
+        for module in args.app or sorted(APPS):
+            cls = APPS[module]
+            samples = [measure_once(module, cls, image) for _ in range(args.runs)]
+            for metric, limit in (
+                ("window", args.max_window_ms),
+                ("result", args.max_result_ms),
+            ):
+                values = [s[metric] for s in samples if metric in s]
+                if not values:
+                    continue
+                median = statistics.median(values)
+                print(
+                    f"{module:28s} start-ke-{metric:6s} "
+                    f"median {median:8.1f} ms  min {min(values):8.1f} ms"
+                )
+                if limit is not None and median > limit:
+                    print(f"  melebihi batas {limit:.1f} ms", file=sys.stderr)
+                    failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
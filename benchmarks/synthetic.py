@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+from analysis import SegmentationParams
+
+# Resolusi umum dari VGA sampai kamera slit-lamp 24 MP (lebar, tinggi)
+RESOLUTIONS = {
+    "vga": (640, 480),
+    "hd": (1280, 960),
+    "5mp": (2592, 1944),
+    "12mp": (4000, 3000),
+    "24mp": (6000, 4000),
+}
+
+# Tepi pupil sintetis adalah lingkaran biner yang tajam sehingga HoughCircles
+# hanya mengumpulkan sekitar 20-30 vote untuk pusatnya pada resolusi berapa
+# pun, di bawah ambang default 30. Benchmark dan test memakai ambang yang
+# diturunkan agar segmentasi pada gambar sintetis selalu berjalan
+SYNTHETIC_PARAMS = SegmentationParams(hough_param2=15)
+
+
+def make_eye_image(
+    width: int = 640,
+    height: int = 480,
+    seed: int = 0,
+    blobs: int = 4,
+    noise: float = 5.0,
+) -> MatLike:
+    """
+    Membuat gambar mata sintetis yang deterministik.
+
+    Gambar berisi sklera terang, iris, pupil gelap, beberapa bercak opasitas
+    (katarak) di dalam pupil, dan noise Gaussian. Dengan seed yang sama,
+    hasilnya selalu identik.
+
+    Args:
+        width: Lebar gambar dalam piksel.
+        height: Tinggi gambar dalam piksel.
+        seed: Seed generator acak.
+        blobs: Jumlah bercak opasitas di dalam pupil.
+        noise: Standard deviation noise Gaussian.
+
+    Returns:
+        Gambar BGR uint8.
+    """
+    rng = np.random.default_rng(seed)
+    img = np.full((height, width, 3), (200, 210, 220), np.uint8)
+
+    center = (width // 2, height // 2)
+    iris_r = int(min(width, height) * 0.35)
+    pupil_r = int(iris_r * 0.5)
+    _ = cv2.circle(img, center, iris_r, (60, 90, 110), -1)
+    _ = cv2.circle(img, center, pupil_r, (20, 20, 20), -1)
+
+    # Bercak opasitas di dalam pupil
+    for _ in range(blobs):
+        angle = rng.uniform(0, 2 * np.pi)
+        dist = rng.uniform(0, pupil_r * 0.6)
+        x = int(center[0] + dist * np.cos(angle))
+        y = int(center[1] + dist * np.sin(angle))
+        r = max(int(pupil_r * rng.uniform(0.08, 0.2)), 1)
+        _ = cv2.circle(img, (x, y), r, (150, 150, 150), -1)
+
+    if noise > 0:
+        # Noise dibuat per-kanal dalam float32 agar memori tetap wajar di 24 MP
+        noisy = img.astype(np.float32)
+        noisy += rng.normal(0, noise, img.shape).astype(np.float32)
+        img = np.clip(noisy, 0, 255).astype(np.uint8)
+    return img
+
+
+def write_eye_image(path: str, resolution: str = "vga", seed: int = 0) -> str:
+    """
+    Menulis gambar mata sintetis ke file.
+
+    Args:
+        path: Path file tujuan; format ditentukan dari ekstensinya.
+        resolution: Nama resolusi dari RESOLUTIONS.
+        seed: Seed generator acak.
+
+    Returns:
+        Path file yang ditulis.
+    """
+    width, height = RESOLUTIONS[resolution]
+    if not cv2.imwrite(path, make_eye_image(width, height, seed)):
+        raise ValueError(f"Gagal menulis gambar sintetis ke {path}")
+    return path
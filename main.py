@@ -1,6 +1,918 @@
-def main():
-    print("Hello from deteksi-katarak-menggunakan-pemrosesan-gambar!")
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import ExitStack
+from itertools import chain
+from typing import Literal, TextIO, cast, get_args, get_origin, get_type_hints
+
+from analysis import (
+    ANALYSIS_MODES,
+    DIAGNOSIS_CODES,
+    BatchRunner,
+    FolderWatcher,
+    ImageMetrics,
+    Journal,
+    MAX_QUEUED,
+    MetricsAggregator,
+    PackedDataset,
+    ResultCache,
+    ResultStore,
+    SegmentationParams,
+    StreamingPipeline,
+    VideoStream,
+    expand_grid,
+    pack_dataset,
+    plan_parallelism,
+    run_sweep,
+    serve,
+)
+from utils import iter_image_files
+
+RECORD_FIELDS = [
+    "path",
+    "status",
+    "pupil_area",
+    "cat_area",
+    "cataract_percentage",
+    "circle_x",
+    "circle_y",
+    "circle_r",
+    "mean",
+    "std",
+    "diagnosis",
+    "description",
+    "screened_out",
+    "segmentation_error",
+    "error",
+]
+
+
+def write_records(
+    records: Iterator[dict[str, object]], output: TextIO, fmt: str
+) -> tuple[int, int, int]:
+    """
+    Menulis record hasil analisis ke output secara streaming.
+
+    Args:
+        records: Record hasil analisis.
+        output: Stream tujuan.
+        fmt: Format output, "csv" atau "jsonl".
+
+    Returns:
+        Tuple berisi jumlah record yang berhasil, yang gagal, dan yang
+        selesai pada tahap screening mode cascade.
+    """
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(output, fieldnames=RECORD_FIELDS, restval="")
+        writer.writeheader()
+
+    ok = failed = screened = 0
+    for record in records:
+        if record["status"] == "ok":
+            ok += 1
+        else:
+            failed += 1
+        if record.get("screened_out"):
+            screened += 1
+
+        if writer is not None:
+            writer.writerow(record)
+        else:
+            _ = output.write(json.dumps(record) + "\n")
+        output.flush()
+    return ok, failed, screened
+
+
+def add_analysis_arguments(
+    parser: argparse.ArgumentParser, mode: bool = True
+) -> None:
+    """
+    Menambahkan argumen mode dan parameter analisis ke subcommand.
+
+    Args:
+        parser: Parser subcommand.
+        mode: Jika False, --mode tidak didaftarkan karena subcommand selalu
+            memakai satu mode.
+    """
+    _ = parser.add_argument(
+        "--width", type=int, default=500, help="Lebar gambar setelah resize"
+    )
+    _ = parser.add_argument(
+        "--localization",
+        choices=["full", "pyramid"],
+        default="full",
+        help="Pencarian iris: Hough penuh atau coarse-to-fine dengan piramida",
+    )
+    _ = parser.add_argument(
+        "--measurement",
+        choices=["contours", "pixels"],
+        default="contours",
+        help="Perhitungan area: luas kontur atau jumlah piksel komponen terhubung",
+    )
+    _ = parser.add_argument(
+        "--resolution",
+        choices=["single", "multi"],
+        default="single",
+        help="Segmentasi pada satu resolusi, atau lokalisasi pada resolusi rendah "
+        "lalu pengukuran pada ROI iris beresolusi tinggi (mode segmentation)",
+    )
+    _ = parser.add_argument(
+        "--measure-width",
+        type=int,
+        default=0,
+        help="Lebar gambar maksimum untuk pengukuran ROI pada --resolution multi "
+        "(default: 0, resolusi asli)",
+    )
+    if mode:
+        _ = parser.add_argument(
+            "-m",
+            "--mode",
+            choices=ANALYSIS_MODES,
+            default="segmentation",
+            help="Algoritma: segmentasi area, mean intensity, cascade (screening "
+            "intensitas sebelum segmentasi), atau combined (keduanya dari satu "
+            "decode)",
+        )
+    _ = parser.add_argument(
+        "--screen-width",
+        type=int,
+        default=64,
+        help="Lebar gambar untuk screening mode cascade (default: 64)",
+    )
+    _ = parser.add_argument(
+        "--screen-margin",
+        type=float,
+        default=5.0,
+        help="Mean di bawah batas katarak ringan dikurangi margin ini dianggap "
+        "sehat tanpa segmentasi (default: 5)",
+    )
+    _ = parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Jumlah proses worker (default: jumlah CPU)",
+    )
+
+
+def params_from_args(args: argparse.Namespace) -> SegmentationParams:
+    """
+    Membuat parameter pipeline dari argumen hasil parsing.
+
+    Args:
+        args: Argumen dari subcommand yang memakai add_analysis_arguments.
+
+    Returns:
+        Parameter pipeline segmentasi.
+    """
+    return SegmentationParams(
+        width=args.width,
+        localization=args.localization,
+        measurement=args.measurement,
+        screen_width=args.screen_width,
+        screen_margin=args.screen_margin,
+        resolution=args.resolution,
+        measure_width=args.measure_width,
+    )
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Membuat parser argumen command line.
+
+    Returns:
+        Parser argumen.
+    """
+    parser = argparse.ArgumentParser(
+        description="Deteksi katarak menggunakan pemrosesan gambar"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch = subparsers.add_parser(
+        "batch", help="Analisis banyak gambar secara paralel tanpa GUI"
+    )
+    _ = batch.add_argument("paths", nargs="+", help="File gambar atau direktori")
+    _ = batch.add_argument(
+        "-r", "--recursive", action="store_true", help="Pindai subdirektori"
+    )
+    _ = batch.add_argument(
+        "--packed",
+        action="store_true",
+        help="Paths adalah prefix dataset hasil subcommand pack",
+    )
+    _ = batch.add_argument(
+        "-f", "--format", choices=["csv", "jsonl"], default="csv", help="Format output"
+    )
+    _ = batch.add_argument(
+        "-o", "--output", help="File output (default: stdout)", default=None
+    )
+    add_analysis_arguments(batch)
+    _ = batch.add_argument(
+        "--cache-dir", default=None, help="Direktori cache hasil (opsional)"
+    )
+    _ = batch.add_argument(
+        "--cache-size",
+        type=int,
+        default=256,
+        help="Batas ukuran cache dalam MB (default: 256)",
+    )
+    _ = batch.add_argument(
+        "--store-masks",
+        action="store_true",
+        help="Simpan juga mask intermediate segmentasi di cache",
+    )
+    _ = batch.add_argument(
+        "--metrics-jsonl",
+        default=None,
+        help="Tulis ukuran per tahap setiap gambar sebagai JSON lines",
+    )
+    _ = batch.add_argument(
+        "--metrics-prom",
+        default=None,
+        help="Tulis agregat ukuran per tahap dalam format teks Prometheus",
+    )
+    _ = batch.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help=(
+            "Ukur juga alokasi memori per tahap (lebih lambat; tidak tersedia "
+            "dengan --memory-limit)"
+        ),
+    )
+    _ = batch.add_argument(
+        "--store",
+        default=None,
+        help="Tambahkan hasil ke store biner di direktori ini (opsional)",
+    )
+    _ = batch.add_argument(
+        "--store-segment-size",
+        type=int,
+        default=65536,
+        help="Jumlah baris per segmen store; baris yang belum ditulis hilang jika "
+        "proses berhenti mendadak (default: 65536)",
+    )
+    _ = batch.add_argument(
+        "--memory-limit",
+        type=int,
+        default=None,
+        metavar="MB",
+        help="Analisis secara streaming di thread dengan batas memori gambar "
+        "dalam MB; daftar file tidak dibaca sekaligus (opsional)",
+    )
+    _ = batch.add_argument(
+        "--decode-threads",
+        type=int,
+        default=2,
+        help="Jumlah thread decode untuk --memory-limit (default: 2)",
+    )
+    batch.set_defaults(handler=run_batch)
+
+    pack = subparsers.add_parser(
+        "pack", help="Simpan gambar yang sudah di-resize sebagai dataset memory-map"
+    )
+    _ = pack.add_argument("paths", nargs="+", help="File gambar atau direktori")
+    _ = pack.add_argument(
+        "-r", "--recursive", action="store_true", help="Pindai subdirektori"
+    )
+    _ = pack.add_argument(
+        "-o", "--output", required=True, help="Prefix nama file dataset"
+    )
+    _ = pack.add_argument(
+        "--width", type=int, default=500, help="Lebar gambar yang disimpan"
+    )
+    _ = pack.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Jumlah proses untuk decode (default: jumlah CPU)",
+    )
+    pack.set_defaults(handler=run_pack)
+
+    watch = subparsers.add_parser(
+        "watch", help="Pantau direktori dan analisis gambar baru secara bertahap"
+    )
+    _ = watch.add_argument("directory", help="Direktori yang dipantau")
+    _ = watch.add_argument(
+        "-r", "--recursive", action="store_true", help="Pantau subdirektori"
+    )
+    _ = watch.add_argument(
+        "--journal",
+        default="journal.jsonl",
+        help="Jurnal file yang sudah diproses (default: journal.jsonl)",
+    )
+    _ = watch.add_argument(
+        "--interval",
+        type=float,
+        default=2.0,
+        help="Jeda antar pemindaian dalam detik (default: 2)",
+    )
+    _ = watch.add_argument(
+        "--queue-size",
+        type=int,
+        default=64,
+        help="Batas jumlah file yang menunggu dianalisis (default: 64)",
+    )
+    _ = watch.add_argument(
+        "--once",
+        action="store_true",
+        help="Berhenti setelah semua file yang ada selesai diproses",
+    )
+    _ = watch.add_argument(
+        "-o", "--output", help="File output JSON lines (default: stdout)", default=None
+    )
+    add_analysis_arguments(watch)
+    watch.set_defaults(handler=run_watch)
+
+    serve = subparsers.add_parser(
+        "serve", help="Jalankan server HTTP lokal untuk analisis upload gambar"
+    )
+    _ = serve.add_argument("--host", default="127.0.0.1", help="Alamat server")
+    _ = serve.add_argument("--port", type=int, default=8080, help="Port server")
+    _ = serve.add_argument(
+        "--max-batch",
+        type=int,
+        default=8,
+        help="Jumlah upload maksimum per micro-batch (default: 8)",
+    )
+    _ = serve.add_argument(
+        "--max-wait-ms",
+        type=float,
+        default=10.0,
+        help="Waktu tunggu maksimum sebelum micro-batch dikirim (default: 10)",
+    )
+    _ = serve.add_argument(
+        "--max-queue",
+        type=int,
+        default=MAX_QUEUED,
+        help=(
+            "Jumlah upload maksimum yang diproses bersamaan (dibaca, menunggu, "
+            "atau dianalisis); upload berikutnya ditolak dengan 503 "
+            f"(default: {MAX_QUEUED})"
+        ),
+    )
+    # Server selalu mengembalikan laporan combined (area dan diagnosis mean/std
+    # sekaligus) sehingga --mode tidak tersedia
+    add_analysis_arguments(serve, mode=False)
+    serve.set_defaults(handler=run_serve)
+
+    sweep = subparsers.add_parser(
+        "sweep", help="Evaluasi grid parameter pada dataset dengan tahap yang dimemo"
+    )
+    _ = sweep.add_argument("paths", nargs="+", help="File gambar atau direktori")
+    _ = sweep.add_argument(
+        "-r", "--recursive", action="store_true", help="Pindai subdirektori"
+    )
+    _ = sweep.add_argument(
+        "-g",
+        "--grid",
+        action="append",
+        required=True,
+        metavar="NAMA=NILAI,...",
+        help="Nilai yang dicoba untuk satu parameter, misalnya threshold=40,50,60 "
+        "(dapat diulang)",
+    )
+    _ = sweep.add_argument(
+        "-f", "--format", choices=["csv", "jsonl"], default="csv", help="Format output"
+    )
+    _ = sweep.add_argument(
+        "-o", "--output", help="File output (default: stdout)", default=None
+    )
+    _ = sweep.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Jumlah proses worker (default: jumlah CPU)",
+    )
+    sweep.set_defaults(handler=run_sweep_command)
+
+    query = subparsers.add_parser(
+        "query", help="Ringkas hasil di store biner, difilter persentase/diagnosis"
+    )
+    _ = query.add_argument("store", help="Direktori store")
+    _ = query.add_argument(
+        "--min-percentage", type=float, default=None, help="Batas bawah persentase"
+    )
+    _ = query.add_argument(
+        "--max-percentage", type=float, default=None, help="Batas atas persentase"
+    )
+    _ = query.add_argument(
+        "--diagnosis",
+        choices=list(DIAGNOSIS_CODES),
+        default=None,
+        help="Status diagnosis",
+    )
+    query.set_defaults(handler=run_query)
+
+    video = subparsers.add_parser(
+        "video", help="Analisis video frame demi frame dengan pelacakan iris"
+    )
+    _ = video.add_argument("paths", nargs="+", help="File video")
+    _ = video.add_argument(
+        "--width", type=int, default=500, help="Lebar frame setelah resize"
+    )
+    _ = video.add_argument(
+        "--measurement",
+        choices=["contours", "pixels"],
+        default="contours",
+        help="Perhitungan area: luas kontur atau jumlah piksel komponen terhubung",
+    )
+    _ = video.add_argument(
+        "--duplicate-threshold",
+        type=float,
+        default=2.0,
+        help="Selisih intensitas rata-rata di bawah nilai ini dianggap frame "
+        "duplikat dan tidak dianalisis ulang; 0 menonaktifkan (default: 2)",
+    )
+    _ = video.add_argument(
+        "--max-frames",
+        type=int,
+        default=None,
+        help="Jumlah frame maksimum yang dibaca per video",
+    )
+    _ = video.add_argument(
+        "-o", "--output", help="File output JSON lines (default: stdout)", default=None
+    )
+    video.set_defaults(handler=run_video)
+    return parser
+
+
+def collect_metrics(
+    records: Iterator[dict[str, object]], aggregator: MetricsAggregator
+) -> Iterator[dict[str, object]]:
+    """
+    Memindahkan ukuran per tahap dari record ke agregator.
+
+    Args:
+        records: Record hasil analisis, mungkin dengan kunci "metrics".
+        aggregator: Agregator ukuran batch.
+
+    Yields:
+        Record tanpa kunci "metrics".
+    """
+    for record in records:
+        metrics = record.pop("metrics", None)
+        if metrics is not None:
+            aggregator.add(ImageMetrics.from_dict(metrics))  # pyright: ignore[reportArgumentType]
+        yield record
+
+
+def store_records(
+    records: Iterator[dict[str, object]], store: ResultStore
+) -> Iterator[dict[str, object]]:
+    """
+    Menambahkan setiap record ke store biner sambil meneruskannya.
+
+    Args:
+        records: Record hasil analisis.
+        store: Store tujuan.
+
+    Yields:
+        Record yang sama tanpa perubahan.
+    """
+    for record in records:
+        store.append(record)
+        yield record
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "batch".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    params = params_from_args(args)
+
+    cache = None
+    if args.cache_dir:
+        cache = ResultCache(args.cache_dir, max_bytes=args.cache_size * 1024 * 1024)
+
+    # Store menyimpan waktu analisis per gambar dari ukuran per tahap
+    instrument = bool(args.metrics_jsonl or args.metrics_prom or args.store)
+    if instrument and args.trace_memory:
+        # Variabel lingkungan diwarisi worker yang dibuat dengan spawn/forkserver
+        os.environ["PYTHONTRACEMALLOC"] = "1"
+        tracemalloc.start()
+
+    if args.memory_limit is not None and (args.packed or cache is not None):
+        print(
+            "Error: --memory-limit tidak dapat digabung dengan --packed atau "
+            "--cache-dir",
+            file=sys.stderr,
+        )
+        return 2
+
+    # Jumlah gambar menentukan pembagian core antara proses dan thread OpenCV
+    paths: list[str] = []
+    if args.memory_limit is not None:
+        # Daftar file dipindai sambil berjalan sehingga jumlahnya tidak diketahui
+        items = None
+    elif args.packed:
+        try:
+            items = sum(len(PackedDataset(prefix)) for prefix in args.paths)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+    else:
+        paths = list(iter_image_files(args.paths, recursive=args.recursive))
+        items = len(paths)
+    plan = plan_parallelism(items, params, workers=args.workers, paths=paths)
+    if args.memory_limit is None:
+        print(f"Paralelisme: {plan.describe()}", file=sys.stderr)
+    else:
+        # Analisis berjalan di thread proses ini, bukan di proses worker
+        print(
+            f"Paralelisme: {plan.workers} thread analisis x {plan.cv_threads} "
+            f"thread OpenCV, {args.decode_threads} thread decode",
+            file=sys.stderr,
+        )
+
+    with ExitStack() as stack:
+        metrics_jsonl = None
+        if args.metrics_jsonl:
+            metrics_jsonl = stack.enter_context(
+                open(args.metrics_jsonl, "w", encoding="utf-8")
+            )
+        aggregator = MetricsAggregator(metrics_jsonl)
+
+        if args.memory_limit is not None:
+            try:
+                pipeline = StreamingPipeline(
+                    args.mode,
+                    params,
+                    workers=plan.workers,
+                    decode_threads=args.decode_threads,
+                    memory_limit_mb=args.memory_limit,
+                    instrument=instrument,
+                    cv_threads=plan.cv_threads,
+                )
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+            analyzed = pipeline.run(
+                iter_image_files(args.paths, recursive=args.recursive)
+            )
+        else:
+            runner = stack.enter_context(
+                BatchRunner(
+                    args.mode,
+                    params,
+                    workers=plan.workers,
+                    cache=cache,
+                    store_masks=args.store_masks,
+                    instrument=instrument,
+                    cv_threads=plan.cv_threads,
+                )
+            )
+            if args.packed:
+                analyzed = chain.from_iterable(
+                    runner.run_packed(p) for p in args.paths
+                )
+            else:
+                analyzed = runner.run_paths(paths)
+        if args.store:
+            try:
+                store = ResultStore(args.store, segment_size=args.store_segment_size)
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 2
+            _ = stack.enter_context(store)
+            analyzed = store_records(analyzed, store)
+        records = collect_metrics(analyzed, aggregator)
+
+        if args.output:
+            output = stack.enter_context(
+                open(args.output, "w", newline="", encoding="utf-8")
+            )
+        else:
+            output = sys.stdout
+        try:
+            ok, failed, screened = write_records(records, output, args.format)
+        except ValueError as e:
+            # Dataset hasil pack tidak dapat dibuka atau terlalu kecil
+            print(f"Error: {e}", file=sys.stderr)
+            return 2
+
+    if args.metrics_prom:
+        aggregator.write_prometheus(args.metrics_prom)
+
+    print(f"Selesai: {ok} berhasil, {failed} gagal", file=sys.stderr)
+    if args.mode == "cascade":
+        print(f"Tanpa segmentasi (screening): {screened}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_pack(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "pack".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    paths = iter_image_files(args.paths, recursive=args.recursive)
+    packed, failed = pack_dataset(
+        paths, args.output, width=args.width, workers=args.workers
+    )
+    for path, error in failed.items():
+        print(f"Gagal: {path}: {error}", file=sys.stderr)
+    print(f"Selesai: {packed} gambar disimpan, {len(failed)} gagal", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def run_query(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "query".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    if not os.path.isdir(args.store):
+        print(f"Error: store {args.store} tidak ditemukan", file=sys.stderr)
+        return 2
+    try:
+        store = ResultStore(args.store)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    summary = store.summary(args.min_percentage, args.max_percentage, args.diagnosis)
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "watch".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    params = params_from_args(args)
+    plan = plan_parallelism(None, params, workers=args.workers)
+    print(f"Paralelisme: {plan.describe()}", file=sys.stderr)
+
+    with ExitStack() as stack:
+        journal = stack.enter_context(Journal(args.journal))
+        runner = stack.enter_context(
+            BatchRunner(
+                args.mode, params, workers=plan.workers, cv_threads=plan.cv_threads
+            )
+        )
+        if args.output:
+            output = stack.enter_context(open(args.output, "a", encoding="utf-8"))
+        else:
+            output = sys.stdout
+
+        def emit(record: dict[str, object]) -> None:
+            _ = output.write(json.dumps(record) + "\n")
+            output.flush()
+
+        watcher = FolderWatcher(
+            args.directory,
+            runner,
+            journal,
+            recursive=args.recursive,
+            interval=args.interval,
+            queue_size=args.queue_size,
+        )
+        print(
+            f"Memantau {args.directory} ({len(journal)} file sudah di jurnal)",
+            file=sys.stderr,
+        )
+        try:
+            watcher.run(emit, once=args.once)
+        except KeyboardInterrupt:
+            print("Dihentikan", file=sys.stderr)
+    return 0
+
+
+def run_serve(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "serve".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    if args.max_queue < 1:
+        print("Error: Ukuran antrean harus positif", file=sys.stderr)
+        return 2
+    print(
+        f"Server analisis berjalan di http://{args.host}:{args.port}",
+        file=sys.stderr,
+    )
+    try:
+        asyncio.run(
+            serve(
+                args.host,
+                args.port,
+                "combined",
+                params_from_args(args),
+                workers=args.workers,
+                max_batch=args.max_batch,
+                max_wait=args.max_wait_ms / 1000,
+                max_queue=args.max_queue,
+            )
+        )
+    except KeyboardInterrupt:
+        print("Dihentikan", file=sys.stderr)
+    return 0
+
+
+def parse_grid(specs: list[str]) -> dict[str, list[object]]:
+    """
+    Mengubah argumen --grid menjadi nilai-nilai per parameter.
+
+    Nilai dikonversi sesuai anotasi tipe field SegmentationParams, sehingga
+    field float dengan default bulat (misalnya hough_param2) tetap menerima
+    pecahan.
+
+    Args:
+        specs: Argumen berbentuk "nama=nilai1,nilai2,...".
+
+    Returns:
+        Nama parameter ke daftar nilai.
+
+    Raises:
+        ValueError: Jika format argumen, nama parameter, atau nilainya tidak
+            valid.
+    """
+    hints = get_type_hints(SegmentationParams)
+    grid: dict[str, list[object]] = {}
+    for spec in specs:
+        name, sep, values = spec.partition("=")
+        name = name.strip().replace("-", "_")
+        if not sep or not values:
+            raise ValueError(f"Format grid harus nama=nilai,...: {spec}")
+        if name not in hints:
+            raise ValueError(f"Parameter {name} tidak dikenal")
+        grid[name] = [
+            _convert_value(name, hints[name], v.strip()) for v in values.split(",")
+        ]
+    return grid
+
+
+def _convert_value(name: str, annotation: object, text: str) -> object:
+    if get_origin(annotation) is Literal:
+        choices = get_args(annotation)
+        if text not in choices:
+            raise ValueError(f"Nilai {name} harus salah satu dari {', '.join(choices)}")
+        return text
+    try:
+        return cast(type, annotation)(text)
+    except ValueError:
+        raise ValueError(f"Nilai {text!r} tidak valid untuk {name}") from None
+
+
+def run_sweep_command(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "sweep".
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    try:
+        grid = parse_grid(args.grid)
+        points = expand_grid(grid)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+
+    swept = list(grid)
+    paths = list(iter_image_files(args.paths, recursive=args.recursive))
+    totals = [[0, 0, 0.0] for _ in points]  # berhasil, gagal, jumlah persentase
+    hits = misses = 0
+
+    with ExitStack() as stack:
+        if args.output:
+            output = stack.enter_context(
+                open(args.output, "w", newline="", encoding="utf-8")
+            )
+        else:
+            output = sys.stdout
+
+        writer = None
+        if args.format == "csv":
+            fieldnames = ["path", "point", *swept, *RECORD_FIELDS[1:]]
+            writer = csv.DictWriter(
+                output, fieldnames=fieldnames, restval="", extrasaction="ignore"
+            )
+            writer.writeheader()
+
+        for records, image_hits, image_misses in run_sweep(
+            paths, points, swept, workers=args.workers
+        ):
+            hits += image_hits
+            misses += image_misses
+            for record in records:
+                total = totals[cast(int, record["point"])]
+                if record["status"] == "ok":
+                    total[0] += 1
+                    total[2] += cast(float, record["cataract_percentage"])
+                else:
+                    total[1] += 1
+                if writer is not None:
+                    writer.writerow(record)
+                else:
+                    _ = output.write(json.dumps(record) + "\n")
+            output.flush()
+
+    print(f"{len(paths)} gambar x {len(points)} titik grid", file=sys.stderr)
+    for i, (params, (ok, failed, percentage)) in enumerate(zip(points, totals)):
+        values = ", ".join(f"{name}={getattr(params, name)}" for name in swept)
+        mean = percentage / ok if ok else 0.0
+        print(
+            f"  [{i}] {values}: {ok} berhasil, {failed} gagal, "
+            f"rata-rata katarak {mean:.2f}%",
+            file=sys.stderr,
+        )
+    if hits + misses:
+        print(
+            f"Tahap dihitung {misses}, diambil dari memo {hits} "
+            f"({hits / (hits + misses):.0%})",
+            file=sys.stderr,
+        )
+    return 0
+
+
+def run_video(args: argparse.Namespace) -> int:
+    """
+    Menjalankan subcommand "video".
+
+    Record per frame ditulis sebagai JSON lines ke output, sedangkan
+    ringkasan setiap video dicetak sebagai JSON ke stderr.
+
+    Args:
+        args: Argumen hasil parsing.
+
+    Returns:
+        Kode keluar proses.
+    """
+    params = SegmentationParams(width=args.width, measurement=args.measurement)
+    status = 0
+    with ExitStack() as stack:
+        if args.output:
+            output = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+        else:
+            output = sys.stdout
+
+        for path in args.paths:
+            stream = VideoStream(
+                path,
+                params,
+                duplicate_threshold=args.duplicate_threshold,
+                max_frames=args.max_frames,
+            )
+            try:
+                for record in stream:
+                    _ = output.write(json.dumps({"path": path, **record}) + "\n")
+            except ValueError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                status = 1
+                continue
+            output.flush()
+            print(json.dumps(stream.summary()), file=sys.stderr)
+    return status
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Fungsi utama command line.
+
+    Args:
+        argv: Argumen command line (default: sys.argv).
+
+    Returns:
+        Kode keluar proses.
+    """
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,29 @@
+from pathlib import Path
+
+import pytest
+from cv2.typing import MatLike
+
+from analysis import SegmentationParams
+from benchmarks.synthetic import SYNTHETIC_PARAMS, make_eye_image, write_eye_image
+from utils import resize_image
+
+PARAMS = SYNTHETIC_PARAMS
+
+
+@pytest.fixture
+def params() -> SegmentationParams:
+    return PARAMS
+
+
+@pytest.fixture
+def eye_image() -> MatLike:
+    # Sudah selebar params.width seperti input segment_image
+    return resize_image(make_eye_image(640, 480, seed=0), width=PARAMS.width)
+
+
+@pytest.fixture
+def eye_files(tmp_path: Path) -> list[str]:
+    return [
+        write_eye_image(str(tmp_path / f"mata-{seed}.jpg"), "vga", seed)
+        for seed in range(4)
+    ]
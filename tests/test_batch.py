@@ -0,0 +1,22 @@
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from analysis import BatchRunner
+from analysis.batch import Finalizer, Record
+
+
+def test_finalizer_runs_when_worker_fails():
+    released: list[Record | None] = []
+
+    def submit(_: int) -> tuple[Future[Record], Finalizer]:
+        future: Future[Record] = Future()
+        future.set_exception(BrokenProcessPool("worker mati"))
+        return future, released.append
+
+    runner = BatchRunner(workers=2)
+    with pytest.raises(BrokenProcessPool):
+        _ = list(runner._stream([0], submit))  # pyright: ignore[reportPrivateUsage]
+
+    assert released == [None]
@@ -0,0 +1,64 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from analysis import BatchRunner, ResultCache, SegmentationParams
+from analysis.cache import hash_file, make_key
+
+
+def test_evicts_least_recently_used(tmp_path: Path):
+    cache = ResultCache(str(tmp_path), max_bytes=300)
+    record: dict[str, object] = {"value": "x" * 100}
+    cache.put("aa01", record)
+    cache.put("bb02", record)
+    # Atur waktu akses secara eksplisit agar urutan tidak bergantung resolusi mtime
+    os.utime(tmp_path / "aa" / "aa01.json", (1000, 1000))
+    os.utime(tmp_path / "bb" / "bb02.json", (2000, 2000))
+    assert cache.get("aa01") == record
+
+    cache.put("cc03", record)
+
+    assert cache.get("bb02") is None
+    assert cache.get("aa01") == record
+    assert cache.get("cc03") == record
+
+
+def test_error_records_are_not_cached(tmp_path: Path, params: SegmentationParams):
+    broken = tmp_path / "rusak.jpg"
+    _ = broken.write_bytes(b"bukan gambar")
+    cache = ResultCache(str(tmp_path / "cache"))
+
+    with BatchRunner("segmentation", params, workers=1, cache=cache) as runner:
+        (record,) = runner.run_paths([str(broken)])
+
+    assert record["status"] == "error"
+    assert cache.get(make_key(hash_file(str(broken)), "segmentation", params)) is None
+
+
+def test_cached_results_match_fresh_results(
+    tmp_path: Path,
+    eye_files: list[str],
+    params: SegmentationParams,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    cache = ResultCache(str(tmp_path / "cache"))
+    hits: list[str] = []
+    get = cache.get
+
+    def counting_get(key: str) -> dict[str, object] | None:
+        record = get(key)
+        if record is not None:
+            hits.append(key)
+        return record
+
+    monkeypatch.setattr(cache, "get", counting_get)
+    with BatchRunner("segmentation", params, workers=1, cache=cache) as runner:
+        fresh = {r["path"]: r for r in runner.run_paths(eye_files)}
+        assert hits == []
+        cached = {r["path"]: r for r in runner.run_paths(eye_files)}
+
+    assert all(r["status"] == "ok" for r in fresh.values())
+    # Putaran kedua seluruhnya diambil dari cache
+    assert len(hits) == len(eye_files)
+    assert cached == fresh
@@ -0,0 +1,49 @@
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from analysis import SegmentationParams, analyze_cascade, analyze_combined
+from benchmarks.synthetic import make_eye_image
+from utils import resize_image
+
+
+def test_segmented_images_report_full_width_intensity(params: SegmentationParams):
+    # Batas 0 membuat semua gambar lolos screening
+    params = replace(params, mild_threshold=0)
+    img = make_eye_image(640, 480, seed=1)
+
+    cascade = analyze_cascade(img, params)
+    combined = analyze_combined(resize_image(img, width=params.width), params)
+
+    assert not cascade.screened_out
+    record, expected = cascade.to_dict(), combined.to_dict()
+    assert record["diagnosis"] == expected["diagnosis"]
+    for key in ("mean", "std", "pupil_area", "cat_area"):
+        assert record[key] == pytest.approx(expected[key])
+
+
+def test_screened_images_report_screen_intensity(params: SegmentationParams):
+    params = replace(params, mild_threshold=255, screen_margin=0)
+
+    cascade = analyze_cascade(make_eye_image(640, 480, seed=1), params)
+
+    assert cascade.screened_out
+    assert cascade.intensity is None
+    assert cascade.to_dict()["mean"] == cascade.screen.mean_val
+
+
+def test_segmentation_failure_keeps_full_width_intensity(params: SegmentationParams):
+    params = replace(params, mild_threshold=0)
+    # Gambar polos tanpa iris sehingga Hough tidak menemukan lingkaran
+    img = np.full((480, 640, 3), 128, np.uint8)
+
+    cascade = analyze_cascade(img, params)
+    combined = analyze_combined(resize_image(img, width=params.width), params)
+
+    assert not cascade.screened_out
+    assert cascade.segmentation is None
+    assert combined.segmentation_error is not None
+    record = cascade.to_dict()
+    assert record["segmentation_error"] == combined.segmentation_error
+    assert record["mean"] == pytest.approx(combined.intensity.mean_val)
@@ -0,0 +1,36 @@
+import numpy as np
+from cv2.typing import MatLike
+
+from analysis import (
+    SegmentationParams,
+    analyze_combined,
+    analyze_intensity,
+    compute_histogram,
+    segment_image,
+)
+
+
+def test_matches_separate_algorithms(eye_image: MatLike, params: SegmentationParams):
+    combined = analyze_combined(eye_image, params)
+
+    intensity = analyze_intensity(
+        eye_image, None, params.mild_threshold, params.severe_threshold
+    )
+    segmentation = segment_image(eye_image, params)
+    assert combined.segmentation is not None
+    assert combined.to_dict() == {**intensity.to_dict(), **segmentation.to_dict()}
+    assert np.array_equal(
+        combined.intensity.histogram, compute_histogram(intensity.gray)
+    )
+
+
+def test_segmentation_failure_keeps_intensity(params: SegmentationParams):
+    # Gambar polos tanpa iris sehingga Hough tidak menemukan lingkaran
+    img = np.full((375, 500, 3), 128, np.uint8)
+
+    combined = analyze_combined(img, params)
+
+    assert combined.segmentation is None
+    record = combined.to_dict()
+    assert record["segmentation_error"]
+    assert record["mean"] == analyze_intensity(img).mean_val
@@ -0,0 +1,21 @@
+from pathlib import Path
+
+from analysis import SegmentationParams
+from benchmarks.equivalence import VARIANTS, Tolerances, evaluate
+
+
+def test_alternative_paths_match_their_baselines(
+    tmp_path: Path, eye_files: list[str], params: SegmentationParams
+):
+    names = ["pixels", "cascade", "packed", "packed-intensity", "batch-intensity"]
+
+    reports = evaluate(
+        eye_files,
+        [VARIANTS[name] for name in names],
+        Tolerances(),
+        workdir=str(tmp_path),
+        base=params,
+    )
+
+    for report in reports[1:]:
+        assert report["within"] == report["images"], report["variant"]
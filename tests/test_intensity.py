@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+import pytest
+
+from analysis import (
+    DIAGNOSIS_CODES,
+    analyze_intensity,
+    analyze_intensity_batch,
+    compute_histogram,
+)
+from analysis.intensity import BATCH_CHUNK
+from benchmarks.synthetic import make_eye_image
+
+
+def test_batch_matches_per_image_analysis():
+    # Lebih dari satu chunk agar batas antar chunk ikut diuji
+    grays = np.stack(
+        [
+            cv2.cvtColor(make_eye_image(160, 120, seed=seed), cv2.COLOR_BGR2GRAY)
+            for seed in range(BATCH_CHUNK + 3)
+        ]
+    )
+
+    results = analyze_intensity_batch(grays)
+
+    for gray, row in zip(grays, results):
+        single = analyze_intensity(gray)
+        assert row["mean"] == pytest.approx(single.mean_val, abs=1e-9)
+        assert row["std"] == pytest.approx(single.std_val, abs=1e-6)
+        assert np.array_equal(row["histogram"], compute_histogram(single.gray))
+        status, _ = single.diagnosis
+        assert row["diagnosis"] == DIAGNOSIS_CODES[status]
+
+
+def test_batch_handles_empty_input():
+    assert len(analyze_intensity_batch(np.zeros((0, 120, 160), np.uint8))) == 0
+    with pytest.raises(ValueError):
+        _ = analyze_intensity_batch(np.zeros((2, 0, 160), np.uint8))
@@ -0,0 +1,31 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import analysis
+
+
+def test_exports_resolve():
+    for name in analysis.__all__:
+        assert getattr(analysis, name) is not None
+
+
+def test_segmentation_import_skips_heavy_modules():
+    # Proses baru agar modul yang sudah diimpor test lain tidak ikut terhitung
+    script = (
+        "import sys\n"
+        "from analysis import analyze_file\n"
+        "print(' '.join(sorted(sys.modules)))\n"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent,
+    )
+    loaded = set(proc.stdout.split())
+
+    assert "analysis.segmentation" in loaded
+    for heavy in ("asyncio", "analysis.server", "analysis.store", "analysis.stream"):
+        assert heavy not in loaded
@@ -0,0 +1,45 @@
+from dataclasses import replace
+from pathlib import Path
+
+from analysis import SegmentationParams, plan_parallelism
+from benchmarks.synthetic import write_eye_image
+
+
+def test_large_source_image_gets_opencv_threads(
+    tmp_path: Path, params: SegmentationParams
+):
+    # Decode tereduksi untuk lebar 1000 pada gambar 5 MP: 1296 x 972 piksel
+    path = write_eye_image(str(tmp_path / "besar.jpg"), "5mp")
+    params = replace(params, width=1000)
+
+    plan = plan_parallelism(1, params, cpus=8, paths=[path])
+
+    assert plan.workers == 1
+    assert plan.cv_threads == 8
+
+
+def test_small_source_image_stays_single_threaded(
+    tmp_path: Path, params: SegmentationParams
+):
+    path = write_eye_image(str(tmp_path / "kecil.jpg"), "vga")
+
+    plan = plan_parallelism(1, params, cpus=8, paths=[path])
+
+    assert plan.cv_threads == 1
+
+
+def test_native_multires_measurement_counts_as_large(
+    tmp_path: Path, params: SegmentationParams
+):
+    # Lebar tampilan kecil, tetapi pengukuran ROI berjalan pada resolusi asli
+    path = write_eye_image(str(tmp_path / "besar.png"), "5mp")
+    params = replace(params, resolution="multi", measure_width=0)
+
+    assert plan_parallelism(2, params, cpus=8, paths=[path]).cv_threads == 4
+    assert plan_parallelism(2, params, cpus=8).cv_threads == 4
+
+
+def test_full_batch_uses_one_process_per_core(params: SegmentationParams):
+    plan = plan_parallelism(100, params, cpus=8)
+
+    assert (plan.workers, plan.cv_threads) == (8, 1)
@@ -0,0 +1,90 @@
+from dataclasses import replace
+
+import cv2
+import numpy as np
+import pytest
+from cv2.typing import MatLike
+
+from analysis import SegmentationParams, Workspace, segment_image
+from analysis.segmentation import (
+    mask_circle,
+    measure_pupil,
+    measure_pupil_pixels,
+    segment_multires,
+)
+from benchmarks.synthetic import make_eye_image
+from utils import resize_image
+
+
+def test_pupil_pixels_include_enclosed_holes():
+    mask = np.zeros((200, 200), np.uint8)
+    _ = cv2.circle(mask, (100, 100), 60, 255, -1)
+    disk = cv2.countNonZero(mask)
+    _ = cv2.circle(mask, (80, 90), 12, 0, -1)
+    _ = cv2.circle(mask, (120, 110), 8, 0, -1)
+
+    assert measure_pupil_pixels(mask) == disk
+    assert measure_pupil_pixels(mask) == pytest.approx(measure_pupil(mask), rel=0.02)
+
+
+def test_measurement_backends_agree(eye_image: MatLike, params: SegmentationParams):
+    contours = segment_image(eye_image, replace(params, measurement="contours"))
+    pixels = segment_image(eye_image, replace(params, measurement="pixels"))
+
+    assert contours.cat_area > 0
+    assert pixels.pupil_area == pytest.approx(contours.pupil_area, rel=0.03)
+    assert pixels.cat_area == pytest.approx(contours.cat_area, rel=0.15)
+    assert pixels.cataract_percentage == pytest.approx(
+        contours.cataract_percentage, abs=1.0
+    )
+
+
+def test_pyramid_localization_matches_full_hough(params: SegmentationParams):
+    # Lebar 500 diperkecil dua level piramida ke 125 sebelum Hough kasar
+    for seed in range(3):
+        img = resize_image(make_eye_image(640, 480, seed=seed), width=params.width)
+        full = segment_image(img, params)
+        pyramid = segment_image(img, replace(params, localization="pyramid"))
+
+        assert np.allclose(pyramid.circle, full.circle, atol=2), seed
+
+
+def test_workspace_matches_fresh_buffers(params: SegmentationParams):
+    workspace = Workspace()
+    # Beberapa gambar berbeda agar sisa isi buffer sebelumnya ikut teruji
+    for seed in range(3):
+        img = resize_image(make_eye_image(640, 480, seed=seed), width=params.width)
+        fresh = segment_image(img, params)
+        reused = segment_image(img, params, workspace=workspace)
+
+        assert reused.to_dict() == fresh.to_dict()
+        for name in ("imgfiltered", "thresh_image", "img_morpho_copy", "imgg_inv"):
+            assert np.array_equal(getattr(reused, name), getattr(fresh, name)), name
+        shifted = (fresh.circle[0] + 7, fresh.circle[1] - 5, fresh.circle[2] // 2)
+        assert np.array_equal(
+            mask_circle(fresh.thresh_image, shifted, workspace),
+            mask_circle(fresh.thresh_image, shifted),
+        )
+
+
+def test_multires_matches_full_resolution(params: SegmentationParams):
+    img = make_eye_image(1280, 960, seed=0)
+    # Pipeline resolusi penuh dengan kernel dan min_area diskalakan ke ukuran
+    # fisik yang sama seperti yang dilakukan segment_multires
+    scale = 1280 / params.width
+    full = segment_image(
+        img,
+        replace(
+            params,
+            width=1280,
+            kernel_size=round(params.kernel_size * scale),
+            min_area=params.min_area * scale * scale,
+        ),
+    )
+
+    multi = segment_multires(img, replace(params, resolution="multi"))
+
+    assert multi.cataract_percentage == pytest.approx(
+        full.cataract_percentage, abs=0.2
+    )
+    assert multi.pupil_area == pytest.approx(full.pupil_area / scale**2, rel=0.01)
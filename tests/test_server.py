@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from analysis import AnalysisServer, MicroBatcher
+
+BODY = b"bukan gambar"
+
+
+async def _post(port: int, body: bytes) -> bytes:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    head = f"POST /analyze HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n"
+    writer.write(head.encode() + body)
+    await writer.drain()
+    status = await reader.readline()
+    writer.close()
+    return status
+
+
+def test_rejects_uploads_while_capacity_is_reserved():
+    async def scenario() -> tuple[bytes, bytes]:
+        with ThreadPoolExecutor(1) as executor:
+            batcher = MicroBatcher(executor, 1, max_queue=1)
+            server = AnalysisServer(batcher)
+            dispatcher = asyncio.create_task(batcher.run())
+            async with await asyncio.start_server(server.handle, "127.0.0.1", 0) as srv:
+                port = srv.sockets[0].getsockname()[1]
+                # Upload pertama baru mengirim sebagian body namun sudah
+                # memegang satu-satunya slot
+                reader, writer = await asyncio.open_connection("127.0.0.1", port)
+                head = f"POST /analyze HTTP/1.1\r\nContent-Length: {len(BODY)}\r\n\r\n"
+                writer.write(head.encode() + BODY[:4])
+                await writer.drain()
+                while not server.busy:
+                    await asyncio.sleep(0.01)
+                rejected = await _post(port, BODY)
+
+                writer.write(BODY[4:])
+                await writer.drain()
+                accepted = await reader.readline()
+                writer.close()
+                while server.busy:
+                    await asyncio.sleep(0.01)
+                _ = dispatcher.cancel()
+                return rejected, accepted
+
+    rejected, accepted = asyncio.run(scenario())
+    assert rejected.startswith(b"HTTP/1.1 503")
+    # Upload yang sudah diterima tetap dianalisis (gagal karena bukan gambar)
+    assert accepted.startswith(b"HTTP/1.1 422")
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+from benchmarks.stages import benchmark_resolution
+from benchmarks.synthetic import SYNTHETIC_PARAMS
+
+
+def test_benchmark_runs_on_synthetic_image(tmp_path: Path):
+    report = benchmark_resolution("vga", 1, SYNTHETIC_PARAMS, str(tmp_path))
+
+    assert report["resolution"] == "vga"
+    stages = report["stages_ms"]
+    assert isinstance(stages, dict)
+    assert "hough" in stages and "contouring" in stages
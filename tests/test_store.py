@@ -0,0 +1,71 @@
+import math
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from analysis import ResultStore
+from analysis.store import path_hash
+
+
+def _record(i: int, percentage: float, diagnosis: str) -> dict[str, object]:
+    return {
+        "path": f"mata-{i}.jpg",
+        "status": "ok",
+        "cataract_percentage": percentage,
+        "diagnosis": diagnosis,
+    }
+
+
+def test_segments_and_index_round_trip(tmp_path: Path):
+    records = [
+        _record(0, 5.0, "Tidak Ada Katarak"),
+        _record(1, 12.0, "Katarak Ringan"),
+        _record(2, 40.0, "Katarak Parah"),
+        {"path": "rusak.jpg", "status": "error", "error": "Gagal membaca"},
+        _record(4, 55.0, "Katarak Parah"),
+    ]
+    with ResultStore(str(tmp_path), segment_size=2) as store:
+        store.extend(records)
+
+    reopened = ResultStore(str(tmp_path))
+    rows = reopened.load()
+
+    assert len(reopened) == len(records) == len(rows)
+    assert len(list(reopened.segments())) == 3
+    assert rows["path_hash"][4] == path_hash("mata-4.jpg")
+    assert rows["status"].tolist() == [1, 1, 1, 0, 1]
+    assert math.isnan(rows["cataract_percentage"][3])
+
+    matches = reopened.query(min_percentage=10, diagnosis="Katarak Parah")
+    assert matches["cataract_percentage"].tolist() == [40.0, 55.0]
+    summary = reopened.summary(max_percentage=20)
+    assert summary["rows"] == 2
+    assert summary["mean_percentage"] == pytest.approx(8.5)
+
+
+def test_query_skips_segments_outside_zone_map(tmp_path: Path):
+    with ResultStore(str(tmp_path), segment_size=2) as store:
+        store.extend(_record(i, float(i), "Katarak Ringan") for i in range(6))
+
+    selected = list(ResultStore(str(tmp_path)).select(min_percentage=4.5))
+
+    # Segmen [0, 1] dan [2, 3] tidak dibaca sama sekali
+    assert len(selected) == 1
+    np.testing.assert_array_equal(selected[0]["cataract_percentage"], [5.0])
+
+
+def test_second_writer_is_rejected(tmp_path: Path):
+    first = ResultStore(str(tmp_path))
+    second = ResultStore(str(tmp_path))
+    first.append(_record(0, 1.0, "Katarak Ringan"))
+
+    with pytest.raises(ValueError):
+        second.append(_record(1, 2.0, "Katarak Ringan"))
+
+    first.close()
+    second.append(_record(1, 2.0, "Katarak Ringan"))
+    second.close()
+    # Penulis kedua melanjutkan indeks penulis pertama, tidak menimpanya
+    assert len(ResultStore(str(tmp_path))) == 2
+    assert not (tmp_path / "writer.lock").exists()
@@ -0,0 +1,116 @@
+import tracemalloc
+from collections.abc import Iterator
+from itertools import cycle, islice
+from pathlib import Path
+
+from analysis import (
+    ImageMetrics,
+    SegmentationParams,
+    StreamingPipeline,
+    analyze_record,
+)
+from benchmarks.synthetic import write_eye_image
+from utils import decode_peak_bytes
+
+
+def _by_path(records: Iterator[dict[str, object]]) -> dict[object, object]:
+    return {record["path"]: record for record in records}
+
+
+def test_results_match_per_image_analysis(
+    eye_files: list[str], params: SegmentationParams
+):
+    pipeline = StreamingPipeline("combined", params, workers=2)
+
+    streamed = _by_path(pipeline.run(eye_files))
+
+    assert streamed == {p: analyze_record(p, "combined", params) for p in eye_files}
+
+
+def test_reservations_stay_within_budget(
+    eye_files: list[str], params: SegmentationParams
+):
+    image = decode_peak_bytes(eye_files[0], params.width)
+    assert image is not None
+    pipeline = StreamingPipeline("segmentation", params, workers=2, memory_limit_mb=1)
+    # Anggaran cukup untuk dua gambar di luar memori kerja thread
+    pipeline.memory_limit = pipeline.working_set() + 2 * image
+
+    records = list(pipeline.run(eye_files))
+
+    assert len(records) == len(eye_files)
+    assert image < pipeline.peak_reserved <= 2 * image
+
+
+def test_oversized_image_is_still_processed(
+    eye_files: list[str], params: SegmentationParams
+):
+    pipeline = StreamingPipeline("segmentation", params, workers=2, memory_limit_mb=1)
+
+    records = list(pipeline.run(eye_files))
+
+    assert [r["status"] for r in records] == ["ok"] * len(eye_files)
+    # Tanpa anggaran, gambar diproses satu per satu
+    assert pipeline.peak_reserved == decode_peak_bytes(eye_files[0], params.width)
+
+
+def test_png_reserves_full_resolution_decode(
+    tmp_path: Path, params: SegmentationParams
+):
+    path = write_eye_image(str(tmp_path / "besar.png"), "5mp")
+    pipeline = StreamingPipeline("segmentation", params, workers=1)
+
+    (record,) = pipeline.run([path])
+
+    assert record["status"] == "ok"
+    # 2592 x 1944 didecode penuh sebelum diperkecil ke 648 x 486
+    assert pipeline.peak_reserved == (2592 * 1944 + 648 * 486) * 3
+
+
+def test_failed_decode_releases_reservation(
+    tmp_path: Path, eye_files: list[str], params: SegmentationParams
+):
+    broken = tmp_path / "rusak.jpg"
+    _ = broken.write_bytes(b"x" * 1000)
+    pipeline = StreamingPipeline("segmentation", params, workers=1, memory_limit_mb=1)
+
+    records = _by_path(pipeline.run([str(broken), *eye_files]))
+
+    assert records[str(broken)]["status"] == "error"  # pyright: ignore[reportIndexIssue]
+    assert len(records) == len(eye_files) + 1
+
+
+def test_paths_are_consumed_lazily(eye_files: list[str], params: SegmentationParams):
+    pulled = 0
+
+    def endless() -> Iterator[str]:
+        nonlocal pulled
+        for path in cycle(eye_files):
+            pulled += 1
+            yield path
+
+    pipeline = StreamingPipeline("intensity", params, workers=2, max_in_flight=4)
+    records = pipeline.run(endless())
+    first = list(islice(records, 3))
+    records.close()  # pyright: ignore[reportAttributeAccessIssue]
+
+    assert len(first) == 3
+    # Satu path tambahan dapat menunggu anggaran di luar jendela in-flight
+    assert pulled <= 3 + pipeline.max_in_flight + 1
+
+
+def test_threaded_metrics_skip_allocations(
+    eye_files: list[str], params: SegmentationParams
+):
+    pipeline = StreamingPipeline("combined", params, workers=2, instrument=True)
+
+    tracemalloc.start()
+    try:
+        records = list(pipeline.run(eye_files))
+    finally:
+        tracemalloc.stop()
+
+    for record in records:
+        metrics = ImageMetrics.from_dict(record["metrics"])  # pyright: ignore[reportArgumentType]
+        assert metrics.stages
+        assert all(stage.alloc_bytes == 0 for stage in metrics.stages.values())
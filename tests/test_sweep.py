@@ -0,0 +1,88 @@
+from dataclasses import replace
+
+import pytest
+
+from analysis import (
+    SegmentationParams,
+    StageGraph,
+    analyze_record,
+    expand_grid,
+    sweep_image,
+)
+from analysis.sweep import PIPELINE_STAGES, Stage
+from benchmarks.synthetic import make_eye_image
+from main import parse_grid
+
+
+def test_parse_grid_converts_with_field_annotations():
+    grid = parse_grid(["hough_param2=25.5,30", "kernel-size=8", "measurement=pixels"])
+
+    assert grid == {
+        "hough_param2": [25.5, 30.0],
+        "kernel_size": [8],
+        "measurement": ["pixels"],
+    }
+
+
+@pytest.mark.parametrize(
+    "spec", ["kernel_size=2.5", "measurement=area", "bukan_parameter=1", "threshold"]
+)
+def test_parse_grid_rejects_invalid_values(spec: str):
+    with pytest.raises(ValueError):
+        _ = parse_grid([spec])
+
+
+@pytest.mark.parametrize(
+    "grid", [{"resolution": ["multi"]}, {"measure_width": [1000]}]
+)
+def test_expand_grid_rejects_fields_ignored_by_sweep(grid: dict[str, list[object]]):
+    with pytest.raises(ValueError):
+        _ = expand_grid(grid)
+
+
+def test_expand_grid_varies_late_stages_fastest(params: SegmentationParams):
+    points = expand_grid({"min_area": [10, 20], "threshold": [40, 50]}, params)
+
+    assert [(p.threshold, p.min_area) for p in points] == [
+        (40, 10),
+        (40, 20),
+        (50, 10),
+        (50, 20),
+    ]
+
+
+def test_memoized_sweep_matches_direct_analysis(
+    eye_files: list[str], params: SegmentationParams
+):
+    points = expand_grid({"threshold": [45, 50], "min_area": [30, 50]}, params)
+
+    records, hits, misses = sweep_image(eye_files[0], points, ["threshold", "min_area"])
+
+    for point, record in zip(points, records):
+        direct = analyze_record(eye_files[0], "segmentation", point)
+        assert record["status"] == direct["status"] == "ok"
+        assert record["pupil_area"] == direct["pupil_area"]
+        assert record["cat_area"] == direct["cat_area"]
+    # Tahap sebelum threshold hanya dihitung sekali untuk keempat titik
+    assert misses < 4 * len(PIPELINE_STAGES)
+    assert hits > 0
+
+
+def _recording(stage: Stage, calls: list[str]) -> Stage:
+    def fn(params: SegmentationParams, *inputs: object) -> object:
+        calls.append(stage.name)
+        return stage.fn(params, *inputs)
+
+    return replace(stage, fn=fn)
+
+
+def test_stage_graph_recomputes_only_affected_stages(params: SegmentationParams):
+    calls: list[str] = []
+    graph = StageGraph(_recording(stage, calls) for stage in PIPELINE_STAGES)
+    graph.reset(make_eye_image(640, 480))
+    _ = graph.evaluate("morphology", params)
+    calls.clear()
+
+    _ = graph.evaluate("morphology", replace(params, kernel_size=8))
+
+    assert calls == ["morphology"]
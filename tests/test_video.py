@@ -0,0 +1,49 @@
+from pathlib import Path
+
+import cv2
+import numpy as np
+import pytest
+from cv2.typing import MatLike
+
+from analysis import Instrumentation, SegmentationParams, VideoStream
+from analysis.segmentation import detect_iris
+from benchmarks.synthetic import make_eye_image
+
+
+def test_duplicates_and_tracking(
+    tmp_path: Path, params: SegmentationParams, monkeypatch: pytest.MonkeyPatch
+):
+    eye = make_eye_image(640, 480, seed=0)
+    # Mata bergeser sedikit pada frame ketiga; frame lain mengulang frame
+    # sebelumnya
+    moved = np.roll(eye, 12, axis=1)
+    path = str(tmp_path / "mata.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter.fourcc(*"MJPG"), 10, (640, 480))
+    for frame in (eye, eye, moved, moved):
+        writer.write(frame)
+    writer.release()
+
+    full_hough = 0
+
+    def counting_detect_iris(
+        morpho: MatLike,
+        params: SegmentationParams,
+        instrumentation: Instrumentation | None = None,
+    ) -> tuple[int, int, int]:
+        nonlocal full_hough
+        full_hough += 1
+        return detect_iris(morpho, params, instrumentation)
+
+    monkeypatch.setattr("analysis.segmentation.detect_iris", counting_detect_iris)
+    stream = VideoStream(path, params)
+    records = list(stream)
+
+    assert [r["duplicate"] for r in records] == [False, True, False, True]
+    assert [r["status"] for r in records] == ["ok"] * 4
+    assert records[1]["circle_x"] == records[0]["circle_x"]
+    # Iris frame ketiga ditemukan dari lingkaran frame pertama tanpa Hough penuh
+    assert full_hough == 1
+    assert stream.tracking_losses == 0
+    assert records[2]["circle_x"] == pytest.approx(
+        records[0]["circle_x"] + 12 * params.width / 640, abs=2
+    )
@@ -0,0 +1,48 @@
+import shutil
+from pathlib import Path
+
+from analysis import BatchRunner, FolderWatcher, Journal, SegmentationParams
+from analysis.batch import Record
+
+
+def _watch(
+    directory: Path, journal_path: Path, params: SegmentationParams
+) -> list[Record]:
+    records: list[Record] = []
+    with (
+        BatchRunner("segmentation", params, workers=1) as runner,
+        Journal(str(journal_path)) as journal,
+    ):
+        watcher = FolderWatcher(str(directory), runner, journal, interval=0.01)
+        watcher.run(records.append, once=True)
+    return records
+
+
+def test_resumes_from_journal(
+    tmp_path: Path, eye_files: list[str], params: SegmentationParams
+):
+    journal_path = tmp_path / "jurnal.jsonl"
+    first = _watch(tmp_path, journal_path, params)
+    assert sorted(r["path"] for r in first) == sorted(eye_files)
+    assert all(r["status"] == "ok" for r in first)
+
+    # Baris terakhir terpotong seperti proses yang berhenti mendadak
+    with open(journal_path, "a", encoding="utf-8") as f:
+        _ = f.write('{"path": "terpotong')
+    with Journal(str(journal_path)) as journal:
+        assert len(journal) == len(eye_files)
+
+    assert _watch(tmp_path, journal_path, params) == []
+
+
+def test_copied_file_reuses_journal_result(
+    tmp_path: Path, eye_files: list[str], params: SegmentationParams
+):
+    journal_path = tmp_path / "jurnal.jsonl"
+    first = {r["path"]: r for r in _watch(tmp_path, journal_path, params)}
+    copy = str(tmp_path / "salinan.jpg")
+    _ = shutil.copy(eye_files[0], copy)
+
+    (record,) = _watch(tmp_path, journal_path, params)
+
+    assert record == {**first[eye_files[0]], "path": copy}
@@ -1,13 +1,63 @@
+import importlib
+from typing import TYPE_CHECKING
+
+from .background_task import BackgroundTask
 from .clear_ui_elements import clear_ui_elements
 from .create_error_label import create_error_label
-from .load_image import load_image
-from .resize_image import resize_image
+from .iter_image_files import IMAGE_EXTENSIONS, iter_image_files
+from .preload_modules import preload_modules
+from .progress_indicator import ProgressIndicator
 from .select_image_file import select_image_file
 
+if TYPE_CHECKING:
+    from .decode_image import decode_image
+    from .load_image import (
+        decode_peak_bytes,
+        decoded_shape,
+        image_size,
+        load_image,
+    )
+    from .resize_image import resize_image
+
+# Utilitas yang bergantung pada cv2/PIL dimuat saat pertama kali dipakai agar
+# jendela aplikasi dapat tampil sebelum library berat selesai diimpor
+_LAZY_ATTRIBUTES = {
+    "decode_image": ".decode_image",
+    "decode_peak_bytes": ".load_image",
+    "decoded_shape": ".load_image",
+    "image_size": ".load_image",
+    "load_image": ".load_image",
+    "resize_image": ".resize_image",
+}
+
 __all__ = [
+    "BackgroundTask",
+    "IMAGE_EXTENSIONS",
+    "ProgressIndicator",
     "clear_ui_elements",
     "create_error_label",
+    "decode_image",
+    "decode_peak_bytes",
+    "decoded_shape",
+    "image_size",
+    "iter_image_files",
     "load_image",
+    "preload_modules",
     "resize_image",
     "select_image_file",
 ]
+
+
+def __getattr__(name: str) -> object:
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    submodule = _LAZY_ATTRIBUTES[name]
+    module = importlib.import_module(submodule, __name__)
+    # Import submodul menimpa atribut paket dengan objek modul; ganti dengan
+    # fungsinya agar "from utils import load_image" tetap mengembalikan fungsi,
+    # termasuk jika yang pertama diminta adalah fungsi lain dari modul yang sama
+    for attribute, source in _LAZY_ATTRIBUTES.items():
+        if source == submodule:
+            globals()[attribute] = getattr(module, attribute)
+    return globals()[name]  # pyright: ignore[reportAny]
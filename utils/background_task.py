@@ -0,0 +1,97 @@
+import queue
+import threading
+from collections.abc import Callable
+from tkinter import Tk
+from typing import final
+
+
+@final
+class BackgroundTask:
+    """
+    Menjalankan satu pekerjaan berat di thread latar untuk aplikasi Tkinter.
+
+    Hasil dikirim lewat antrean dan diambil oleh thread utama melalui
+    root.after, karena widget Tkinter hanya boleh diakses dari thread utama.
+    Mengirim pekerjaan baru membatalkan pekerjaan sebelumnya: event
+    pembatalannya diset dan hasilnya (jika tetap selesai) dibuang.
+    """
+
+    def __init__(self, root: Tk, poll_ms: int = 50):
+        """
+        Inisialisasi task runner.
+
+        Args:
+            root: Widget root Tkinter.
+            poll_ms: Interval pemeriksaan hasil dalam milidetik.
+        """
+        self.root = root
+        self.poll_ms = poll_ms
+        self._results: queue.Queue[tuple[int, Callable[[], None]]] = queue.Queue()
+        self._generation = 0
+        self._cancel: threading.Event | None = None
+        self._polling = False
+
+    @property
+    def busy(self) -> bool:
+        """
+        True jika ada pekerjaan yang sedang berjalan dan belum dibatalkan.
+        """
+        return self._cancel is not None
+
+    def submit[T](
+        self,
+        work: Callable[[threading.Event], T],
+        on_success: Callable[[T], None],
+        on_error: Callable[[Exception], None],
+    ) -> None:
+        """
+        Menjalankan pekerjaan di thread latar, membatalkan pekerjaan sebelumnya.
+
+        Args:
+            work: Fungsi yang dijalankan; menerima event pembatalan.
+            on_success: Dipanggil di thread utama dengan hasil pekerjaan.
+            on_error: Dipanggil di thread utama jika pekerjaan gagal.
+        """
+        self.cancel()
+        self._generation += 1
+        generation = self._generation
+        cancel = threading.Event()
+        self._cancel = cancel
+
+        def run() -> None:
+            try:
+                result = work(cancel)
+            except Exception as e:
+                # e dihapus saat blok except selesai; ikat nilainya sekarang
+                self._results.put((generation, lambda error=e: on_error(error)))
+            else:
+                self._results.put((generation, lambda: on_success(result)))
+
+        threading.Thread(target=run, daemon=True).start()
+        if not self._polling:
+            self._polling = True
+            _ = self.root.after(self.poll_ms, self._poll)
+
+    def cancel(self) -> None:
+        """
+        Membatalkan pekerjaan yang sedang berjalan (jika ada).
+        """
+        if self._cancel is not None:
+            self._cancel.set()
+            self._cancel = None
+
+    def _poll(self) -> None:
+        while True:
+            try:
+                generation, callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            # Abaikan hasil dari pekerjaan yang sudah digantikan
+            if generation == self._generation and self._cancel is not None:
+                self._cancel = None
+                callback()
+
+        if self._cancel is not None:
+            _ = self.root.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
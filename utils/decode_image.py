@@ -0,0 +1,27 @@
+import cv2
+import numpy as np
+from cv2.typing import MatLike
+
+
+def decode_image(data: bytes, gray: bool = False) -> MatLike:
+    """
+    Mendecode gambar dari isi file di memori (misalnya hasil upload).
+
+    Args:
+        data: Isi file gambar dalam format yang didukung OpenCV.
+        gray: Jika True, decode langsung ke grayscale.
+
+    Returns:
+        Gambar BGR, atau grayscale jika gray=True.
+
+    Raises:
+        ValueError: Jika data bukan gambar yang dapat dibaca.
+    """
+    if not data:
+        raise ValueError("Gagal membaca file gambar")
+
+    flag = cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR
+    img = cv2.imdecode(np.frombuffer(data, np.uint8), flag)
+    if img is None or img.size == 0:
+        raise ValueError("Gagal membaca file gambar")
+    return img
@@ -0,0 +1,38 @@
+import os
+from collections.abc import Iterable, Iterator
+
+# Ekstensi yang sama dengan filter pada dialog select_image_file
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp", ".tiff")
+
+
+def iter_image_files(paths: Iterable[str], recursive: bool = False) -> Iterator[str]:
+    """
+    Menghasilkan path file gambar dari daftar file dan/atau direktori.
+
+    File dikembalikan apa adanya, sedangkan direktori dipindai secara lazy
+    (berurutan berdasarkan nama) untuk file dengan ekstensi gambar.
+
+    Args:
+        paths: Daftar path file atau direktori.
+        recursive: Jika True, pindai juga subdirektori.
+
+    Yields:
+        Path ke setiap file gambar yang ditemukan.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            yield from _scan_directory(path, recursive)
+        else:
+            yield path
+
+
+def _scan_directory(directory: str, recursive: bool) -> Iterator[str]:
+    with os.scandir(directory) as it:
+        entries = sorted(it, key=lambda entry: entry.name)
+
+    for entry in entries:
+        if entry.is_dir():
+            if recursive:
+                yield from _scan_directory(entry.path, recursive)
+        elif entry.name.lower().endswith(IMAGE_EXTENSIONS):
+            yield entry.path
@@ -1,21 +1,155 @@
+import math
+
 import cv2
 from cv2.typing import MatLike
+from PIL import Image
+
+# Faktor skala decode yang didukung OpenCV, dari yang paling murah
+_REDUCED_FLAGS = {
+    False: {
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        1: cv2.IMREAD_COLOR,
+    },
+    True: {
+        8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+        4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+        2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+        1: cv2.IMREAD_GRAYSCALE,
+    },
+}
+
+# Nilai tag EXIF Orientation yang memutar gambar 90 derajat
+_ROTATED_ORIENTATIONS = {5, 6, 7, 8}
 
 
-def load_image(path: str) -> MatLike:
+def load_image(path: str, width: int | None = None, gray: bool = False) -> MatLike:
     """
     Memuat dan memvalidasi gambar dari path yang diberikan.
 
+    Jika width diberikan, gambar didecode pada skala 1/8, 1/4, atau 1/2
+    terbesar yang lebarnya masih tidak kurang dari width. Untuk JPEG, OpenCV
+    melakukan penskalaan ini langsung di tahap DCT sehingga waktu decode dan
+    memori puncak turun beberapa kali lipat. Pemanggil tetap perlu
+    melakukan resize_image ke ukuran akhir.
+
     Args:
         path: Path ke file gambar.
+        width: Lebar minimal yang dibutuhkan pemanggil (opsional).
+        gray: Jika True, decode langsung ke grayscale.
 
     Returns:
-        Gambar yang telah dimuat.
+        Gambar yang telah dimuat (BGR, atau grayscale jika gray=True).
 
     Raises:
         ValueError: Jika gambar tidak dapat dibaca.
     """
-    img = cv2.imread(path)
-    if img.size == 0:
+    scale = 1
+    if width is not None:
+        size = image_size(path)
+        scale = 1 if size is None else _reduction_factor(size[0], width)
+    img = cv2.imread(path, _REDUCED_FLAGS[gray][scale])
+    if img is None or img.size == 0:
         raise ValueError("Gagal membaca file gambar")
     return img
+
+
+def image_size(path: str) -> tuple[int, int] | None:
+    """
+    Membaca ukuran gambar dari header file tanpa decode piksel.
+
+    Orientasi EXIF diperhitungkan sehingga ukuran yang dikembalikan sama
+    dengan ukuran hasil imread.
+
+    Args:
+        path: Path ke file gambar.
+
+    Returns:
+        Tuple (lebar, tinggi), atau None jika header tidak dapat dibaca.
+    """
+    header = _header(path)
+    return None if header is None else header[:2]
+
+
+def decoded_shape(
+    path: str, width: int | None = None, gray: bool = False
+) -> tuple[int, ...] | None:
+    """
+    Memperkirakan bentuk array yang akan dihasilkan load_image tanpa decode.
+
+    Args:
+        path: Path ke file gambar.
+        width: Lebar minimal yang sama dengan argumen load_image (opsional).
+        gray: Jika True, perkiraan untuk decode grayscale.
+
+    Returns:
+        Bentuk array (tinggi, lebar[, 3]), atau None jika header tidak dapat
+        dibaca.
+    """
+    header = _header(path)
+    if header is None:
+        return None
+
+    w, h, jpeg = header
+    scale = 1 if width is None else _reduction_factor(w, width)
+    if jpeg:
+        # libjpeg menskalakan di tahap DCT dan membulatkan ke atas
+        shape = (-(-h // scale), -(-w // scale))
+    else:
+        # Format lain didecode penuh lalu diperkecil dengan pembulatan ke bawah
+        shape = (h // scale, w // scale)
+    return shape if gray else (*shape, 3)
+
+
+def decode_peak_bytes(
+    path: str, width: int | None = None, gray: bool = False
+) -> int | None:
+    """
+    Memperkirakan memori puncak load_image untuk satu file tanpa decode.
+
+    Hanya JPEG yang didecode langsung pada skala tereduksi. Format lain
+    (PNG, BMP, TIFF) didecode pada resolusi asli lebih dulu, sehingga
+    puncaknya mencakup gambar penuh dan hasil yang diperkecil.
+
+    Args:
+        path: Path ke file gambar.
+        width: Lebar minimal yang sama dengan argumen load_image (opsional).
+        gray: Jika True, perkiraan untuk decode grayscale.
+
+    Returns:
+        Perkiraan dalam byte, atau None jika header tidak dapat dibaca.
+    """
+    header = _header(path)
+    shape = decoded_shape(path, width, gray)
+    if header is None or shape is None:
+        return None
+
+    w, h, jpeg = header
+    peak = math.prod(shape)
+    if not jpeg and (h, w) != shape[:2]:
+        peak += w * h * (1 if gray else 3)
+    return peak
+
+
+def _header(path: str) -> tuple[int, int, bool] | None:
+    # Baca dimensi dan format dari header saja tanpa decode piksel
+    try:
+        with Image.open(path) as im:
+            w, h = im.size
+            jpeg = im.format == "JPEG"
+            orientation = im.getexif().get(0x0112)
+    except (OSError, ValueError):
+        return None
+
+    # imread menerapkan orientasi EXIF, jadi lebar akhir bisa berupa tinggi file
+    if orientation in _ROTATED_ORIENTATIONS:
+        w, h = h, w
+    return w, h, jpeg
+
+
+def _reduction_factor(w: int, width: int) -> int:
+    for scale in (8, 4, 2):
+        if w // scale >= width:
+            return scale
+    return 1
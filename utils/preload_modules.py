@@ -0,0 +1,30 @@
+import importlib
+import threading
+
+
+def preload_modules(*names: str) -> threading.Thread:
+    """
+    Mengimpor modul di thread latar agar siap sebelum dibutuhkan.
+
+    Dipakai setelah jendela tampil sehingga import library berat (cv2,
+    numpy, matplotlib) tidak menunda munculnya jendela maupun hasil
+    analisis pertama.
+
+    Args:
+        names: Nama modul yang akan diimpor.
+
+    Returns:
+        Thread yang melakukan import.
+    """
+
+    def run() -> None:
+        for name in names:
+            try:
+                _ = importlib.import_module(name)
+            except ImportError:
+                # Error import akan muncul lagi saat modul benar-benar dipakai
+                pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
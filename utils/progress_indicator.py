@@ -0,0 +1,45 @@
+from tkinter import Frame, Label, Misc
+from tkinter.ttk import Progressbar
+from typing import final
+
+
+@final
+class ProgressIndicator:
+    """
+    Indikator progres tak tentu (indeterminate) beserta teks status.
+
+    Widget hanya ditampilkan selama analisis berjalan.
+    """
+
+    def __init__(self, parent: Misc, side: str = "top"):
+        """
+        Membuat widget indikator tanpa langsung menampilkannya.
+
+        Args:
+            parent: Widget induk.
+            side: Sisi penempatan saat di-pack.
+        """
+        self.side = side
+        self.frame = Frame(parent)
+        self.label = Label(self.frame, font=("Arial", 9))
+        self.label.pack()
+        self.bar = Progressbar(self.frame, mode="indeterminate", length=200)
+        self.bar.pack(pady=(2, 0))
+
+    def show(self, text: str = "Menganalisis gambar...") -> None:
+        """
+        Menampilkan indikator dan memulai animasinya.
+
+        Args:
+            text: Teks status yang ditampilkan.
+        """
+        _ = self.label.configure(text=text)
+        self.frame.pack(side=self.side, pady=5)  # pyright: ignore[reportArgumentType]
+        self.bar.start(15)
+
+    def hide(self) -> None:
+        """
+        Menghentikan animasi dan menyembunyikan indikator.
+        """
+        self.bar.stop()
+        self.frame.pack_forget()
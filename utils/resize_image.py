@@ -8,6 +8,7 @@ def resize_image(
     width: int | None = None,
     height: int | None = None,
     inter: int = cv2.INTER_AREA,
+    dst: MatLike | None = None,
 ) -> MatLike:
     """
     Mengubah ukuran gambar secara manual dengan mempertahankan aspect ratio.
@@ -17,6 +18,7 @@ def resize_image(
         width: Lebar target (opsional).
         height: Tinggi target (opsional).
         inter: Metode interpolasi untuk resize.
+        dst: Buffer tujuan yang dipakai ulang jika ukurannya sesuai (opsional).
 
     Returns:
         Gambar yang telah diubah ukurannya.
@@ -42,4 +44,4 @@ def resize_image(
             dim = (new_width, new_height)
 
     # Ubah ukuran gambar
-    return cv2.resize(image, dim, interpolation=inter)
+    return cv2.resize(image, dim, dst=dst, interpolation=inter)